@@ -0,0 +1,314 @@
+import os
+import re  # inbuilt
+import sys  # inbuilt
+
+# File locking is only available on Unix, elsewhere concurrent sessions rely on appends alone
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+# Quantity line joined onto an item name, such as "Qty 2 @ $3.10 each", which changes from week to week
+QUANTITY_SUFFIX = re.compile(r"\s+QTY\s+\d+\s*@.*$")
+
+
+def normalize_item_name(item_name):
+    """
+    Normalises an item name so the same product matches from receipt to receipt.
+
+    Parameters:
+    - item_name (str): Name of the item as it appears on the receipt.
+
+    Returns:
+    - str: The name in upper case, without its quantity line and with single spaces.
+    """
+
+    return " ".join(QUANTITY_SUFFIX.sub("", item_name.upper()).split())
+
+
+class AssignmentHistory():
+    """
+    Persistent index of who took each item in past receipts, predicting who will take it next time.
+
+    Every confirmed receipt adds one vote per item for the shopper who took it. Votes decay by half every
+    `half_life` receipts, so recent splits outweigh old ones. The history file is an append-only log of
+    "receipt number,shopper,weight,item name" lines, replayed the first time the history is used so start-up is
+    not slowed down. When the log grows to several times the number of (item, shopper) pairs it is rewritten with
+    one line per pair, so it stays small however many receipts are recorded.
+
+    Several sessions can record at once, such as the command line, the watch daemon and the HTTP service's
+    workers. Appends and compaction hold a lock on Unix, the same way the ShopperJournal does, and before
+    recording a receipt the history first reads the lines other sessions appended since, so every receipt gets
+    the next receipt number and the decay stays in step. A line cut short by a crash is skipped, then cut off
+    before the next append.
+
+    Each item name keeps the decayed score of every shopper and the shopper with the highest score. Decay shrinks
+    every score of an item by the same factor, so the order of the shoppers only changes when a vote is recorded
+    and predicting an owner is a single dictionary lookup.
+
+    Attributes:
+    - __file_name (str): Name of the history file.
+    - __decay (float): Factor each score is multiplied by per receipt recorded.
+    - __scores (dict): {shopper name: [score, receipt number of the score]} keyed by normalised item name.
+    - __best_owners (dict): Shopper with the highest score keyed by normalised item name.
+    - __receipt_count (int): Number of the last receipt recorded.
+    - __log_lines (int): Number of lines in the history file.
+    - __loaded (bool): True once the history file has been replayed.
+    - __file_offset (int): Number of bytes of the history file replayed so far.
+    - __file_id (int): Inode of the history file replayed, which changes when another session compacts it.
+
+    Methods:
+    - predict_owner: Retrieves the most likely owner of an item.
+    - predict_owners: Retrieves the most likely owner of every item of a receipt.
+    - record_receipt: Records who took each item of a confirmed receipt.
+    - compact: Rewrites the history file with one line per item and shopper.
+    - get_receipt_count: Retrieves the number of receipts recorded.
+    - get_item_count: Retrieves the number of items with a history.
+    """
+
+    def __init__(self, file_name="history.txt", half_life=10):
+        """
+        Initializes the AssignmentHistory object without reading the history file.
+
+        Parameters:
+        - file_name (str): Name of the history file.
+        - half_life (float): Number of receipts after which a vote counts for half as much.
+        """
+
+        self.__file_name = file_name
+        self.__decay = 0.5 ** (1 / half_life)
+        self.__scores = {}
+        self.__best_owners = {}
+        self.__receipt_count = 0
+        self.__log_lines = 0
+        self.__loaded = False
+        self.__file_offset = 0
+        self.__file_id = None
+
+    def __lock(self):
+        """Opens and locks the lock file of the history, returning it so the caller can release it by closing it."""
+
+        lock_file = open(f"{self.__file_name}.lock", 'a')
+
+        if fcntl is not None:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+
+        return lock_file
+
+    def __catch_up(self):
+        """Replays the lines appended to the history file since it was last read, called with the lock held."""
+
+        try:
+            stat = os.stat(self.__file_name)
+        except FileNotFoundError:
+            stat = None
+
+        # Another session compacted or removed the file, so the history is replayed from the start
+        if stat is None or stat.st_ino != self.__file_id or stat.st_size < self.__file_offset:
+            self.__scores = {}
+            self.__best_owners = {}
+            self.__receipt_count = 0
+            self.__log_lines = 0
+            self.__file_offset = 0
+            self.__file_id = None if stat is None else stat.st_ino
+
+        if stat is None or stat.st_size == self.__file_offset:
+            return
+
+        corrupt_lines = 0
+        with open(self.__file_name, 'rb') as file:
+            file.seek(self.__file_offset)
+
+            for line in file:
+
+                # A line without its newline was cut short by a crash
+                if not line.endswith(b"\n"):
+                    break
+
+                self.__file_offset += len(line)
+
+                # A complete line that does not parse is skipped, so one bad line does not stop every divide
+                try:
+                    receipt_num, shopper_name, weight, item_name = line[:-1].decode("utf-8").split(',', 3)
+                    receipt_num, weight = int(receipt_num), float(weight)
+                except ValueError:
+                    corrupt_lines += 1
+                    continue
+
+                self.__add_vote(item_name, shopper_name, receipt_num, weight)
+                self.__log_lines += 1
+
+        if corrupt_lines:
+            print(f"CORRUPT_HISTORY_DATA: Skipped {corrupt_lines} unreadable line(s) of {self.__file_name}.",
+                  file=sys.stderr)
+
+    def __load(self):
+        """Replays the history file the first time the history is used."""
+
+        if self.__loaded:
+            return
+        self.__loaded = True
+
+        lock_file = self.__lock()
+        try:
+            self.__catch_up()
+
+            # Rewrite a log that is mostly superseded votes
+            if self.__log_lines > 4 * max(sum(len(scores) for scores in self.__scores.values()), 1000):
+                self.__compact()
+        finally:
+            lock_file.close()
+
+    def __add_vote(self, item_name, shopper_name, receipt_num, weight):
+        """Adds a vote to a normalised item name at a receipt number, updating its most likely owner."""
+
+        decay = self.__decay
+        item_scores = self.__scores.setdefault(item_name, {})
+        shopper_score = item_scores.get(shopper_name)
+
+        if shopper_score is None:
+            shopper_score = item_scores[shopper_name] = [weight, receipt_num]
+        else:
+            shopper_score[0] = shopper_score[0] * decay ** (receipt_num - shopper_score[1]) + weight
+            shopper_score[1] = receipt_num
+
+        # Compare the scores at the later of their receipt numbers, a compacted log is not in receipt order
+        best_owner = self.__best_owners.get(item_name)
+        if best_owner is not None and best_owner != shopper_name:
+            best_score, best_receipt_num = item_scores[best_owner]
+            score = shopper_score[0]
+
+            if best_receipt_num >= receipt_num:
+                keeps_best = best_score >= score * decay ** (best_receipt_num - receipt_num)
+            else:
+                keeps_best = best_score * decay ** (receipt_num - best_receipt_num) >= score
+
+            if keeps_best:
+                shopper_name = best_owner
+
+        self.__best_owners[item_name] = shopper_name
+        self.__receipt_count = max(self.__receipt_count, receipt_num)
+
+    def predict_owner(self, item_name):
+        """
+        Retrieves the most likely owner of an item.
+
+        Parameters:
+        - item_name (str): Name of the item as it appears on the receipt.
+
+        Returns:
+        - str: Name of the shopper who most likely takes the item, None if the item has no history.
+        """
+
+        self.__load()
+
+        return self.__best_owners.get(normalize_item_name(item_name))
+
+    def predict_owners(self, receipt_items, shopper_names=None):
+        """
+        Retrieves the most likely owner of every item of a receipt.
+
+        Parameters:
+        - receipt_items (dict): Items of the receipt keyed by item number, as returned by Receipt.get_receipt_items.
+        - shopper_names (iterable): Only predict these shoppers, such as the shoppers splitting the receipt.
+          None predicts every shopper.
+
+        Returns:
+        - dict: Predicted shopper name keyed by item number, for the items with a history.
+        """
+
+        self.__load()
+
+        best_owners = self.__best_owners
+        shopper_names = None if shopper_names is None else set(shopper_names)
+        predictions = {}
+
+        for item_num, grocery_item in receipt_items.items():
+            shopper_name = best_owners.get(normalize_item_name(grocery_item.get_item_name()))
+
+            if shopper_name is not None and (shopper_names is None or shopper_name in shopper_names):
+                predictions[item_num] = shopper_name
+
+        return predictions
+
+    def record_receipt(self, item_owners):
+        """
+        Records who took each item of a confirmed receipt and appends the votes to the history file.
+
+        Parameters:
+        - item_owners (list): (item name, shopper name) pairs, one per item of the receipt.
+        """
+
+        self.__load()
+
+        lock_file = self.__lock()
+        try:
+            # Receipts recorded by other sessions come first, so this receipt gets the next number
+            self.__catch_up()
+
+            receipt_num = self.__receipt_count + 1
+            lines = []
+
+            for item_name, shopper_name in item_owners:
+                item_name = normalize_item_name(item_name)
+                self.__add_vote(item_name, shopper_name, receipt_num, 1.0)
+                lines.append(f'{receipt_num},{shopper_name},1,{item_name}\n')
+
+            self.__receipt_count = receipt_num
+
+            with open(self.__file_name, 'ab') as file:
+
+                # Anything past the replayed lines is a line cut short by a crash
+                file.truncate(self.__file_offset)
+                file.write("".join(lines).encode("utf-8"))
+                self.__file_offset = file.tell()
+
+            self.__file_id = os.stat(self.__file_name).st_ino
+            self.__log_lines += len(lines)
+        finally:
+            lock_file.close()
+
+    def __compact(self):
+        """Rewrites the history file with one line per item and shopper, called with the lock held."""
+
+        temp_file_name = f"{self.__file_name}.tmp"
+        with open(temp_file_name, 'wb') as file:
+            for item_name, item_scores in self.__scores.items():
+                for shopper_name, (score, receipt_num) in item_scores.items():
+                    file.write(f'{receipt_num},{shopper_name},{score!r},{item_name}\n'.encode("utf-8"))
+            self.__file_offset = file.tell()
+
+        os.replace(temp_file_name, self.__file_name)
+        self.__file_id = os.stat(self.__file_name).st_ino
+        self.__log_lines = sum(len(item_scores) for item_scores in self.__scores.values())
+
+    def compact(self):
+        """Rewrites the history file with one line per item and shopper, keeping the same predictions."""
+
+        self.__load()
+
+        lock_file = self.__lock()
+        try:
+            self.__catch_up()
+            self.__compact()
+        finally:
+            lock_file.close()
+
+    def get_receipt_count(self):
+        """Retrieves the number of receipts recorded."""
+
+        self.__load()
+
+        return self.__receipt_count
+
+    def get_item_count(self):
+        """Retrieves the number of items with a history."""
+
+        self.__load()
+
+        return len(self.__best_owners)
+
+    def __repr__(self):
+        '''Return the data associated with the history.'''
+
+        return f"AssignmentHistory(file_name={self.__file_name}, loaded={self.__loaded})"
@@ -0,0 +1,134 @@
+class AssignmentIndex():
+    """
+    Class holding which shopper owns each item of a receipt, the single source the shopper carts are derived from.
+
+    Every item maps to its owner, every owner keeps an insertion-ordered set of its items and a running total in
+    cents, so looking up an item's owner, moving an item between carts and reading a cart total are all O(1).
+
+    Attributes:
+    - __owner_of (dict): Name of the owner of each item, keyed by item.
+    - __items_of (dict): Insertion-ordered set (a dict of item to None) of each owner's items, keyed by owner name.
+    - __totals (dict): Running total in cents of each owner's items, keyed by owner name.
+
+    Methods:
+    - add_owner: Adds an owner, optionally with the items they start with.
+    - assign: Moves an item into an owner's cart.
+    - unassign: Takes an item out of its owner's cart.
+    - get_owner: Retrieves the name of an item's owner.
+    - get_items: Retrieves the items in an owner's cart.
+    - get_item_count: Retrieves the number of items in an owner's cart.
+    - get_total_cents: Retrieves the total of an owner's cart in cents.
+    - get_owners: Retrieves the names of the owners.
+    """
+
+    def __init__(self):
+        """Initializes an empty AssignmentIndex object."""
+
+        self.__owner_of = {}
+        self.__items_of = {}
+        self.__totals = {}
+
+    def add_owner(self, owner, items=()):
+        """
+        Adds an owner, optionally with the items they start with.
+
+        Parameters:
+        - owner (str): Name of the owner.
+        - items (iterable): Items moved into the owner's cart.
+        """
+
+        self.__items_of.setdefault(owner, {})
+        self.__totals.setdefault(owner, 0)
+
+        for item in items:
+            self.assign(item, owner)
+
+    def assign(self, item, owner):
+        """
+        Moves an item into an owner's cart, taking it out of its previous owner's cart.
+
+        Parameters:
+        - item: GroceryItem or ItemView to move, it must be hashable and have get_price_cents.
+        - owner (str): Name of the new owner.
+
+        Raises:
+        - KeyError: If the owner has not been added.
+        """
+
+        owner_items = self.__items_of[owner]
+        previous_owner = self.__owner_of.get(item)
+
+        if previous_owner == owner:
+            return
+
+        price_cents = item.get_price_cents()
+
+        if previous_owner is not None:
+            del self.__items_of[previous_owner][item]
+            self.__totals[previous_owner] -= price_cents
+
+        owner_items[item] = None
+        self.__totals[owner] += price_cents
+        self.__owner_of[item] = owner
+
+    def unassign(self, item):
+        """
+        Takes an item out of its owner's cart.
+
+        Parameters:
+        - item: GroceryItem or ItemView to take out.
+
+        Returns:
+        - bool: True if the item had an owner.
+        """
+
+        owner = self.__owner_of.pop(item, None)
+        if owner is None:
+            return False
+
+        del self.__items_of[owner][item]
+        self.__totals[owner] -= item.get_price_cents()
+
+        return True
+
+    def get_owner(self, item):
+        """Retrieves the name of an item's owner, None if it has no owner."""
+
+        return self.__owner_of.get(item)
+
+    def get_items(self, owner):
+        """Retrieves the items in an owner's cart, in the order they were added."""
+
+        return list(self.__items_of.get(owner, ()))
+
+    def get_item_count(self, owner):
+        """Retrieves the number of items in an owner's cart."""
+
+        return len(self.__items_of.get(owner, ()))
+
+    def get_total_cents(self, owner):
+        """Retrieves the total of an owner's cart in cents."""
+
+        return self.__totals.get(owner, 0)
+
+    def get_owners(self):
+        """Retrieves the names of the owners, in the order they were added."""
+
+        return list(self.__items_of)
+
+    def __contains__(self, item):
+        """Returns True if the item has an owner."""
+
+        return item in self.__owner_of
+
+    def __len__(self):
+        """Returns the number of items with an owner."""
+
+        return len(self.__owner_of)
+
+    def __repr__(self):
+        '''Return the data associated with the index.'''
+
+        carts = ", ".join(f"{owner}: {len(items)}" for owner, items in self.__items_of.items())
+
+        return f"AssignmentIndex({carts})"
@@ -0,0 +1,265 @@
+# Rule position used for nodes of the matcher that complete no keyword
+NO_RULE = -1
+
+
+class KeywordMatcher():
+    """
+    Aho-Corasick automaton finding which of many keywords occur in a piece of text.
+
+    The keywords are built into a trie with failure links, so a text is scanned one character at a time, never
+    backing up, whatever the number of keywords. Each node also keeps the lowest rule position of every keyword
+    ending there or along its failure chain, so the highest priority match is known without listing the matches.
+
+    Attributes:
+    - __goto (list): Outgoing transitions of each node, a dict of character to node number.
+    - __fail (list): Failure link of each node, the node of its longest proper suffix in the trie.
+    - __first_rule (list): Lowest rule position of the keywords matched on reaching each node, NO_RULE if none.
+
+    Methods:
+    - find_first_rule: Retrieves the position of the highest priority keyword in a text.
+    - get_node_count: Retrieves the number of nodes in the automaton.
+    """
+
+    def __init__(self, keywords):
+        """
+        Builds the automaton.
+
+        Parameters:
+        - keywords (list): Keywords in priority order, a keyword's position is the rule position reported.
+        """
+
+        self.__goto = [{}]
+        self.__fail = [0]
+        self.__first_rule = [NO_RULE]
+
+        # Build the trie, keeping the first position of a keyword listed twice
+        for position, keyword in enumerate(keywords):
+            node = 0
+            for character in keyword:
+                next_node = self.__goto[node].get(character)
+
+                if next_node is None:
+                    next_node = len(self.__goto)
+                    self.__goto[node][character] = next_node
+                    self.__goto.append({})
+                    self.__fail.append(0)
+                    self.__first_rule.append(NO_RULE)
+
+                node = next_node
+
+            if self.__first_rule[node] == NO_RULE:
+                self.__first_rule[node] = position
+
+        # Add the failure links breadth first, so every shorter suffix is linked before it is needed
+        queue = list(self.__goto[0].values())
+        for node in queue:
+            for character, child in self.__goto[node].items():
+                fail_node = self.__fail[node]
+                while fail_node and character not in self.__goto[fail_node]:
+                    fail_node = self.__fail[fail_node]
+
+                self.__fail[child] = self.__goto[fail_node].get(character, 0)
+
+                # A match of the suffix is also a match of the child
+                suffix_rule = self.__first_rule[self.__fail[child]]
+                child_rule = self.__first_rule[child]
+                if suffix_rule != NO_RULE and (child_rule == NO_RULE or suffix_rule < child_rule):
+                    self.__first_rule[child] = suffix_rule
+
+                queue.append(child)
+
+    def find_first_rule(self, text):
+        """
+        Retrieves the position of the highest priority keyword found in a text, in one pass over the text.
+
+        Parameters:
+        - text (str): Text to search, in the same case as the keywords.
+
+        Returns:
+        - int: Position of the matched keyword with the lowest position, NO_RULE if no keyword is found.
+        """
+
+        goto = self.__goto
+        fail = self.__fail
+        first_rule = self.__first_rule
+        best_rule = NO_RULE
+        node = 0
+
+        for character in text:
+            while node and character not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(character, 0)
+
+            rule = first_rule[node]
+            if rule != NO_RULE and (best_rule == NO_RULE or rule < best_rule):
+                best_rule = rule
+
+                # Nothing can beat the first rule
+                if best_rule == 0:
+                    break
+
+        return best_rule
+
+    def get_node_count(self):
+        """Retrieves the number of nodes in the automaton."""
+
+        return len(self.__goto)
+
+
+class AssignmentRules():
+    """
+    Class predicting which shopper takes an item from keyword rules, such as "PROTEIN" always going to one shopper.
+
+    Rules are matched case-insensitively anywhere in the item name. When several keywords match, the rule listed
+    first wins. All the keywords are compiled into a single KeywordMatcher, so matching a receipt is linear in the
+    total length of its item names rather than rules x items.
+
+    The rules file has one "keyword,shopper" rule per line, like the shoppers file. Blank lines and lines starting
+    with "#" are skipped.
+
+    Attributes:
+    - __rules (list): (keyword, shopper name) pairs, in priority order.
+    - __matcher (KeywordMatcher): The keywords compiled into one automaton, built when first needed.
+
+    Methods:
+    - load: Loads the rules from a rules file.
+    - add_rule: Adds a rule after the existing rules.
+    - predict_owner: Retrieves the predicted owner of an item name.
+    - predict_owners: Retrieves the predicted owner of every item of a receipt.
+    - get_rules: Retrieves the rules.
+    - store_rules: Stores the rules in a rules file.
+    """
+
+    def __init__(self, rules=None):
+        """
+        Initializes the AssignmentRules object.
+
+        Parameters:
+        - rules (list): (keyword, shopper name) pairs, in priority order.
+        """
+
+        self.__rules = []
+        self.__matcher = None
+
+        for keyword, shopper_name in rules or ():
+            self.add_rule(keyword, shopper_name)
+
+    @classmethod
+    def load(cls, file_name="rules.txt"):
+        """
+        Loads the rules from a rules file.
+
+        Parameters:
+        - file_name (str): The name of the file containing the rules.
+
+        Raises:
+        - OSError: If the file cannot be read.
+        - ValueError: If a line is not a "keyword,shopper" rule.
+        """
+
+        rules = []
+
+        with open(file_name, 'r') as file:
+            for line_num, line in enumerate(file, 1):
+                line = line.strip()
+                if not line or line.startswith("#"):
+                    continue
+
+                keyword, separator, shopper_name = line.rpartition(',')
+                if not separator or not keyword.strip() or not shopper_name.strip():
+                    raise ValueError(f"Line {line_num} of {file_name} is not a 'keyword,shopper' rule: {line}")
+
+                rules.append((keyword, shopper_name))
+
+        return cls(rules)
+
+    def add_rule(self, keyword, shopper_name):
+        """
+        Adds a rule after the existing rules.
+
+        Parameters:
+        - keyword (str): Text an item name must contain, in any case.
+        - shopper_name (str): Name of the shopper taking the matching items.
+        """
+
+        self.__rules.append((keyword.strip().upper(), shopper_name.strip().lower()))
+        self.__matcher = None
+
+    def __get_matcher(self):
+        """Retrieves the automaton of the rules, building it after the rules change."""
+
+        if self.__matcher is None:
+            self.__matcher = KeywordMatcher([keyword for keyword, _ in self.__rules])
+
+        return self.__matcher
+
+    def predict_owner(self, item_name):
+        """
+        Retrieves the predicted owner of an item name.
+
+        Parameters:
+        - item_name (str): Name of the item.
+
+        Returns:
+        - str: Name of the shopper of the highest priority matching rule, None if no rule matches.
+        """
+
+        position = self.__get_matcher().find_first_rule(item_name.upper())
+
+        return None if position == NO_RULE else self.__rules[position][1]
+
+    def predict_owners(self, receipt_items, shopper_names=None):
+        """
+        Retrieves the predicted owner of every item of a receipt.
+
+        Parameters:
+        - receipt_items (dict): Items of the receipt keyed by item number, as returned by Receipt.get_receipt_items.
+        - shopper_names (iterable): Only predict these shoppers, such as the shoppers splitting the receipt.
+          Rules for anyone else are skipped and the next matching rule is not tried. None predicts every shopper.
+
+        Returns:
+        - dict: Predicted shopper name keyed by item number, for the items a rule matches.
+        """
+
+        matcher = self.__get_matcher()
+        rules = self.__rules
+        shopper_names = None if shopper_names is None else set(shopper_names)
+        predictions = {}
+
+        for item_num, grocery_item in receipt_items.items():
+            position = matcher.find_first_rule(grocery_item.get_item_name().upper())
+            if position == NO_RULE:
+                continue
+
+            shopper_name = rules[position][1]
+            if shopper_names is None or shopper_name in shopper_names:
+                predictions[item_num] = shopper_name
+
+        return predictions
+
+    def get_rules(self):
+        """Retrieves the (keyword, shopper name) rules, in priority order."""
+
+        return self.__rules
+
+    def store_rules(self, file_name="rules.txt"):
+        """
+        Stores the rules in a rules file.
+
+        Parameters:
+        - file_name (str): The name of the file to store the rules in.
+        """
+
+        with open(file_name, 'w') as file:
+            for keyword, shopper_name in self.__rules:
+                file.write(f'{keyword},{shopper_name}\n')
+
+    def __len__(self):
+        """Returns the number of rules."""
+
+        return len(self.__rules)
+
+    def __repr__(self):
+        '''Return the data associated with the rules.'''
+
+        return f"AssignmentRules(rules={len(self.__rules)})"
@@ -0,0 +1,189 @@
+import re  # inbuilt
+import json
+import fnmatch  # inbuilt
+
+# Owner of every item not matched by the spec, unless the spec names another
+COMBINED = "Combined"
+
+
+class AssignmentSpec():
+    """
+    Class describing how to divide a receipt without prompting: who takes which items and who paid.
+
+    Items are matched by item number first, then by the first name pattern (a case-insensitive shell-style
+    pattern such as "*milk*") they match, and anything left goes to the default owner, the combined cart unless
+    the spec says otherwise. An owner is a shopper's name, or a dict of the weight each shopper takes of the item,
+    such as {"josh": 2, "jessica": 1} for a 2:1 split. The patterns are compiled into a single regular expression, so each item name is
+    matched once no matter how many patterns the spec has.
+
+    Attributes:
+    - __paid (str): Name of the shopper who made the payment.
+    - __shoppers (list): Names of the shoppers splitting the receipt.
+    - __items (dict): Owner of each item, keyed by item number.
+    - __patterns (list): (pattern, owner) pairs, in priority order.
+    - __default (str or dict): Owner of the items that are not matched.
+    - __pattern_regex (re.Pattern): The patterns compiled into one regular expression, None if there are none.
+
+    Methods:
+    - from_dict: Builds a spec from its JSON form.
+    - load: Loads a spec from a JSON file.
+    - resolve: Works out the owner of every item of a receipt.
+    - get_paid, get_shoppers, get_items, get_patterns, get_default: Retrieve the spec settings.
+    """
+
+    def __init__(self, paid, shoppers, items=None, patterns=None, default=COMBINED):
+        """
+        Initializes the AssignmentSpec object.
+
+        Parameters:
+        - paid (str): Name of the shopper who made the payment.
+        - shoppers (list): Names of the shoppers splitting the receipt.
+        - items (dict): Owner of each item, keyed by item number.
+        - patterns (list or dict): (pattern, owner) pairs in priority order, or a dict of them.
+        - default (str or dict): Owner of the items that are not matched, the combined cart, one of the shoppers
+          or the weights of a split.
+
+        Raises:
+        - ValueError: If the spec names a shopper who is not splitting the receipt, or a split has a negative
+          weight or weights adding up to zero.
+        """
+
+        self.__paid = paid.lower().strip()
+        self.__shoppers = [name.lower().strip() for name in shoppers]
+        self.__items = {int(item_num): self.__owner(owner) for item_num, owner in (items or {}).items()}
+        patterns = patterns.items() if isinstance(patterns, dict) else (patterns or ())
+        self.__patterns = [(pattern, self.__owner(owner)) for pattern, owner in patterns]
+        self.__default = self.__owner(default)
+
+        if self.__paid not in self.__shoppers:
+            raise ValueError(f"'{paid}' paid but is not one of the shoppers.")
+
+        for owner in list(self.__items.values()) + [owner for _, owner in self.__patterns] + [self.__default]:
+            if isinstance(owner, dict):
+                if any(weight < 0 for weight in owner.values()) or sum(owner.values()) <= 0:
+                    raise ValueError(f"The split {owner} needs non-negative weights adding up to more than zero.")
+                names = owner
+            else:
+                names = [] if owner == COMBINED else [owner]
+
+            for name in names:
+                if name not in self.__shoppers:
+                    raise ValueError(f"'{name}' is not one of the shoppers.")
+
+        # One alternation of every pattern, the group that matched gives the pattern's position
+        if self.__patterns:
+            self.__pattern_regex = re.compile("|".join(f"(?P<p{position}>{fnmatch.translate(pattern)})"
+                                                       for position, (pattern, _) in enumerate(self.__patterns)),
+                                              re.IGNORECASE)
+        else:
+            self.__pattern_regex = None
+
+    @staticmethod
+    def __owner_name(name):
+        """Normalises a shopper name, keeping the combined cart's name as it is."""
+
+        return COMBINED if name.strip().lower() == COMBINED.lower() else name.lower().strip()
+
+    @classmethod
+    def __owner(cls, owner):
+        """Normalises an owner: a shopper name, or a dict of the weight each shopper takes keyed by name."""
+
+        if isinstance(owner, dict):
+            return {cls.__owner_name(name): float(weight) for name, weight in owner.items()}
+
+        return cls.__owner_name(owner)
+
+    @classmethod
+    def from_dict(cls, spec):
+        """
+        Builds a spec from its JSON form.
+
+        Parameters:
+        - spec (dict): {"paid": name, "shoppers": [names], "items": {"3": name}, "patterns": {"*milk*": name},
+          "default": name}, where items, patterns and default are optional, and any name can instead be a dict
+          of weights such as {"josh": 2, "jessica": 1}.
+        """
+
+        return cls(spec["paid"], spec["shoppers"], spec.get("items"), spec.get("patterns"),
+                   spec.get("default", COMBINED))
+
+    @classmethod
+    def load(cls, file_location):
+        """
+        Loads a spec from a JSON file.
+
+        Parameters:
+        - file_location (str): File location of the JSON spec.
+        """
+
+        with open(file_location, "r") as file:
+            return cls.from_dict(json.load(file))
+
+    def resolve(self, receipt_items):
+        """
+        Works out the owner of every item of a receipt in one pass.
+
+        Parameters:
+        - receipt_items (dict): Items of the receipt keyed by item number, as returned by Receipt.get_receipt_items.
+
+        Returns:
+        - dict: Owner of each item that does not stay in the combined cart, a shopper's name or a dict of weights,
+          keyed by item number.
+
+        Raises:
+        - ValueError: If the spec names an item number the receipt does not have.
+        """
+
+        for item_num in self.__items:
+            if item_num not in receipt_items:
+                raise ValueError(f"Item {item_num} is not in the receipt.")
+
+        assignments = {}
+        pattern_regex = self.__pattern_regex
+
+        for item_num, grocery_item in receipt_items.items():
+            owner = self.__items.get(item_num)
+
+            if owner is None and pattern_regex is not None:
+                match = pattern_regex.match(grocery_item.get_item_name())
+                if match:
+                    owner = self.__patterns[int(match.lastgroup[1:])][1]
+
+            if owner is None:
+                owner = self.__default
+
+            if owner != COMBINED:
+                assignments[item_num] = owner
+
+        return assignments
+
+    def get_paid(self):
+        """Retrieves the name of the shopper who made the payment."""
+
+        return self.__paid
+
+    def get_shoppers(self):
+        """Retrieves the names of the shoppers splitting the receipt."""
+
+        return self.__shoppers
+
+    def get_items(self):
+        """Retrieves the owner of each item, keyed by item number."""
+
+        return self.__items
+
+    def get_patterns(self):
+        """Retrieves the (pattern, owner) pairs, in priority order."""
+
+        return self.__patterns
+
+    def get_default(self):
+        """Retrieves the owner of the items that are not matched."""
+
+        return self.__default
+
+    def __repr__(self):
+        '''Return the data associated with the spec.'''
+
+        return f"AssignmentSpec(paid='{self.__paid}', shoppers={self.__shoppers}, items={len(self.__items)}, " \
+               f"patterns={len(self.__patterns)}, default='{self.__default}')"
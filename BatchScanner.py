@@ -0,0 +1,190 @@
+import os
+import sys
+import glob
+import time  # inbuilt
+from concurrent.futures import ProcessPoolExecutor  # inbuilt
+
+from ReceiptDividerRev2 import PDFReader, PARSER_VERSION
+from ParseCache import ParseCache
+
+
+def scan_receipt_file(file_location, parse_cache=None):
+    """
+    Scans a single receipt file and returns the resulting Receipt object.
+
+    Note:
+    This function runs inside the worker processes, so it must stay at module level to be picklable.
+
+    Parameters:
+    - file_location (str): File location of the PDF receipt file.
+    - parse_cache (ParseCache): Optional on-disk cache of parse results keyed by the PDF hash.
+
+    Returns:
+    - Receipt: Receipt object created from the extracted data.
+    """
+
+    scanner = PDFReader(parse_cache=parse_cache)
+    scanner.set_file_loaction(file_location)
+
+    # Read the file and build the digital receipt
+    scanner.read_file()
+    scanner.set_digi_receipt()
+
+    return scanner.get_digi_receipt()
+
+
+class BatchScanner():
+    """
+    Class used to scan a whole folder of receipts, spreading the PDF parsing across a process pool.
+
+    Attributes:
+    - __max_workers (int): Number of worker processes, defaults to one per core.
+    - __scanned_receipts (list): List of (file location, Receipt) tuples in the order the files were given.
+    - __scan_errors (list): List of (file location, error message) tuples for the files that failed to parse.
+    - __elapsed_time (float): Wall clock time in seconds taken by the last batch.
+    - __parse_cache (ParseCache): Optional on-disk cache shared by the workers, None disables caching.
+
+    Methods:
+    - find_receipt_files: Expands a directory or glob pattern into a sorted list of PDF files.
+    - scan_receipts: Scans the given receipt files in parallel.
+    - get_files_per_second: Retrieves the throughput of the last batch.
+    - get_scanned_receipts: Retrieves the receipts scanned in the last batch.
+    - get_scan_errors: Retrieves the per-file errors of the last batch.
+    - __str__: Returns a summary of the last batch.
+    """
+
+    def __init__(self, max_workers=None, parse_cache=None):
+        """
+        Initializes the BatchScanner object.
+
+        Parameters:
+        - max_workers (int): Number of worker processes, defaults to one per core.
+        - parse_cache (ParseCache): Optional on-disk cache shared by the workers, None disables caching.
+        """
+
+        self.__max_workers = max_workers or os.cpu_count() or 1
+        self.__scanned_receipts = []
+        self.__scan_errors = []
+        self.__elapsed_time = 0.0
+        self.__parse_cache = parse_cache
+
+    def find_receipt_files(self, source):
+        """
+        Expands a directory or glob pattern into a sorted list of PDF files.
+
+        Parameters:
+        - source (str): A directory containing receipts, or a glob pattern such as "receipts/*.pdf".
+
+        Returns:
+        - list: Sorted list of receipt file locations.
+        """
+
+        # A directory is expanded to all of the PDF files directly inside it
+        if os.path.isdir(source):
+            pattern = os.path.join(source, "*.pdf")
+        else:
+            pattern = source
+
+        return sorted(glob.glob(pattern))
+
+    def scan_receipts(self, file_locations):
+        """
+        Scans the given receipt files in parallel, one worker process per core.
+
+        Parameters:
+        - file_locations (list): List of receipt file locations.
+
+        Returns:
+        - tuple: (scanned receipts, scan errors), where scanned receipts is a list of (file location, Receipt)
+          tuples in the given order, and scan errors is a list of (file location, error message) tuples.
+        """
+
+        self.__scanned_receipts = []
+        self.__scan_errors = []
+        start_time = time.perf_counter()
+
+        with ProcessPoolExecutor(max_workers=self.__max_workers) as executor:
+
+            # Submit every file up front so the workers are never idle
+            futures = [executor.submit(scan_receipt_file, file_location, self.__parse_cache)
+                       for file_location in file_locations]
+
+            # Collect the results in submission order
+            for file_location, future in zip(file_locations, futures):
+                try:
+                    self.__scanned_receipts.append((file_location, future.result()))
+                except Exception as e:
+                    self.__scan_errors.append((file_location, f"{type(e).__name__}: {e}"))
+
+        self.__elapsed_time = time.perf_counter() - start_time
+
+        return self.__scanned_receipts, self.__scan_errors
+
+    def get_files_per_second(self):
+        """Retrieves the number of files processed per second in the last batch."""
+
+        files_processed = len(self.__scanned_receipts) + len(self.__scan_errors)
+
+        if self.__elapsed_time == 0.0:
+            return 0.0
+
+        return files_processed / self.__elapsed_time
+
+    def get_scanned_receipts(self):
+        """Retrieves the receipts scanned in the last batch."""
+
+        return self.__scanned_receipts
+
+    def get_scan_errors(self):
+        """Retrieves the per-file errors of the last batch."""
+
+        return self.__scan_errors
+
+    def get_max_workers(self):
+        """Retrieves the number of worker processes."""
+
+        return self.__max_workers
+
+    def __str__(self):
+        '''Returns a summary of the last batch.'''
+
+        return f"Scanned {len(self.__scanned_receipts)} receipt(s), {len(self.__scan_errors)} error(s) " \
+               f"in {self.__elapsed_time:.2f}s using {self.__max_workers} worker(s) " \
+               f"({self.get_files_per_second():.2f} files/s)"
+
+
+def main(argv=None):
+    """
+    Command line entry point: python BatchScanner.py <directory or glob> [workers]
+    """
+
+    argv = sys.argv[1:] if argv is None else argv
+
+    if not argv:
+        print("Usage: python BatchScanner.py <directory or glob> [workers]")
+        return 1
+
+    batch_scanner = BatchScanner(int(argv[1]) if len(argv) > 1 else None, ParseCache(parser_version=PARSER_VERSION))
+    file_locations = batch_scanner.find_receipt_files(argv[0])
+
+    if not file_locations:
+        print(f"No receipt files found for '{argv[0]}'.")
+        return 1
+
+    scanned_receipts, scan_errors = batch_scanner.scan_receipts(file_locations)
+
+    # Display each receipt total followed by the files that could not be parsed
+    for file_location, receipt in scanned_receipts:
+        print(f"{os.path.basename(file_location)}: {len(receipt.get_receipt_items())} items, "
+              f"total ${receipt.get_receipt_total()}")
+
+    for file_location, error in scan_errors:
+        print(f"FAILED {os.path.basename(file_location)}: {error}")
+
+    print(batch_scanner)
+
+    return 0 if not scan_errors else 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,168 @@
+import time  # inbuilt
+
+from BatchScanner import BatchScanner
+from ReceiptDividerRev2 import ReceiptDivider
+from Money import to_cents, from_cents
+from Settlement import SettlementLedger
+
+
+class BulkDivider():
+    """
+    Class used to divide many receipts with one assignment spec, without prompting.
+
+    The receipts are parsed in parallel by a BatchScanner, then each is divided in a single pass by
+    ReceiptDivider.divide_receipt_by_spec, so a run over thousands of receipts is bound by parsing (or by the
+    parse cache) rather than by the divide.
+
+    Attributes:
+    - __assignment_spec (AssignmentSpec): Who splits each receipt, who takes which items and who paid.
+    - __batch_scanner (BatchScanner): Parses the receipt files in parallel.
+    - __divided_receipts (list): List of (label, owings) tuples of the last run, in the order given.
+    - __divide_errors (list): List of (label, error message) tuples of the receipts that could not be divided.
+    - __spending_totals (dict): Total in cents each shopper spent across the last run, keyed by shopper name.
+    - __settlement_ledger (SettlementLedger): Net balance of each shopper across the receipts of the last run.
+    - __storage (SQLiteStorage): Optional database every divided receipt is saved to, in one transaction per run.
+    - __elapsed_time (float): Wall clock time in seconds taken by the last run.
+
+    Methods:
+    - divide_files: Parses and divides receipt files.
+    - divide_receipts: Divides receipts that have already been parsed.
+    - get_divided_receipts: Retrieves the owings of each receipt of the last run.
+    - get_divide_errors: Retrieves the per-receipt errors of the last run.
+    - get_spending_totals: Retrieves the total each shopper spent across the last run.
+    - get_settlement_ledger: Retrieves the net balances of the last run.
+    - get_receipts_per_second: Retrieves the throughput of the last run.
+    - __str__: Returns a summary of the last run.
+    """
+
+    def __init__(self, assignment_spec, max_workers=None, parse_cache=None, storage=None):
+        """
+        Initializes the BulkDivider object.
+
+        Parameters:
+        - assignment_spec (AssignmentSpec): Who splits each receipt, who takes which items and who paid.
+        - max_workers (int): Number of worker processes parsing the receipts, defaults to one per core.
+        - parse_cache (ParseCache): Optional on-disk cache shared by the workers, None disables caching.
+        - storage (SQLiteStorage): Optional database the divided receipts are saved to, None to not save them.
+        """
+
+        self.__assignment_spec = assignment_spec
+        self.__batch_scanner = BatchScanner(max_workers, parse_cache)
+        self.__divided_receipts = []
+        self.__divide_errors = []
+        self.__spending_totals = {}
+        self.__settlement_ledger = SettlementLedger()
+        self.__storage = storage
+        self.__elapsed_time = 0.0
+
+    def divide_files(self, file_locations):
+        """
+        Parses and divides receipt files.
+
+        Parameters:
+        - file_locations (list): File locations of the PDF receipts.
+
+        Returns:
+        - tuple: (list of (file location, owings), list of (file location, error message)), where owings is
+          {"payer": name, "owings": {shopper name: amount owed}}.
+        """
+
+        start_time = time.perf_counter()
+
+        scanned_receipts, scan_errors = self.__batch_scanner.scan_receipts(file_locations)
+        self.divide_receipts(scanned_receipts)
+
+        # Files that failed to parse are reported with the receipts that failed to divide
+        self.__divide_errors = list(scan_errors) + self.__divide_errors
+        self.__elapsed_time = time.perf_counter() - start_time
+
+        return self.__divided_receipts, self.__divide_errors
+
+    def divide_receipts(self, receipts):
+        """
+        Divides receipts that have already been parsed.
+
+        Parameters:
+        - receipts (list): List of (label, Receipt) tuples, such as those returned by BatchScanner.scan_receipts.
+
+        Returns:
+        - tuple: (list of (label, owings), list of (label, error message)).
+        """
+
+        start_time = time.perf_counter()
+        self.__divided_receipts = []
+        self.__divide_errors = []
+        spending_totals = {}
+        settlement_ledger = SettlementLedger()
+        receipt_records = []
+
+        for label, receipt in receipts:
+
+            # Each receipt gets its own shoppers, so no cart carries over to the next receipt
+            receipt_divider = ReceiptDivider()
+            receipt_divider.set_parse_cache(None)
+            receipt_divider.set_receipt(receipt)
+            receipt_divider.set_receipt_file_location(label)
+            receipt_divider.set_settlement_ledger(settlement_ledger)
+
+            try:
+                owings = receipt_divider.divide_receipt_by_spec(self.__assignment_spec)
+            except ValueError as e:
+                self.__divide_errors.append((label, f"{type(e).__name__}: {e}"))
+                continue
+
+            self.__divided_receipts.append((label, owings))
+
+            if self.__storage is not None:
+                receipt_records.append(receipt_divider.build_receipt_record(owings["payer"]))
+
+            for shopper in receipt_divider.get_shoppers_in_receipt().values():
+                if not shopper.is_main_shopping_cart():
+                    spending_totals[shopper.get_name()] = spending_totals.get(shopper.get_name(), 0) + \
+                                                          to_cents(shopper.get_cart_total())
+
+        # Every receipt of the run is saved in a single transaction
+        if receipt_records:
+            self.__storage.save_receipts(receipt_records)
+
+        self.__spending_totals = spending_totals
+        self.__settlement_ledger = settlement_ledger
+        self.__elapsed_time = time.perf_counter() - start_time
+
+        return self.__divided_receipts, self.__divide_errors
+
+    def get_divided_receipts(self):
+        """Retrieves the (label, owings) tuples of the last run."""
+
+        return self.__divided_receipts
+
+    def get_divide_errors(self):
+        """Retrieves the (label, error message) tuples of the receipts that could not be divided."""
+
+        return self.__divide_errors
+
+    def get_spending_totals(self):
+        """Retrieves the total each shopper spent across the last run, in dollars."""
+
+        return {name: from_cents(cents) for name, cents in self.__spending_totals.items()}
+
+    def get_settlement_ledger(self):
+        """Retrieves the net balance of each shopper across the receipts of the last run."""
+
+        return self.__settlement_ledger
+
+    def get_receipts_per_second(self):
+        """Retrieves the throughput of the last run in receipts per second."""
+
+        receipt_count = len(self.__divided_receipts) + len(self.__divide_errors)
+
+        if self.__elapsed_time == 0:
+            return 0.0
+
+        return receipt_count / self.__elapsed_time
+
+    def __str__(self):
+        '''Returns a summary of the last run.'''
+
+        return f"Divided {len(self.__divided_receipts)} receipt(s), {len(self.__divide_errors)} error(s) in " \
+               f"{self.__elapsed_time:.2f}s ({self.get_receipts_per_second():.2f} receipts/s)"
@@ -0,0 +1,148 @@
+import re  # inbuilt
+
+from PipelineStats import NULL_STATS
+
+# A price in the price column, such as "4.50", "$4.50" or "-1.00"
+PRICE_WORD = re.compile(r"-?\$?\d+\.\d\d")
+
+
+class WordBoxExtractor():
+    """
+    Class used to extract receipt lines from the word boxes of a PDF instead of its plain text.
+
+    Words are grouped into rows by their y-coordinate and the price column is found by x-position, so a long
+    product name that squeezes the run of spaces before the price no longer runs into it. Each row is rebuilt
+    as a canonical line (name, a fixed column gap, then price) so the rest of the PDFReader pipeline, including
+    item continuations, stop markers and discounts, is shared with the text mode.
+
+    Attributes:
+    - __row_tolerance (float): Fraction of a word's height two words may differ by in y and share a row.
+    - __column_gap (str): Run of spaces placed between the name and price columns of a rebuilt line.
+
+    Methods:
+    - iter_lines: Yields the rebuilt lines of a PDF document page by page.
+    - group_rows: Groups the words of a page into rows ordered top to bottom, left to right.
+    - find_price_column: Finds the left edge of the price column on a page.
+    - build_line: Rebuilds a row of words as a canonical receipt line.
+    """
+
+    def __init__(self, row_tolerance=0.5, column_gap=3):
+        """
+        Initializes the WordBoxExtractor object.
+
+        Parameters:
+        - row_tolerance (float): Fraction of a word's height two words may differ by in y and share a row.
+        - column_gap (int): Number of spaces placed between the name and price columns of a rebuilt line.
+        """
+
+        self.__row_tolerance = row_tolerance
+        self.__column_gap = " " * column_gap
+
+    def iter_lines(self, doc, stats=NULL_STATS):
+        """
+        Yields the rebuilt lines of a PDF document page by page.
+
+        Parameters:
+        - doc (fitz.Document): The opened PDF document.
+        - stats (PipelineStats): Collects the time spent in get_text and the number of pages and lines read.
+
+        Yields:
+        - str: A canonical receipt line.
+        """
+
+        for page in doc:
+            with stats.stage("get_text"):
+                words = page.get_text("words")
+
+            with stats.stage("group_rows"):
+                rows = self.group_rows(words)
+                price_column_edge = self.find_price_column(rows)
+
+            stats.count("pages")
+            stats.count("lines", len(rows))
+
+            for row in rows:
+                yield self.build_line(row, price_column_edge)
+
+    def group_rows(self, words):
+        """
+        Groups the words of a page into rows ordered top to bottom, left to right.
+
+        Parameters:
+        - words (list): Word tuples (x0, y0, x1, y1, word, block, line, word number) from page.get_text("words").
+
+        Returns:
+        - list: List of rows, each a list of word tuples sorted by x-position.
+        """
+
+        rows = []
+        row_top = None
+        row_tolerance = 0.0
+
+        for word in sorted(words, key=lambda word: (word[1], word[0])):
+
+            # Start a new row once a word sits clearly below the current one
+            if row_top is None or word[1] - row_top > row_tolerance:
+                rows.append([])
+                row_top = word[1]
+                row_tolerance = (word[3] - word[1]) * self.__row_tolerance
+
+            rows[-1].append(word)
+
+        for row in rows:
+            row.sort(key=lambda word: word[0])
+
+        return rows
+
+    def find_price_column(self, rows):
+        """
+        Finds the left edge of the price column on a page.
+
+        Rows whose last word is a price set well apart from the name (by at least two character widths) mark
+        out the column, which then also catches prices that a long name has squeezed up against.
+
+        Parameters:
+        - rows (list): Rows of word tuples from `group_rows`.
+
+        Returns:
+        - float: x-coordinate of the left edge of the price column, or None if the page has no prices.
+        """
+
+        price_edges = []
+
+        for row in rows:
+            if len(row) > 1 and PRICE_WORD.fullmatch(row[-1][4]):
+                last_word = row[-1]
+                char_width = (last_word[2] - last_word[0]) / len(last_word[4])
+
+                if last_word[0] - row[-2][2] >= 2 * char_width:
+                    price_edges.append(last_word[0])
+
+        return min(price_edges) if price_edges else None
+
+    def build_line(self, row, price_column_edge):
+        """
+        Rebuilds a row of words as a canonical receipt line.
+
+        Parameters:
+        - row (list): Word tuples of the row, sorted by x-position.
+        - price_column_edge (float): x-coordinate of the left edge of the price column.
+
+        Returns:
+        - str: " name<gap>price" if the row ends in the price column, or " name  " (ending in two spaces, the
+          way a name continued on the next line ends) if it does not. The leading space keeps markers such as
+          " TOTAL " recognisable.
+        """
+
+        last_word = row[-1]
+        char_width = (last_word[2] - last_word[0]) / max(len(last_word[4]), 1)
+
+        # The last word is the price if it starts inside the price column
+        in_price_column = len(row) > 1 and price_column_edge is not None and \
+            PRICE_WORD.fullmatch(last_word[4]) is not None and last_word[0] >= price_column_edge - char_width
+
+        if in_price_column:
+            name = " ".join(word[4] for word in row[:-1])
+            return f" {name}{self.__column_gap}{last_word[4]}"
+
+        return " " + " ".join(word[4] for word in row) + "  "
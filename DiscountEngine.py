@@ -0,0 +1,146 @@
+from ReceiptTokenizer import LineTokenizer, ITEM, MEMBER_SAVING, OFFER, EVERYDAY_EXTRA
+
+# User-friendly names for each kind of discount
+DISCOUNT_LABELS = {MEMBER_SAVING: "Member Price Saving",
+                   OFFER: "Offer",
+                   EVERYDAY_EXTRA: "Everyday Extra Discount"}
+
+
+class ItemRecord():
+    """
+    Structured record of a receipt item and the discounts applied to it.
+
+    Attributes:
+    - __name (str): Name of the item.
+    - __base_price (float): Price of the item before any discounts.
+    - __adjustments (list): List of (kind, amount) tuples, amounts are negative for savings.
+
+    Methods:
+    - add_adjustment: Attaches a discount to the item.
+    - get_name: Retrieves the name of the item.
+    - get_base_price: Retrieves the price of the item before any discounts.
+    - get_adjustments: Retrieves the discounts applied to the item.
+    - get_price: Retrieves the price of the item after its discounts.
+    """
+
+    __slots__ = ("__name", "__base_price", "__adjustments")
+
+    def __init__(self, name, base_price):
+        """
+        Initializes the ItemRecord object.
+
+        Parameters:
+        - name (str): Name of the item.
+        - base_price (float): Price of the item before any discounts.
+        """
+
+        self.__name = name
+        self.__base_price = base_price
+        self.__adjustments = []
+
+    def add_adjustment(self, kind, amount):
+        """
+        Attaches a discount to the item.
+
+        Parameters:
+        - kind (str): Kind of discount, such as MEMBER_SAVING or OFFER.
+        - amount (float): Amount of the discount, negative for savings.
+        """
+
+        self.__adjustments.append((kind, amount))
+
+    def get_name(self):
+        """Retrieves the name of the item."""
+
+        return self.__name
+
+    def get_base_price(self):
+        """Retrieves the price of the item before any discounts."""
+
+        return self.__base_price
+
+    def get_adjustments(self):
+        """Retrieves the discounts applied to the item."""
+
+        return self.__adjustments
+
+    def get_price(self):
+        """Retrieves the price of the item after its discounts."""
+
+        if not self.__adjustments:
+            return self.__base_price
+
+        return round(self.__base_price + sum(amount for _, amount in self.__adjustments), 2)
+
+    def __repr__(self):
+        '''Return the data associated with the record.'''
+
+        return f"ItemRecord('{self.__name}', {self.__base_price}, {self.__adjustments})"
+
+
+class DiscountResolver():
+    """
+    Single pass state machine resolving the discount lines of a receipt onto the items they apply to.
+
+    Member Price Saving and OFFER lines are attached to the item above them, and the Everyday Extra Discount is
+    kept for the whole receipt. Each line is tokenized once and no formatted strings are rebuilt, so a receipt
+    is resolved in O(n) no matter how many discounts it has.
+
+    Attributes:
+    - __line_tokenizer (LineTokenizer): Splits each line into its name, price and kind.
+
+    Methods:
+    - resolve: Resolves the item and discount lines of a receipt into item records.
+    """
+
+    def __init__(self, line_tokenizer=None):
+        """
+        Initializes the DiscountResolver object.
+
+        Parameters:
+        - line_tokenizer (LineTokenizer): Splits each line into its name, price and kind.
+        """
+
+        self.__line_tokenizer = line_tokenizer or LineTokenizer()
+
+    def resolve(self, item_lines):
+        """
+        Resolves the item and discount lines of a receipt into item records.
+
+        Parameters:
+        - item_lines (iterable): Item and discount lines from the item section of the receipt.
+
+        Returns:
+        - tuple: (item records, everyday extra discount), where the everyday extra discount is 0.0 if the
+          receipt has none.
+        """
+
+        item_records = []
+        everyday_extra_discount = 0.0
+        current_record = None
+
+        for line in item_lines:
+            name, price, kind = self.__line_tokenizer.tokenize(line)
+
+            # A new item becomes the target of the discount lines that follow it
+            if kind == ITEM:
+                if price is None:
+                    raise ValueError(f"No price found on receipt line: '{line}'")
+
+                current_record = ItemRecord(name, price)
+                item_records.append(current_record)
+
+            # Unreadable discounts, or discounts above the first item, have nothing to apply to
+            elif price is None:
+                pass
+
+            # Member savings and offers adjust the item above them
+            elif kind == MEMBER_SAVING or kind == OFFER:
+                if current_record is not None:
+                    current_record.add_adjustment(kind, price)
+
+            # The Everyday Extra Discount applies to the whole receipt
+            elif kind == EVERYDAY_EXTRA:
+                everyday_extra_discount = price
+
+        return item_records, everyday_extra_discount
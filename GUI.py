@@ -5,6 +5,10 @@ import tkinter.messagebox
 from tkinter import filedialog
 import ReceiptReader
 from ReceiptReader import *
+from AssignmentRules import AssignmentRules
+from ParseWorker import ParseWorker
+from SplitterModel import SplitterModel, SHOPPER_1, BOTH, SHOPPER_2
+from Money import format_cents
 
 # Set the appearance mode and default color theme
 customtkinter.set_appearance_mode("dark")
@@ -16,7 +20,38 @@ current_page = "main_menu"  # Change this to the current page you're displaying
 file1_placed = None
 items = None
 total_text_window = None
+owed_text_window = None
+totals_refresh_job = None
 who_paid = None
+assignment_rules = None
+receipt_total = None
+parse_worker = None
+parse_progress_bar = None
+parse_progress_text = None
+splitter_model = None
+row_pool = None
+
+# Milliseconds between checks of the parse worker's messages
+PARSE_POLL_MS = 50
+
+# Layout of the item rows on the splitter page, and the rows kept bound either side of the window
+ROW_TOP = 165
+ROW_HEIGHT = 40
+ROW_OVERSCAN = 2
+
+# Milliseconds the totals wait for the clicks to stop before they are redrawn
+TOTALS_DEBOUNCE_MS = 150
+
+# Radio button value of each shopper name the assignment rules can predict
+RULE_OWNER_VALUES = {"shopper_1": 1, "shopper 1": 1, "both": 2, "combined": 2, "shopper_2": 3, "shopper 2": 3}
+
+# Function to load the keyword rules predicting who takes each item
+def load_assignment_rules(file_name="rules.txt"):
+    global assignment_rules
+    try:
+        assignment_rules = AssignmentRules.load(file_name)
+    except (OSError, ValueError):
+        assignment_rules = None
 
 # Function to locate receipt file
 def find_File():
@@ -29,20 +64,208 @@ def find_File():
         update_file_label(file1_placed, file_path)  # Update the label with the selected file path
 
 
-# Function to calculate costs based on selected items
-def calculate_costs(dict1, dict2, dict3):
-    def single_costs(d):
-        total = 0
-        for item, cost in d.items():
-            total += cost
-        return float(f'{total:.2f}')
+class ItemRowPool():
+    """
+    Virtualized list of the item rows on the splitter page.
+
+    Widgets are only built for the rows on screen, plus a few either side, and are rebound to other rows of the
+    SplitterModel as the page scrolls, so the number of widgets depends on the window height rather than the
+    length of the receipt. The pool hooks the yscrollcommand of the scrollable frame's canvas, which Tk calls
+    whenever the view moves or is resized, so rows are only rebound when the window over the page has changed.
+
+    Attributes:
+    - __canvas (CTkCanvas): Canvas the rows are drawn on.
+    - __viewport (CTkScrollableFrame): Frame the canvas scrolls in.
+    - __scroll_canvas (Canvas): Canvas of the scrollable frame, whose view is the window over the page.
+    - __scroll_command (str): yscrollcommand the pool replaced, still called so the scrollbar follows the view.
+    - __model (SplitterModel): Item names, prices and carts of the rows.
+    - __on_choice (function): Called with (row, cart) when a radio button is selected.
+    - __slots (list): Pooled rows, each a dict of its canvas items, radio variable and bound row.
+    - __bound_range (tuple): (first, last) rows bound to the slots.
+    - __running (bool): True while the pool follows the scroll position.
+
+    Methods:
+    - start: Binds the visible rows and starts following the scroll position.
+    - refresh: Rebinds the slots to the rows now on screen.
+    - destroy: Stops following the scroll position and destroys the pooled widgets.
+    - get_slot_count: Retrieves the number of pooled rows.
+    """
+
+    def __init__(self, canvas, viewport, model, on_choice):
+        """
+        Initializes the ItemRowPool object without building any widgets.
+
+        Parameters:
+        - canvas (CTkCanvas): Canvas the rows are drawn on.
+        - viewport (CTkScrollableFrame): Frame the canvas scrolls in.
+        - model (SplitterModel): Item names, prices and carts of the rows.
+        - on_choice (function): Called with (row, cart) when a radio button is selected.
+        """
+
+        self.__canvas = canvas
+        self.__viewport = viewport
+        self.__scroll_canvas = viewport._parent_canvas
+        self.__scroll_command = ""
+        self.__model = model
+        self.__on_choice = on_choice
+        self.__slots = []
+        self.__bound_range = None
+        self.__running = False
+
+    def __visible_range(self):
+        """Returns the (first, last) rows on screen, plus the overscan either side."""
+
+        # Top of the scrollable frame's view, moved into the coordinates of the canvas inside the frame
+        view_top = self.__scroll_canvas.canvasy(0) - self.__canvas.winfo_y()
+        view_height = max(self.__scroll_canvas.winfo_height(), ROW_HEIGHT)
+
+        return self.__model.get_visible_rows(view_top, view_height, ROW_TOP, ROW_HEIGHT, ROW_OVERSCAN)
 
-    total1 = single_costs(dict1)
-    total2 = single_costs(dict2)
-    
-    total3 = single_costs(dict3)
+    def __add_slot(self):
+        """Builds the widgets of one more pooled row."""
 
-    return total1, total2, total3
+        slot = {"row": None, "variable": tkinter.IntVar()}
+        slot["name"] = self.__canvas.create_text(50, 0, text="", font=("Helvetica", 10), fill="black", anchor="w")
+        slot["price"] = self.__canvas.create_text(430, 0, text="", font=("Helvetica", 10), fill="black", anchor='e')
+
+        slot["windows"] = []
+        slot["buttons"] = []
+        for x, value in ((480, SHOPPER_1), (550, BOTH), (620, SHOPPER_2)):
+            radio_button = customtkinter.CTkRadioButton(self.__canvas, width=25, text="", variable=slot["variable"],
+                                                        value=value, bg_color='#f0f0f0',
+                                                        command=lambda slot=slot, value=value:
+                                                        self.__on_choice(slot["row"], value))
+            slot["buttons"].append(radio_button)
+            slot["windows"].append(self.__canvas.create_window(x, 0, window=radio_button, anchor="w"))
+
+        self.__slots.append(slot)
+
+    def __bind_slot(self, slot, row):
+        """Moves a pooled row to a row of the model and shows its item, or hides it if row is None."""
+
+        slot["row"] = row
+        canvas_items = [slot["name"], slot["price"]] + slot["windows"]
+
+        if row is None:
+            for canvas_item in canvas_items:
+                self.__canvas.itemconfigure(canvas_item, state="hidden")
+            return
+
+        y = ROW_TOP + row * ROW_HEIGHT
+        for canvas_item in canvas_items:
+            x = self.__canvas.coords(canvas_item)[0]
+            self.__canvas.coords(canvas_item, x, y)
+            self.__canvas.itemconfigure(canvas_item, state="normal")
+
+        self.__canvas.itemconfigure(slot["name"], text=self.__model.get_name(row))
+        self.__canvas.itemconfigure(slot["price"], text=f'${self.__model.get_price(row):.2f}')
+        slot["variable"].set(self.__model.get_choice(row))
+
+    def refresh(self):
+        """Rebinds the slots to the rows now on screen, building more slots only if the window grew."""
+
+        first, last = self.__visible_range()
+        if (first, last) == self.__bound_range:
+            return
+
+        while len(self.__slots) < last - first:
+            self.__add_slot()
+
+        for slot_num, slot in enumerate(self.__slots):
+            row = first + slot_num
+            self.__bind_slot(slot, row if row < last else None)
+
+        self.__bound_range = (first, last)
+
+    def __on_scroll(self, first, last):
+        """yscrollcommand of the scrollable frame's canvas, passes the view on to the scrollbar and refreshes."""
+
+        if self.__scroll_command:
+            self.__scroll_canvas.tk.call(*self.__scroll_canvas.tk.splitlist(self.__scroll_command), first, last)
+
+        if self.__running:
+            self.refresh()
+
+    def start(self):
+        """Binds the visible rows and starts following the scroll position."""
+
+        self.__running = True
+        self.__canvas.update_idletasks()
+
+        # Called on every scroll, drag of the scrollbar and resize of the window
+        self.__scroll_command = str(self.__scroll_canvas.cget("yscrollcommand"))
+        self.__scroll_canvas.configure(yscrollcommand=self.__on_scroll)
+        self.refresh()
+
+    def destroy(self):
+        """Stops following the scroll position and destroys the pooled widgets."""
+
+        # Hand the scrollbar its yscrollcommand back
+        if self.__running:
+            self.__scroll_canvas.configure(yscrollcommand=self.__scroll_command)
+        self.__running = False
+
+        for slot in self.__slots:
+            for radio_button in slot["buttons"]:
+                radio_button.destroy()
+
+        self.__slots = []
+        self.__bound_range = None
+
+    def get_slot_count(self):
+        """Retrieves the number of pooled rows."""
+
+        return len(self.__slots)
+
+    def __repr__(self):
+        '''Return the data associated with the pool.'''
+
+        return f"ItemRowPool(rows={self.__model.get_row_count()}, slots={len(self.__slots)})"
+
+# Function to start parsing the selected receipt on a background thread
+def start_parsing():
+    global parse_worker
+    parse_worker = ParseWorker(file1)
+    parse_worker.start()
+    root.after(PARSE_POLL_MS, poll_parse_worker, parse_worker)
+
+# Function to apply the parse worker's messages, polled from the Tk main loop so widgets are only touched here
+def poll_parse_worker(worker):
+    global items, receipt_total
+
+    # A cancelled worker's messages are ignored, the user has already moved on
+    if worker is not parse_worker:
+        return
+
+    for message in worker.poll():
+        if message[0] == "progress":
+            update_parse_progress(message[1], message[2])
+        elif message[0] == "done":
+            items, receipt_total = message[1]
+            setup_canvas_content("splitter")
+            return
+        elif message[0] == "error":
+            tkinter.messagebox.showerror("Receipt Divider", f"The receipt could not be read:\n{message[1]}")
+            setup_canvas_content("main_menu")
+            return
+        elif message[0] == "cancelled":
+            return
+
+    root.after(PARSE_POLL_MS, poll_parse_worker, worker)
+
+# Function to show how many pages of the receipt have been read
+def update_parse_progress(pages_read, page_total):
+    if page_total:
+        parse_progress_bar.set(min(pages_read / page_total, 1))
+        my_canvas.itemconfig(parse_progress_text, text=f"Reading page {pages_read} of {page_total}")
+
+# Function to stop parsing the receipt and return to the main menu
+def cancel_parsing():
+    global parse_worker
+    if parse_worker is not None:
+        parse_worker.cancel()
+        parse_worker = None
+    setup_canvas_content("main_menu")
 
 # Function to calculate the total content height based on items
 def calculate_total_content_height(itemsBought):
@@ -53,7 +276,18 @@ def calculate_total_content_height(itemsBought):
 
 # Function to set up canvas content for the current page
 def setup_canvas_content(current_page):
+    global row_pool
+    global total_text_window
+    global owed_text_window
     my_canvas.delete('all')  # Clear existing canvas content
+
+    # Release the pooled item rows and the totals of the splitter page
+    if row_pool is not None:
+        row_pool.destroy()
+        row_pool = None
+    total_text_window = None
+    owed_text_window = None
+
     global file1_placed
     global file1
 
@@ -67,7 +301,7 @@ def setup_canvas_content(current_page):
         entry1_window = my_canvas.create_window(120, 430, anchor="nw", window=entry1)
 
         submit1 = customtkinter.CTkButton(master=my_canvas, text="Submit", text_color="black",
-                                          command=lambda: submit_click("splitter"))
+                                          command=lambda: submit_click("loading"))
         submit1_window = my_canvas.create_window(290, 485, anchor="nw", window=submit1)
 
         # Specify fixed border dimensions
@@ -92,18 +326,30 @@ def setup_canvas_content(current_page):
         # Create a window item for the standard tkinter frame
         file1_window = my_canvas.create_window(270, 436, anchor="nw", window=file1_frame)
 
+    elif current_page == "loading":
+        # The receipt is parsed on a worker thread, this page shows its progress until the items are ready
+        global parse_progress_bar
+        global parse_progress_text
+        my_canvas.create_text(360, 270, text="Loading receipt", font=("Helvetica", 20), fill="black")
+        parse_progress_text = my_canvas.create_text(360, 310, text="Opening the PDF...", font=("Helvetica", 10),
+                                                    fill="black")
+
+        parse_progress_bar = customtkinter.CTkProgressBar(master=my_canvas, width=300)
+        parse_progress_bar.set(0)
+        my_canvas.create_window(210, 340, anchor="nw", window=parse_progress_bar)
+
+        cancel1 = customtkinter.CTkButton(master=my_canvas, text="Cancel", text_color="black", command=cancel_parsing)
+        my_canvas.create_window(290, 380, anchor="nw", window=cancel1)
+
+        start_parsing()
+
     elif current_page == "splitter":
-        # Initialize global variables
-        global items
-        itemsBought, total = grab_items_and_price(file1)
-        items = itemsBought
-
-        # Create a variable for spacing between labels and dictionaries for item categorization
-        label_spacer = 0
-        Shopper_1 = {}
-        Shopper_2 = {}
-        both = {}
-        selected_item = {}
+        # The items and total parsed by the worker thread
+        global splitter_model
+        itemsBought, total = items, receipt_total
+        global who_paid
+        splitter_model = SplitterModel(itemsBought)
+        who_paid = tkinter.IntVar(value=SHOPPER_1)
 
         # Create labels and text on the canvas
         my_canvas.create_text(50, 135, text="Item", font=("Helvetica", 12), fill="black", anchor="w")
@@ -112,70 +358,25 @@ def setup_canvas_content(current_page):
         my_canvas.create_text(550, 135, text="Both", font=("Helvetica", 9), fill="black", anchor="w")
         my_canvas.create_text(605, 135, text="Shopper 2", font=("Helvetica", 9), fill="black", anchor="w")
 
-        # Function to update the selected radio button value
-        def update_value(item, value):
-            if value == 3:  # shopper2 selected this item
-                Shopper_2[item] = itemsBought[item] 
-                if item in Shopper_1:
-                    del Shopper_1[item]
-                if item in both:
-                    del both[item]
-            elif value == 1:  # shopper1 selected this item
-                Shopper_1[item] = itemsBought[item]
-                if item in Shopper_2:
-                    del Shopper_2[item]
-                if item in both:
-                    del both[item]
-            elif value == 2:  # Both selected this item
-                both[item] = itemsBought[item]
-                if item in Shopper_2:
-                    del Shopper_2[item]
-                if item in Shopper_1:
-                    del Shopper_1[item]
-
-            # Print the updated item categorization
-            print("Shopper 1:", Shopper_1)
-            print("Shopper 2:", Shopper_2)
-            print("Both:", both)
-
-        # Add all items to the 'both' dictionary initially
-        for item, value in itemsBought.items():
-            both[item] = value
-
-        # Loop through items and create labels and radio buttons
-        for item in itemsBought:
-            value = itemsBought[item]
-
-            selected_item[item] = tkinter.IntVar()
-
-            my_canvas.create_text(50, 165 + label_spacer, text=item, font=("Helvetica", 10), fill="black",
-                                anchor="w")
-            my_canvas.create_text(430, 165 + label_spacer, text=f'${value:.2f}', font=("Helvetica", 10),
-                                fill="black", anchor='e')
-
-            radio_button_1 = customtkinter.CTkRadioButton(root, text="", variable=selected_item[item], value=1,
-                                                        bg_color='#f0f0f0', command=lambda item=item: update_value(item, 1))
-            radio_button_2 = customtkinter.CTkRadioButton(root, text="", variable=selected_item[item], value=2,
-                                                        bg_color='#f0f0f0', command=lambda item=item: update_value(item, 2))
-            radio_button_3 = customtkinter.CTkRadioButton(root, width=25, text="", variable=selected_item[item], value=3,
-                                                        bg_color='#f0f0f0', command=lambda item=item: update_value(item, 3))
-
-            # Place the radio buttons at the specified (x, y) coordinates
-            radio_button_1_window = my_canvas.create_window(480, 165 + label_spacer, window=radio_button_1,
-                                                            anchor="w")
-            radio_button_2_window = my_canvas.create_window(550, 165 + label_spacer, window=radio_button_2,
-                                                            anchor="w")
-            radio_button_3_window = my_canvas.create_window(620, 165 + label_spacer, window=radio_button_3,
-                                                            anchor="w")
+        # Function to update the cart of the item in a row when its radio button is selected
+        def update_value(row, value):
+            if splitter_model.set_choice(row, value):
+                schedule_totals_refresh()
 
-            radio_button_2.select()
+        # Start each item from the shopper the assignment rules predict, or both shoppers
+        for row in range(splitter_model.get_row_count()):
+            predicted_owner = assignment_rules.predict_owner(splitter_model.get_name(row)) if assignment_rules else None
+            splitter_model.set_choice(row, RULE_OWNER_VALUES.get(predicted_owner, BOTH))
 
-            label_spacer += 40
+        # Only the rows on screen get widgets, which are rebound to other rows as the page scrolls
+        row_pool = ItemRowPool(my_canvas, main_frame, splitter_model, update_value)
+        row_pool.start()
+        label_spacer = splitter_model.get_row_count() * ROW_HEIGHT
 
-        my_canvas.create_text(340, 165 + label_spacer, text='Total: ', font=("Helvetica", 10), fill="black",
+        my_canvas.create_text(340, ROW_TOP + label_spacer, text='Total: ', font=("Helvetica", 10), fill="black",
                                 anchor="w")
         
-        my_canvas.create_text(380, 165 + label_spacer, text='$'+total, font=("Helvetica", 10), fill="black",
+        my_canvas.create_text(380, ROW_TOP + label_spacer, text='$'+total, font=("Helvetica", 10), fill="black",
                                 anchor="w")
 
         label_spacer += 100
@@ -186,23 +387,31 @@ def setup_canvas_content(current_page):
         # who paid
 
         my_canvas.create_text(100, label_spacer + 80, text="Who made the payment? ")
-        radio_button_4 = customtkinter.CTkRadioButton(root, text="Shopper_1", variable=who_paid, value='Shopper_1',
-                                                        bg_color='#f0f0f0', text_color="black")
+        radio_button_4 = customtkinter.CTkRadioButton(root, text="Shopper_1", variable=who_paid, value=SHOPPER_1,
+                                                        bg_color='#f0f0f0', text_color="black",
+                                                        command=schedule_totals_refresh)
         
-        radio_button_5 = customtkinter.CTkRadioButton(root, text="Shopper_2", variable=who_paid, value='Shopper_2',
-                                                        bg_color='#f0f0f0', text_color="black")
+        radio_button_5 = customtkinter.CTkRadioButton(root, text="Shopper_2", variable=who_paid, value=SHOPPER_2,
+                                                        bg_color='#f0f0f0', text_color="black",
+                                                        command=schedule_totals_refresh)
         
         radio_button_4_window = my_canvas.create_window(60, label_spacer + 120, window=radio_button_4, anchor="w")
         radio_button_5_window = my_canvas.create_window(60, label_spacer + 160, window=radio_button_5, anchor="w")
         
         
         
-        # Create a "Calculate" button
-        submit2 = CTkButton(master=my_canvas, text="Calculate", text_color="black",
-                            command=lambda: update_total_values(label_spacer, Shopper_2, both, Shopper_1, who_paid))  #
+        # Create a "Calculate" button, the totals also follow every click on their own
+        submit2 = CTkButton(master=my_canvas, text="Calculate", text_color="black", command=refresh_totals)
 
         submit2_window = my_canvas.create_window(60, label_spacer+200, anchor="nw", window=submit2)
 
+        # One text item per total, redrawn in place by refresh_totals
+        total_text_window = my_canvas.create_text(250, label_spacer + 120, text="", font=("Helvetica", 10),
+                                                  anchor="w")
+        owed_text_window = my_canvas.create_text(250, label_spacer + 160, text="", font=("Helvetica", 12),
+                                                 anchor="w")
+        refresh_totals()
+
 
 
         # Adjust label_spacer if needed
@@ -220,31 +429,35 @@ def setup_canvas_content(current_page):
 
     my_canvas.update()  # Update the canvas to reflect changes
 
-# Function to update the displayed total values
-def update_total_values(label_spacer, shopper_2, both, shopper_1, who_paid):
-    global total_text_window
-    who_paid_window = None
-    total_values = calculate_costs(shopper_2, both, shopper_1)
-    total_text = f'Shopper_1: ${total_values[0]:.2f}\tBoth: ${total_values[1]:.2f}\tShopper_2: ${total_values[2]:.2f}'
-    
-    if who_paid != 'Shopper_2':
-        paid_text = f'Shopper_1 owes Shopper_2: ${(total_values[2] + (total_values[1] / 2)):.2f}'
-    else:
-        paid_text = f'Shopper_2 owes Shopper_1: ${(total_values[0] + (total_values[1]/2)):.2f}'
-
-    if total_text_window:
-        my_canvas.delete(total_text_window)
-    if label_spacer == 0:
-        label_spacer = 350
+# Function to redraw the totals once the clicks stop, so a burst of clicks costs one redraw
+def schedule_totals_refresh():
+    global totals_refresh_job
+    if totals_refresh_job is not None:
+        root.after_cancel(totals_refresh_job)
+    totals_refresh_job = root.after(TOTALS_DEBOUNCE_MS, refresh_totals)
+
+# Function to update the displayed total values from the running totals of the splitter model
+def refresh_totals():
+    global totals_refresh_job
+    totals_refresh_job = None
+
+    # The page may have changed while the refresh was waiting
+    if splitter_model is None or total_text_window is None:
+        return
+
+    total_text = (f'Shopper_1: {format_cents(splitter_model.get_total_cents(SHOPPER_1))}\t'
+                  f'Both: {format_cents(splitter_model.get_total_cents(BOTH))}\t'
+                  f'Shopper_2: {format_cents(splitter_model.get_total_cents(SHOPPER_2))}')
+
+    payer = who_paid.get()
+    owed_cents = splitter_model.get_owed_cents(payer)
+    if payer == SHOPPER_1:
+        paid_text = f'Shopper_2 owes Shopper_1: {format_cents(owed_cents)}'
     else:
-        label_spacer += 750
-    
-    total_text_window = my_canvas.create_text(310, label_spacer,text=total_text, font=("Helvetica", 10), anchor="nw")
+        paid_text = f'Shopper_1 owes Shopper_2: {format_cents(owed_cents)}'
 
-    # Update the total values text element
     my_canvas.itemconfig(total_text_window, text=total_text)
-
-    who_paid_window = my_canvas.create_text(360, label_spacer + 100, text=paid_text, font=("Helvetica", 12), anchor='nw')
+    my_canvas.itemconfig(owed_text_window, text=paid_text)
 
 
 # Function to update the selected file label
@@ -286,6 +499,9 @@ my_canvas.create_window((0, 0), window=content_frame, anchor="nw")
 # Configure canvas dimensions
 my_canvas.configure(width=700, height=700)
 
+# Load the assignment rules, if there are any
+load_assignment_rules()
+
 # Initialize canvas content
 setup_canvas_content(current_page)
 
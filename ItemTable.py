@@ -0,0 +1,377 @@
+from array import array  # inbuilt
+from collections.abc import Mapping  # inbuilt
+
+from Money import to_cents, from_cents
+from DiscountEngine import DISCOUNT_LABELS
+
+
+def describe_item(item):
+    """
+    Builds the interface-friendly string of a grocery item, shared by GroceryItem and ItemView.
+
+    Parameters:
+    - item: GroceryItem or ItemView to describe.
+    """
+
+    grocery_item_str = f"Product:\t{item.get_item_name()}\nPrice: \t\t" + \
+                       f"${item.get_item_price():.2f}\n"
+
+    # Show the original price and each discount if the item was discounted
+    if item.get_adjustments():
+        grocery_item_str += f"Was: \t\t${item.get_original_price():.2f}\n"
+        for kind, amount in item.get_adjustments():
+            grocery_item_str += f"\t\t{DISCOUNT_LABELS.get(kind, kind)}: {'-' if amount < 0 else ''}${abs(amount):.2f}\n"
+
+    return grocery_item_str
+
+
+class ItemTable():
+    """
+    Class storing the items of many receipts in compact columns instead of one object per item.
+
+    Each item is a row across parallel arrays: an interned name id, the price and original price in cents, the
+    receipt id and the item's line number in its receipt. Discount breakdowns are kept in a sparse dictionary as
+    most items have none. Existing callers get GroceryItem-compatible ItemView objects, created on demand.
+
+    Attributes:
+    - __names (list): Each distinct item name, indexed by name id.
+    - __name_ids (dict): Name id of each distinct item name.
+    - __name_column (array): Name id of each row.
+    - __price_column (array): Price of each row in cents.
+    - __original_price_column (array): Price of each row before discounts in cents.
+    - __receipt_column (array): Receipt id of each row.
+    - __line_column (array): Item number of each row within its receipt, starting at 1.
+    - __adjustments (dict): List of (kind, amount) discounts of each discounted row, keyed by row.
+    - __receipt_bounds (list): (first row, end row) of each receipt, indexed by receipt id.
+
+    Methods:
+    - add_receipt: Appends the items of a receipt and returns them as a mapping of item views.
+    - append: Appends a single item row.
+    - get_receipt_items: Returns the items of a receipt as a mapping of item views.
+    - view: Returns the item view of a row.
+    - get_name, get_price_cents, get_original_price_cents, get_adjustments, get_receipt_id, get_line_number:
+      Retrieve a column value of a row.
+    - set_price_cents: Sets the price of a row.
+    - apply_adjustment: Applies a discount to a row.
+    - total_cents: Sums the prices of every row, or of one receipt.
+    - totals_by_name: Sums the prices of every row by item name.
+    - get_receipt_count: Retrieves the number of receipts in the table.
+    - __len__: Returns the number of rows in the table.
+    """
+
+    def __init__(self):
+        """Initializes an empty ItemTable object."""
+
+        self.__names = []
+        self.__name_ids = {}
+        self.__name_column = array("l")
+        self.__price_column = array("q")
+        self.__original_price_column = array("q")
+        self.__receipt_column = array("l")
+        self.__line_column = array("l")
+        self.__adjustments = {}
+        self.__receipt_bounds = []
+
+    def add_receipt(self, items_found):
+        """
+        Appends the items of a receipt and returns them as a mapping of item views.
+
+        Parameters:
+        - items_found (list): Items of the receipt, each [name, price] or [name, price, original price,
+          adjustments] for discounted items, as produced by PDFReader.data_prep and the parse cache.
+
+        Returns:
+        - ReceiptItems: Mapping of item number (starting at 1) to ItemView.
+        """
+
+        receipt_id = len(self.__receipt_bounds)
+        first_row = len(self.__price_column)
+
+        for line_number, item in enumerate(items_found, start=1):
+            self.append(*item, receipt_id=receipt_id, line_number=line_number)
+
+        self.__receipt_bounds.append((first_row, len(self.__price_column)))
+
+        return self.get_receipt_items(receipt_id)
+
+    def append(self, name, price, original_price=None, adjustments=None, receipt_id=0, line_number=0):
+        """
+        Appends a single item row.
+
+        Parameters:
+        - name (str): Name of the item.
+        - price (float): Price of the item.
+        - original_price (float): Price of the item before discounts, defaults to the price.
+        - adjustments (list): List of (kind, amount) discounts already applied to the price.
+        - receipt_id (int): Id of the receipt the item belongs to.
+        - line_number (int): Item number of the item within its receipt.
+
+        Returns:
+        - int: The new row.
+        """
+
+        row = len(self.__price_column)
+
+        # Each distinct name is stored once
+        name_id = self.__name_ids.get(name)
+        if name_id is None:
+            name_id = self.__name_ids[name] = len(self.__names)
+            self.__names.append(name)
+
+        price_cents = to_cents(price)
+
+        self.__name_column.append(name_id)
+        self.__price_column.append(price_cents)
+        self.__original_price_column.append(price_cents if original_price is None else to_cents(original_price))
+        self.__receipt_column.append(receipt_id)
+        self.__line_column.append(line_number)
+
+        if adjustments:
+            self.__adjustments[row] = [tuple(adjustment) for adjustment in adjustments]
+
+        return row
+
+    def get_receipt_items(self, receipt_id):
+        """
+        Returns the items of a receipt as a mapping of item views.
+
+        Parameters:
+        - receipt_id (int): Id of the receipt.
+        """
+
+        first_row, end_row = self.__receipt_bounds[receipt_id]
+
+        return ReceiptItems(self, first_row, end_row)
+
+    def view(self, row):
+        """Returns the GroceryItem-compatible view of a row."""
+
+        return ItemView(self, row)
+
+    def get_name(self, row):
+        """Retrieves the name of a row."""
+
+        return self.__names[self.__name_column[row]]
+
+    def get_price_cents(self, row):
+        """Retrieves the price of a row in cents."""
+
+        return self.__price_column[row]
+
+    def set_price_cents(self, row, price_cents):
+        """Sets the price of a row in cents."""
+
+        self.__price_column[row] = price_cents
+
+    def get_original_price_cents(self, row):
+        """Retrieves the price of a row before discounts in cents."""
+
+        return self.__original_price_column[row]
+
+    def get_adjustments(self, row):
+        """Retrieves the (kind, amount) discounts of a row, an empty list if it has none."""
+
+        return self.__adjustments.get(row, [])
+
+    def apply_adjustment(self, row, kind, amount):
+        """
+        Applies a discount to a row and records it in the row's breakdown.
+
+        Parameters:
+        - row (int): Row of the item.
+        - kind (str): Kind of discount, such as EVERYDAY_EXTRA.
+        - amount (float): Amount of the discount, negative for savings.
+        """
+
+        self.__adjustments.setdefault(row, []).append((kind, amount))
+        self.__price_column[row] += to_cents(amount)
+
+    def get_receipt_id(self, row):
+        """Retrieves the receipt id of a row."""
+
+        return self.__receipt_column[row]
+
+    def get_line_number(self, row):
+        """Retrieves the item number of a row within its receipt."""
+
+        return self.__line_column[row]
+
+    def total_cents(self, receipt_id=None):
+        """
+        Sums the prices of every row, or of one receipt.
+
+        Parameters:
+        - receipt_id (int): Id of the receipt to total, None to total the whole table.
+
+        Returns:
+        - int: The total in cents.
+        """
+
+        if receipt_id is None:
+            return sum(self.__price_column)
+
+        first_row, end_row = self.__receipt_bounds[receipt_id]
+
+        return sum(self.__price_column[first_row:end_row])
+
+    def totals_by_name(self):
+        """
+        Sums the prices of every row by item name.
+
+        Returns:
+        - dict: Total in cents of each item name.
+        """
+
+        totals = [0] * len(self.__names)
+        for name_id, price_cents in zip(self.__name_column, self.__price_column):
+            totals[name_id] += price_cents
+
+        return dict(zip(self.__names, totals))
+
+    def get_receipt_count(self):
+        """Retrieves the number of receipts in the table."""
+
+        return len(self.__receipt_bounds)
+
+    def __len__(self):
+        """Returns the number of rows in the table."""
+
+        return len(self.__price_column)
+
+    def __repr__(self):
+        '''Return the data associated with the table.'''
+
+        return f"ItemTable(rows={len(self)}, receipts={self.get_receipt_count()}, names={len(self.__names)})"
+
+
+class ReceiptItems(Mapping):
+    """
+    Read-only mapping of item number (starting at 1) to the ItemView of each item in one receipt.
+
+    It stands in for the dictionary of GroceryItem objects a PDFReader used to build, creating each view only
+    when it is looked up.
+    """
+
+    __slots__ = ("_table", "_first_row", "_end_row")
+
+    def __init__(self, table, first_row, end_row):
+        self._table = table
+        self._first_row = first_row
+        self._end_row = end_row
+
+    def __getitem__(self, item_num):
+        if not isinstance(item_num, int) or not 1 <= item_num <= self._end_row - self._first_row:
+            raise KeyError(item_num)
+
+        return ItemView(self._table, self._first_row + item_num - 1)
+
+    def __iter__(self):
+        return iter(range(1, self._end_row - self._first_row + 1))
+
+    def __len__(self):
+        return self._end_row - self._first_row
+
+    def get_table(self):
+        """Retrieves the item table holding the receipt's items."""
+
+        return self._table
+
+    def total_cents(self):
+        """Sums the prices of the receipt's items in cents."""
+
+        return self._table.total_cents(self._table.get_receipt_id(self._first_row)) if len(self) else 0
+
+    def __repr__(self):
+        return f"ReceiptItems({dict(self)})"
+
+
+class ItemView():
+    """
+    GroceryItem-compatible view of one row of an ItemTable.
+
+    Views hold only the table and row, so they are created on demand and two views of the same row compare
+    equal and hash alike, which keeps cart membership checks working.
+    """
+
+    __slots__ = ("_table", "_row")
+
+    def __init__(self, table, row):
+        self._table = table
+        self._row = row
+
+    def get_id_num(self):
+        """Returns the item number of the item within its receipt, starting at 1."""
+
+        return self._table.get_line_number(self._row)
+
+    def get_row(self):
+        """Returns the row of the item in its table, unique across every receipt in the table."""
+
+        return self._row
+
+    def get_item_name(self):
+        """Returns the name of the item."""
+
+        return self._table.get_name(self._row)
+
+    def get_item_price(self):
+        """Returns the price of the item."""
+
+        return from_cents(self._table.get_price_cents(self._row))
+
+    def set_item_price(self, new_price):
+        """Adjust the price of the item."""
+
+        self._table.set_price_cents(self._row, to_cents(new_price))
+
+    def get_price_cents(self):
+        """Returns the item price in cents."""
+
+        return self._table.get_price_cents(self._row)
+
+    def get_original_price(self):
+        """Returns the price of the item before any discounts."""
+
+        return from_cents(self._table.get_original_price_cents(self._row))
+
+    def get_adjustments(self):
+        """Returns the list of (kind, amount) discounts applied to the item."""
+
+        return self._table.get_adjustments(self._row)
+
+    def apply_adjustment(self, kind, amount):
+        """
+        Apply a discount to the item and record it in the breakdown.
+
+        Parameters:
+        - kind (str): Kind of discount, such as EVERYDAY_EXTRA.
+        - amount (float): Amount of the discount, negative for savings.
+        """
+
+        self._table.apply_adjustment(self._row, kind, amount)
+
+    def to_item_data(self):
+        """Returns the item as [name, price], or [name, price, original price, adjustments] if it was discounted."""
+
+        adjustments = self.get_adjustments()
+        if not adjustments:
+            return [self.get_item_name(), self.get_item_price()]
+
+        return [self.get_item_name(), self.get_item_price(), self.get_original_price(),
+                [list(adjustment) for adjustment in adjustments]]
+
+    def __eq__(self, other):
+        return isinstance(other, ItemView) and other._table is self._table and other._row == self._row
+
+    def __hash__(self):
+        return hash((id(self._table), self._row))
+
+    def __str__(self):
+        '''Return an interface-friendly string of the item.'''
+
+        return describe_item(self)
+
+    def __repr__(self):
+        '''Return the data associated with the item.'''
+
+        return f"ItemView({self._row}, '{self.get_item_name()}', {self.get_item_price()})"
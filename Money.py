@@ -0,0 +1,150 @@
+from array import array  # inbuilt
+
+# Money is held as a whole number of cents so sums and splits are exact, floats are only used at the edges
+
+
+def to_cents(amount):
+    """
+    Converts a dollar amount to a whole number of cents.
+
+    Parameters:
+    - amount (float, int or str): Dollar amount, such as 4.5 or "$4.50".
+
+    Returns:
+    - int: The amount in cents, rounded to the nearest cent.
+    """
+
+    if isinstance(amount, str):
+        amount = float(amount.replace("$", ""))
+
+    return round(amount * 100)
+
+
+def from_cents(cents):
+    """
+    Converts a whole number of cents to a dollar amount.
+
+    Parameters:
+    - cents (int): Amount in cents.
+
+    Returns:
+    - float: The amount in dollars, the nearest float to the exact two decimal place value.
+    """
+
+    return cents / 100
+
+
+def format_cents(cents):
+    """
+    Formats a whole number of cents for display, such as "$4.50" or "-$1.00".
+
+    Parameters:
+    - cents (int): Amount in cents.
+    """
+
+    sign = "-" if cents < 0 else ""
+    dollars, cents = divmod(abs(cents), 100)
+
+    return f"{sign}${dollars}.{cents:02d}"
+
+
+def cents_array(amounts):
+    """
+    Packs dollar amounts into a compact array of cents.
+
+    Parameters:
+    - amounts (iterable): Dollar amounts.
+
+    Returns:
+    - array: Signed 64-bit array of the amounts in cents.
+    """
+
+    return array("q", map(to_cents, amounts))
+
+
+def sum_cents(amounts):
+    """
+    Sums dollar amounts exactly.
+
+    Parameters:
+    - amounts (iterable): Dollar amounts.
+
+    Returns:
+    - int: The total in cents.
+    """
+
+    return sum(map(to_cents, amounts))
+
+
+def scale_cents(cents, numerator, denominator):
+    """
+    Scales an amount in cents by a fraction, rounding half a cent away from zero.
+
+    Parameters:
+    - cents (int): Amount in cents.
+    - numerator (int): Numerator of the fraction, such as 9 for 90%.
+    - denominator (int): Denominator of the fraction, such as 10 for 90%.
+
+    Returns:
+    - int: The scaled amount in cents.
+    """
+
+    scaled, remainder = divmod(abs(cents) * numerator, denominator)
+    if remainder * 2 >= denominator:
+        scaled += 1
+
+    return scaled if cents >= 0 else -scaled
+
+
+def allocate_cents(total_cents, weights):
+    """
+    Splits an amount in cents by weight with largest-remainder allocation, so the shares add up to the total exactly.
+
+    Each share is first rounded down, then the cents left over go one each to the shares with the largest
+    remainders (ties going to the earlier share).
+
+    Parameters:
+    - total_cents (int): Amount in cents to split.
+    - weights (list): Non-negative whole-number weight of each share, such as [1, 1, 1] for an even three-way split.
+
+    Returns:
+    - list: Share of each weight in cents.
+
+    Raises:
+    - ValueError: If there are no weights or they add up to zero.
+    """
+
+    weight_total = sum(weights)
+    if not weights or weight_total <= 0:
+        raise ValueError("Cannot allocate an amount between no shares.")
+
+    sign = -1 if total_cents < 0 else 1
+    total_cents = abs(total_cents)
+
+    shares = []
+    remainders = []
+    for index, weight in enumerate(weights):
+        share, remainder = divmod(total_cents * weight, weight_total)
+        shares.append(share)
+        remainders.append((-remainder, index))
+
+    # Hand out the cents lost to rounding down, largest remainder first
+    for _, index in sorted(remainders)[:total_cents - sum(shares)]:
+        shares[index] += 1
+
+    return [sign * share for share in shares]
+
+
+def split_cents(total_cents, share_count):
+    """
+    Splits an amount in cents evenly, so the shares add up to the total exactly.
+
+    Parameters:
+    - total_cents (int): Amount in cents to split.
+    - share_count (int): Number of shares.
+
+    Returns:
+    - list: Share of each shopper in cents, differing by at most one cent.
+    """
+
+    return allocate_cents(total_cents, [1] * share_count)
@@ -0,0 +1,202 @@
+import os
+import json  # inbuilt
+import hashlib  # inbuilt
+
+
+class ParseCache():
+    """
+    Persistent, content-addressed cache of parsed receipts.
+
+    Entries are keyed by the SHA-256 of the PDF bytes plus the parser version, so a receipt is only ever parsed
+    once per parser release. Each entry is a small compact JSON file holding the extracted items, total and
+    Everyday Extra discount. The cache is capped in size and evicts the least recently used entries first.
+
+    Attributes:
+    - __cache_dir (str): Directory the cache entries are stored in.
+    - __max_bytes (int): Size cap of the cache in bytes.
+    - __parser_version (int): Parser version that is part of every cache key.
+    - __current_bytes (int): Running size of the cache, measured on first write.
+
+    Methods:
+    - hash_file: Returns the SHA-256 hex digest of a file.
+    - get: Retrieves a cached parse result, or None on a miss.
+    - put: Stores a parse result and evicts old entries if the cache is over its size cap.
+    - evict: Removes the least recently used entries until the cache fits its size cap.
+    - clear: Removes every entry from the cache.
+    """
+
+    def __init__(self, cache_dir=None, max_bytes=16 * 1024 * 1024, parser_version=1):
+        """
+        Initializes the ParseCache object.
+
+        Parameters:
+        - cache_dir (str): Directory the cache entries are stored in, defaults to ~/.receipt_divider/parse_cache.
+        - max_bytes (int): Size cap of the cache in bytes.
+        - parser_version (int): Parser version that is part of every cache key.
+        """
+
+        self.__cache_dir = cache_dir or os.path.join(os.path.expanduser("~"), ".receipt_divider", "parse_cache")
+        self.__max_bytes = max_bytes
+        self.__parser_version = parser_version
+        self.__current_bytes = None
+
+    def get_cache_dir(self):
+        """Retrieves the directory the cache entries are stored in."""
+
+        return self.__cache_dir
+
+    def get_max_bytes(self):
+        """Retrieves the size cap of the cache in bytes."""
+
+        return self.__max_bytes
+
+    def get_parser_version(self):
+        """Retrieves the parser version that is part of every cache key."""
+
+        return self.__parser_version
+
+    def hash_file(self, file_location):
+        """
+        Returns the SHA-256 hex digest of a file.
+
+        Parameters:
+        - file_location (str): File location of the PDF receipt file.
+        """
+
+        digest = hashlib.sha256()
+
+        # Read in blocks so large receipts are never held in memory at once
+        with open(file_location, 'rb') as file:
+            for block in iter(lambda: file.read(1024 * 1024), b""):
+                digest.update(block)
+
+        return digest.hexdigest()
+
+    def __entry_path(self, digest):
+        """Returns the file location of the cache entry for the given digest."""
+
+        return os.path.join(self.__cache_dir, f"{digest}-v{self.__parser_version}.json")
+
+    def get(self, digest):
+        """
+        Retrieves a cached parse result.
+
+        Parameters:
+        - digest (str): SHA-256 hex digest of the PDF bytes.
+
+        Returns:
+        - tuple: (items found, extracted total, everyday extra discount), or None if the receipt is not cached.
+        """
+
+        entry_path = self.__entry_path(digest)
+
+        try:
+            with open(entry_path, 'r') as file:
+                entry = json.load(file)
+            result = entry["i"], entry["t"], entry["e"]
+
+            # Touch the entry so it becomes the most recently used
+            os.utime(entry_path)
+
+        except FileNotFoundError:
+            return None
+
+        # A corrupt entry, or valid JSON of the wrong shape, is treated as a miss and removed
+        except (ValueError, OSError, KeyError, TypeError):
+            self.__remove_entry(entry_path)
+            return None
+
+        return result
+
+    def put(self, digest, items_found, extracted_total, everyday_extra_discount):
+        """
+        Stores a parse result and evicts old entries if the cache is over its size cap.
+
+        Parameters:
+        - digest (str): SHA-256 hex digest of the PDF bytes.
+        - items_found (list): List of [item name, item price] pairs.
+        - extracted_total (float): Extracted total from the PDF receipt.
+        - everyday_extra_discount (float): Everyday Extra Discount applied to the receipt.
+        """
+
+        os.makedirs(self.__cache_dir, exist_ok=True)
+
+        entry_path = self.__entry_path(digest)
+        entry = json.dumps({"i": items_found, "t": extracted_total, "e": everyday_extra_discount},
+                           separators=(',', ':'))
+
+        # Measure the existing cache once, then keep a running total
+        if self.__current_bytes is None:
+            self.__current_bytes = sum(size for _, size, _ in self.__list_entries())
+
+        # Write to a temporary file first so a crash never leaves a half written entry behind
+        temp_path = f"{entry_path}.{os.getpid()}.tmp"
+        with open(temp_path, 'w') as file:
+            file.write(entry)
+
+        # Replacing an existing entry must not count its size twice
+        try:
+            self.__current_bytes -= os.path.getsize(entry_path)
+        except OSError:
+            pass
+
+        os.replace(temp_path, entry_path)
+        self.__current_bytes += len(entry)
+
+        if self.__current_bytes > self.__max_bytes:
+            self.evict()
+
+    def evict(self):
+        """Removes the least recently used entries until the cache fits its size cap."""
+
+        entries = self.__list_entries()
+        current_bytes = sum(size for _, size, _ in entries)
+
+        # Oldest access time first
+        for entry_path, size, _ in sorted(entries, key=lambda entry: entry[2]):
+            if current_bytes <= self.__max_bytes:
+                break
+
+            if self.__remove_entry(entry_path):
+                current_bytes -= size
+
+        self.__current_bytes = current_bytes
+
+    def clear(self):
+        """Removes every entry from the cache."""
+
+        for entry_path, _, _ in self.__list_entries():
+            self.__remove_entry(entry_path)
+
+        self.__current_bytes = 0
+
+    def __list_entries(self):
+        """Returns a list of (file location, size, last used time) tuples for every cache entry."""
+
+        entries = []
+
+        try:
+            with os.scandir(self.__cache_dir) as scan:
+                for dir_entry in scan:
+                    if dir_entry.name.endswith(".json"):
+                        stat = dir_entry.stat()
+                        entries.append((dir_entry.path, stat.st_size, stat.st_mtime))
+        except FileNotFoundError:
+            pass
+
+        return entries
+
+    def __remove_entry(self, entry_path):
+        """Removes a single cache entry, returning True if it was removed."""
+
+        try:
+            os.remove(entry_path)
+            return True
+        except OSError:
+            return False
+
+    def __str__(self):
+        '''Returns a user-friendly string representation of the cache.'''
+
+        return f"ParseCache(cache_dir={self.__cache_dir}, max_bytes={self.__max_bytes}, " \
+               f"parser_version={self.__parser_version})"
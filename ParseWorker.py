@@ -0,0 +1,146 @@
+import queue  # inbuilt
+import threading  # inbuilt
+
+from PipelineStats import NullStats
+from ReceiptReader import grab_items_and_price
+
+
+class ParseCancelled(Exception):
+    """Raised inside the parse when the user cancels loading the receipt."""
+
+
+class ParseProgress(NullStats):
+    """
+    Stats object reporting the pages read to a queue and stopping the parse when it is cancelled.
+
+    The PDF reader counts "pdf_pages" once the file is open and "pages" after each page is read, so those two
+    counters are all the progress there is to report. The cancel event is checked on every page, so a cancelled
+    parse stops within one page rather than at the end of the receipt.
+
+    Attributes:
+    - _messages (queue.Queue): Queue the ("progress", pages read, pages in the file) messages are put on.
+    - _cancel_event (threading.Event): Set to stop the parse.
+    - _page_total (int): Number of pages in the file, 0 until the file is open.
+    - _pages_read (int): Number of pages read so far.
+    """
+
+    __slots__ = ("_messages", "_cancel_event", "_page_total", "_pages_read")
+
+    def __init__(self, messages, cancel_event):
+        self._messages = messages
+        self._cancel_event = cancel_event
+        self._page_total = 0
+        self._pages_read = 0
+
+    def count(self, name, amount=1):
+        """Reports the pages read so far, raising ParseCancelled if the parse was cancelled."""
+
+        if name == "pdf_pages":
+            self._page_total = amount
+        elif name == "pages":
+            self._pages_read += amount
+            self._messages.put(("progress", self._pages_read, self._page_total))
+        else:
+            return
+
+        if self._cancel_event.is_set():
+            raise ParseCancelled()
+
+
+class ParseWorker():
+    """
+    Parses a receipt on a background thread so the GUI stays responsive while a large PDF loads.
+
+    The worker never touches a widget. It puts messages on a queue and the GUI drains the queue from the Tk
+    main loop with `root.after`, as tkinter may only be used from the thread that created it. The messages are:
+    - ("progress", pages read, pages in the file) after each page.
+    - ("done", (items bought, total)) once the receipt is parsed.
+    - ("cancelled", None) if the parse was cancelled.
+    - ("error", exception) if the receipt could not be parsed.
+
+    Attributes:
+    - __file_location (str): File location of the PDF receipt file.
+    - __messages (queue.Queue): Messages from the worker thread to the GUI.
+    - __cancel_event (threading.Event): Set to stop the parse at the next page.
+    - __thread (threading.Thread): The worker thread, None until started.
+
+    Methods:
+    - start: Starts parsing the receipt on the worker thread.
+    - cancel: Asks the worker to stop at the next page.
+    - poll: Retrieves the messages put on the queue since the last poll, without waiting.
+    - is_running: Checks whether the worker thread is still parsing.
+    - get_file_location: Retrieves the file location of the PDF receipt file.
+    """
+
+    def __init__(self, file_location):
+        """
+        Initializes the ParseWorker object without starting it.
+
+        Parameters:
+        - file_location (str): File location of the PDF receipt file.
+        """
+
+        self.__file_location = file_location
+        self.__messages = queue.Queue()
+        self.__cancel_event = threading.Event()
+        self.__thread = None
+
+    def __run(self):
+        """Parses the receipt and puts the result on the queue, run on the worker thread."""
+
+        progress = ParseProgress(self.__messages, self.__cancel_event)
+
+        try:
+            result = grab_items_and_price(self.__file_location, stats=progress)
+        except ParseCancelled:
+            self.__messages.put(("cancelled", None))
+        except Exception as error:
+            self.__messages.put(("error", error))
+        else:
+            # A cancel after the last page still wins, the user has already left the loading page
+            if self.__cancel_event.is_set():
+                self.__messages.put(("cancelled", None))
+            else:
+                self.__messages.put(("done", result))
+
+    def start(self):
+        """Starts parsing the receipt on a daemon thread, so closing the window never waits for it."""
+
+        self.__thread = threading.Thread(target=self.__run, name="ParseWorker", daemon=True)
+        self.__thread.start()
+
+    def cancel(self):
+        """Asks the worker to stop at the next page."""
+
+        self.__cancel_event.set()
+
+    def poll(self):
+        """
+        Retrieves the messages put on the queue since the last poll, without waiting.
+
+        Returns:
+        - list: (kind, ...) message tuples, oldest first.
+        """
+
+        messages = []
+
+        while True:
+            try:
+                messages.append(self.__messages.get_nowait())
+            except queue.Empty:
+                return messages
+
+    def is_running(self):
+        """Checks whether the worker thread is still parsing."""
+
+        return self.__thread is not None and self.__thread.is_alive()
+
+    def get_file_location(self):
+        """Retrieves the file location of the PDF receipt file."""
+
+        return self.__file_location
+
+    def __repr__(self):
+        '''Return the data associated with the worker.'''
+
+        return f"ParseWorker(file_location={self.__file_location}, running={self.is_running()})"
@@ -0,0 +1,249 @@
+import json
+import time  # inbuilt
+import tracemalloc  # inbuilt
+
+
+class PipelineStats():
+    """
+    Class collecting stage timings, counters and peak memory samples from the receipt pipeline.
+
+    Stage timers are exclusive: stages are kept on a stack, and while a nested stage runs (such as `get_text`
+    pulled in by `identify_item`) the time is charged to the nested stage only, so the stage times add up to
+    the wall time of the outermost stage.
+
+    Attributes:
+    - __jsonl_file (str): File location records are appended to as JSON lines, None to keep them in memory only.
+    - __trace_memory (bool): If True, tracemalloc is started and the peak memory is sampled at the end of each stage.
+    - __stage_times (dict): Exclusive seconds spent in each stage, keyed by stage name.
+    - __stage_calls (dict): Number of times each stage was entered, keyed by stage name.
+    - __counters (dict): Counts such as lines, items and discounts, keyed by counter name.
+    - __memory_samples (dict): Peak traced memory in bytes seen at the end of each stage, keyed by stage name.
+    - __stage_stack (list): [stage name, start time] of each stage currently running, innermost last.
+
+    Methods:
+    - is_enabled: Checks whether the stats are being collected.
+    - stage: Times a stage of the pipeline, used as a context manager.
+    - start_stage, end_stage: Push and pop a stage directly, for code that cannot use a with block.
+    - count: Adds to a counter.
+    - get_stage_times, get_stage_calls, get_counters, get_memory_samples, get_peak_memory: Retrieve the stats.
+    - to_dict: Returns the stats as a dictionary.
+    - write_record: Appends the stats to the JSON lines file.
+    - reset: Clears the stats collected so far.
+    - __str__: Returns a user-friendly table of the stage times and counters.
+    """
+
+    def __init__(self, jsonl_file=None, trace_memory=False):
+        """
+        Initializes the PipelineStats object.
+
+        Parameters:
+        - jsonl_file (str): File location records are appended to as JSON lines, None to keep them in memory only.
+        - trace_memory (bool): If True, tracemalloc is started and the peak memory is sampled at the end of each
+          stage. Tracing slows Python allocations down, so it is off by default.
+        """
+
+        self.__jsonl_file = jsonl_file
+        self.__trace_memory = trace_memory
+        self.__stage_stack = []
+        self.reset()
+
+        if trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    def is_enabled(self):
+        """Returns True, the stats are being collected."""
+
+        return True
+
+    def stage(self, name):
+        """
+        Times a stage of the pipeline, used as a context manager.
+
+        Parameters:
+        - name (str): Name of the stage, such as "fitz.open" or "identify_item".
+        """
+
+        return _StageTimer(self, name)
+
+    def start_stage(self, name):
+        """Pushes a stage onto the stack, pausing the stage it is nested in."""
+
+        now = time.perf_counter()
+
+        # Charge the time so far to the enclosing stage
+        if self.__stage_stack:
+            parent = self.__stage_stack[-1]
+            self.__stage_times[parent[0]] += now - parent[1]
+
+        self.__stage_stack.append([name, now])
+        self.__stage_times.setdefault(name, 0.0)
+        self.__stage_calls[name] = self.__stage_calls.get(name, 0) + 1
+
+    def end_stage(self):
+        """Pops the innermost stage off the stack, resuming the stage it is nested in."""
+
+        now = time.perf_counter()
+        name, start_time = self.__stage_stack.pop()
+        self.__stage_times[name] += now - start_time
+
+        # The enclosing stage restarts its clock
+        if self.__stage_stack:
+            self.__stage_stack[-1][1] = now
+
+        if self.__trace_memory and tracemalloc.is_tracing():
+            peak_memory = tracemalloc.get_traced_memory()[1]
+            self.__memory_samples[name] = max(self.__memory_samples.get(name, 0), peak_memory)
+
+    def count(self, name, amount=1):
+        """
+        Adds to a counter.
+
+        Parameters:
+        - name (str): Name of the counter, such as "lines" or "items".
+        - amount (int): Amount added to the counter.
+        """
+
+        self.__counters[name] = self.__counters.get(name, 0) + amount
+
+    def get_stage_times(self):
+        """Retrieves the exclusive seconds spent in each stage."""
+
+        return self.__stage_times
+
+    def get_stage_calls(self):
+        """Retrieves the number of times each stage was entered."""
+
+        return self.__stage_calls
+
+    def get_counters(self):
+        """Retrieves the counters."""
+
+        return self.__counters
+
+    def get_memory_samples(self):
+        """Retrieves the peak traced memory in bytes seen at the end of each stage."""
+
+        return self.__memory_samples
+
+    def get_peak_memory(self):
+        """Retrieves the highest peak traced memory in bytes sampled, 0 if memory is not traced."""
+
+        return max(self.__memory_samples.values(), default=0)
+
+    def to_dict(self):
+        """Returns the stats as a dictionary."""
+
+        return {"stage_times": dict(self.__stage_times),
+                "stage_calls": dict(self.__stage_calls),
+                "counters": dict(self.__counters),
+                "peak_memory": dict(self.__memory_samples)}
+
+    def write_record(self, **fields):
+        """
+        Appends the stats to the JSON lines file, one line per call.
+
+        Parameters:
+        - fields: Extra fields stored with the record, such as the receipt's file location.
+
+        Returns:
+        - dict: The record written.
+        """
+
+        record = dict(fields, timestamp=time.time(), **self.to_dict())
+
+        if self.__jsonl_file is not None:
+            with open(self.__jsonl_file, "a") as file:
+                file.write(json.dumps(record) + "\n")
+
+        return record
+
+    def reset(self):
+        """Clears the stats collected so far."""
+
+        self.__stage_times = {}
+        self.__stage_calls = {}
+        self.__counters = {}
+        self.__memory_samples = {}
+
+        if self.__trace_memory and tracemalloc.is_tracing():
+            tracemalloc.reset_peak()
+
+    def __str__(self):
+        '''Returns a user-friendly table of the stage times and counters.'''
+
+        stats_str = "Stage                        Time (ms)  Calls\n"
+        for name, seconds in sorted(self.__stage_times.items(), key=lambda stage: -stage[1]):
+            stats_str += f"{name:<27}{seconds * 1000:>11.3f}{self.__stage_calls[name]:>7}\n"
+
+        for name, amount in self.__counters.items():
+            stats_str += f"{name}: {amount}\n"
+
+        if self.__memory_samples:
+            stats_str += f"Peak memory: {self.get_peak_memory() / 1024:.1f} KiB\n"
+
+        return stats_str
+
+
+class _StageTimer():
+    """Context manager timing one stage of a PipelineStats object."""
+
+    __slots__ = ("_stats", "_name")
+
+    def __init__(self, stats, name):
+        self._stats = stats
+        self._name = name
+
+    def __enter__(self):
+        self._stats.start_stage(self._name)
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._stats.end_stage()
+
+
+class _NullStageTimer():
+    """Context manager that does nothing, shared by every stage of a NullStats object."""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        pass
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        pass
+
+
+_NULL_STAGE_TIMER = _NullStageTimer()
+
+
+class NullStats():
+    """
+    Stand-in for PipelineStats used when instrumentation is off.
+
+    Every method does nothing and `stage` returns one shared context manager, so the pipeline can call the
+    stats unconditionally for next to no cost.
+    """
+
+    __slots__ = ()
+
+    def is_enabled(self):
+        """Returns False, no stats are collected."""
+
+        return False
+
+    def stage(self, name):
+        """Returns a context manager that does nothing."""
+
+        return _NULL_STAGE_TIMER
+
+    def count(self, name, amount=1):
+        """Does nothing."""
+
+    def write_record(self, **fields):
+        """Does nothing."""
+
+    def reset(self):
+        """Does nothing."""
+
+
+# Shared instance used wherever no stats object is given
+NULL_STATS = NullStats()
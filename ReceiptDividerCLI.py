@@ -0,0 +1,365 @@
+import sys
+import json
+import argparse  # inbuilt
+
+# Heavy modules (PyMuPDF, tkinter) are only imported by the commands that need them, so the command line starts
+# fast and runs on machines without a display.
+
+
+def build_parser():
+    """
+    Builds the argument parser of the command line.
+
+    Returns:
+    - argparse.ArgumentParser: Parser with the parse, divide, bulk, settle, shoppers, batch, watch and serve commands.
+    """
+
+    parser = argparse.ArgumentParser(prog="ReceiptDividerCLI",
+                                     description="Headless Receipt Divider: parse and divide receipts without the menu or GUI.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    parse_command = commands.add_parser("parse", help="Parse a receipt and display its items.")
+    parse_command.add_argument("receipt", help="File location of the PDF receipt.")
+    parse_command.add_argument("--words", action="store_true", help="Extract the receipt from its word boxes.")
+    parse_command.add_argument("--profile", help="Retailer profile to use instead of detecting it.")
+    parse_command.add_argument("--no-cache", action="store_true", help="Bypass the parse cache.")
+    parse_command.add_argument("--json", action="store_true", help="Display the items as JSON.")
+    parse_command.add_argument("--stats", action="store_true", help="Display the time spent in each stage.")
+    parse_command.add_argument("--stats-file", help="Append the stage timings and counters to a JSON lines file.")
+    parse_command.add_argument("--trace-memory", action="store_true", help="Sample the peak memory of each stage.")
+
+    divide_command = commands.add_parser("divide", help="Divide a receipt from an assignment file.")
+    divide_command.add_argument("receipt", help="File location of the PDF receipt.")
+    divide_command.add_argument("assignment", help='JSON file: {"paid": name, "shoppers": [names], "items": {"3": name}, '
+                                                   '"patterns": {"*milk*": name}, "default": "Combined"}')
+    divide_command.add_argument("--shoppers-file", default="shoppers.txt", help="File of registered shoppers.")
+    divide_command.add_argument("--database", help="SQLite database to use instead of the shoppers file.")
+    divide_command.add_argument("--json", action="store_true", help="Display the owings as JSON.")
+    divide_command.add_argument("--save", action="store_true",
+                                help="Add the owings to each shopper's spending tracker and remember who took each item.")
+
+    bulk_command = commands.add_parser("bulk", help="Divide a folder or glob of receipts with one assignment file.")
+    bulk_command.add_argument("assignment", help="JSON assignment file, as for divide.")
+    bulk_command.add_argument("source", help="Directory or glob pattern of PDF receipts.")
+    bulk_command.add_argument("--workers", type=int, help="Number of worker processes parsing the receipts.")
+    bulk_command.add_argument("--json", action="store_true", help="Display the owings of each receipt as JSON lines.")
+    bulk_command.add_argument("--shoppers-file", default="shoppers.txt", help="File of registered shoppers.")
+    bulk_command.add_argument("--database", help="SQLite database to use instead of the shoppers file.")
+    bulk_command.add_argument("--save", action="store_true",
+                              help="Add the run's spending to each shopper's tracker, and the receipts to the database.")
+
+    settle_command = commands.add_parser("settle",
+                                         help="Settle receipts paid by different shoppers in as few transfers as possible.")
+    settle_command.add_argument("owings", nargs="+",
+                                help="JSON lines files of owings, as written by divide or bulk with --json, or - for stdin.")
+    settle_command.add_argument("--json", action="store_true", help="Display the transfers as JSON.")
+
+    shoppers_command = commands.add_parser("shoppers", help="Display the registered shoppers.")
+    shoppers_command.add_argument("--shoppers-file", default="shoppers.txt", help="File of registered shoppers.")
+    shoppers_command.add_argument("--database", help="SQLite database to use instead of the shoppers file.")
+
+    batch_command = commands.add_parser("batch", help="Parse a folder or glob of receipts in parallel.")
+    batch_command.add_argument("source", help="Directory or glob pattern of PDF receipts.")
+    batch_command.add_argument("--workers", help="Number of worker processes.")
+
+    watch_command = commands.add_parser("watch", help="Parse new receipts into the parse cache as they are downloaded.")
+    watch_command.add_argument("folders", nargs="*", default=["~/Downloads"], help="Folders to watch.")
+    watch_command.add_argument("--workers", type=int, help="Number of worker processes parsing the receipts.")
+    watch_command.add_argument("--settle", type=float, default=1.0,
+                               help="Seconds a file must stay unchanged before it is parsed.")
+    watch_command.add_argument("--poll-interval", type=float, default=2.0,
+                               help="Seconds between listings when the folders are polled.")
+    watch_command.add_argument("--polling", action="store_true", help="Poll the folders even if inotify is available.")
+    watch_command.add_argument("--once", action="store_true",
+                               help="Parse the receipts already in the folders, then stop.")
+
+    serve_command = commands.add_parser("serve", help="Serve parse, divide, settle and shoppers over HTTP.")
+    serve_command.add_argument("--host", default="127.0.0.1",
+                               help="Address to listen on, 0.0.0.0 to serve other devices on the LAN.")
+    serve_command.add_argument("--port", type=int, default=8080, help="Port to listen on.")
+    serve_command.add_argument("--workers", type=int, help="Number of worker processes parsing and dividing.")
+    serve_command.add_argument("--queue", type=int,
+                               help="Number of jobs allowed to wait for a worker before answering 503.")
+    serve_command.add_argument("--upload-dir", help="Folder to keep the uploaded receipts in.")
+    serve_command.add_argument("--shoppers-file", default="shoppers.txt", help="File of registered shoppers.")
+    serve_command.add_argument("--database", help="SQLite database to use instead of the shoppers file.")
+
+    return parser
+
+
+def parse_command(args):
+    """Parses a receipt and displays its items."""
+
+    from ReceiptDividerRev2 import PDFReader, PARSER_VERSION
+    from ParseCache import ParseCache
+    from PipelineStats import PipelineStats
+    from RetailerProfiles import UnsupportedReceiptError
+
+    stats = None
+    if args.stats or args.stats_file or args.trace_memory:
+        stats = PipelineStats(args.stats_file, args.trace_memory)
+
+    # An unknown --profile is rejected when the reader is built, an unrecognised layout once the file is read
+    try:
+        scanner = PDFReader(args.receipt,
+                            parse_cache=None if args.no_cache else ParseCache(parser_version=PARSER_VERSION),
+                            extraction_mode="words" if args.words else "text",
+                            profile=args.profile,
+                            stats=stats)
+
+        if stats is not None:
+            with stats.stage("read_file"):
+                scanner.read_file()
+            stats.write_record(file=args.receipt, extraction_mode=scanner.get_extraction_mode())
+        else:
+            scanner.read_file()
+    except UnsupportedReceiptError as e:
+        print(f"UNSUPPORTED_RECEIPT_ERROR: {e}", file=sys.stderr)
+        return 2
+
+    # A missing or unreadable file, or one PyMuPDF cannot open, whose errors are RuntimeErrors
+    except (OSError, RuntimeError) as e:
+        print(f"RECEIPT_FILE_ERROR: {args.receipt} could not be read: {e}", file=sys.stderr)
+        return 2
+
+    if args.json:
+        print(json.dumps({"items": [item.to_item_data() for item in scanner.get_prepped_item_data().values()],
+                          "total": scanner.get_extracted_total(),
+                          "everyday_extra_discount": scanner.get_everyday_extra_discount()}))
+    else:
+        scanner.set_digi_receipt()
+        print(scanner.get_digi_receipt())
+
+    if stats is not None:
+        print(stats, file=sys.stderr)
+
+    return 0
+
+
+def open_storage(args):
+    """Opens the SQLite database given with --database, None to use the shoppers file."""
+
+    if not args.database:
+        return None
+
+    from SQLiteStorage import SQLiteStorage
+
+    return SQLiteStorage(args.database)
+
+
+def divide_command(args):
+    """Divides a receipt between shoppers from an assignment file and displays the owings."""
+
+    from ReceiptDividerRev2 import ReceiptDivider
+    from AssignmentSpec import AssignmentSpec
+    from Money import to_cents
+    from RetailerProfiles import UnsupportedReceiptError
+
+    try:
+        assignment_spec = AssignmentSpec.load(args.assignment)
+    except (ValueError, KeyError) as e:
+        print(f"ASSIGNMENT_ERROR: {e}", file=sys.stderr)
+        return 2
+
+    receipt_divider = ReceiptDivider()
+    receipt_divider.set_storage(open_storage(args))
+    receipt_divider.retreive_existing_shoppers(args.shoppers_file)
+
+    try:
+        receipt_divider.scan_receipt(args.receipt)
+    except UnsupportedReceiptError as e:
+        print(f"UNSUPPORTED_RECEIPT_ERROR: {e}", file=sys.stderr)
+        return 2
+
+    # A missing or unreadable file, or one PyMuPDF cannot open, whose errors are RuntimeErrors
+    except (OSError, RuntimeError) as e:
+        print(f"RECEIPT_FILE_ERROR: {args.receipt} could not be read: {e}", file=sys.stderr)
+        return 2
+
+    try:
+        owings = receipt_divider.divide_receipt_by_spec(assignment_spec)
+    except ValueError as e:
+        print(f"ASSIGNMENT_ERROR: {e}", file=sys.stderr)
+        return 2
+
+    if args.json:
+        print(json.dumps(owings))
+    else:
+        print(receipt_divider.format_owings(owings))
+
+    # Update the personal spending trackers, saved to the shopper journal or the database with the receipt
+    if args.save:
+        receipt_divider.record_spending({shopper.get_name(): to_cents(shopper.get_cart_total())
+                                         for shopper in receipt_divider.get_shoppers_in_receipt().values()
+                                         if not shopper.is_main_shopping_cart()}, args.shoppers_file)
+        receipt_divider.record_assignment_history()
+        receipt_divider.store_receipt(owings["payer"])
+
+    return 0
+
+
+def bulk_command(args):
+    """Divides every receipt in a folder or glob with one assignment file."""
+
+    from BatchScanner import BatchScanner
+    from BulkDivide import BulkDivider
+    from AssignmentSpec import AssignmentSpec
+    from ParseCache import ParseCache
+    from ReceiptDividerRev2 import ReceiptDivider, PARSER_VERSION
+    from Money import to_cents
+
+    try:
+        assignment_spec = AssignmentSpec.load(args.assignment)
+    except (ValueError, KeyError) as e:
+        print(f"ASSIGNMENT_ERROR: {e}", file=sys.stderr)
+        return 2
+
+    file_locations = BatchScanner().find_receipt_files(args.source)
+    if not file_locations:
+        print(f"No receipt files found for '{args.source}'.", file=sys.stderr)
+        return 1
+
+    storage = open_storage(args)
+    bulk_divider = BulkDivider(assignment_spec, args.workers, ParseCache(parser_version=PARSER_VERSION),
+                               storage if args.save else None)
+    divided_receipts, divide_errors = bulk_divider.divide_files(file_locations)
+
+    # Display the owings of each receipt followed by the receipts that could not be divided
+    for file_location, owings in divided_receipts:
+        if args.json:
+            print(json.dumps(dict(owings, file=file_location)))
+        else:
+            owed = ", ".join(f"{name} owes ${amount:.2f}" for name, amount in owings["owings"].items())
+            print(f"{file_location}: {owings['payer']} paid, {owed or 'nothing owed'}")
+
+    for file_location, error in divide_errors:
+        print(f"FAILED {file_location}: {error}", file=sys.stderr)
+
+    if not args.json:
+        from Settlement import format_transfers
+
+        print("\nSettle up:")
+        print(format_transfers(bulk_divider.get_settlement_ledger().settle()), end="")
+
+    print(bulk_divider, file=sys.stderr)
+
+    # Update the personal spending trackers with the whole run, saved to the shopper journal in one append
+    if args.save:
+        receipt_divider = ReceiptDivider()
+        receipt_divider.set_storage(storage)
+        receipt_divider.retreive_existing_shoppers(args.shoppers_file)
+        receipt_divider.record_spending({shopper_name: to_cents(spent)
+                                         for shopper_name, spent in bulk_divider.get_spending_totals().items()},
+                                        args.shoppers_file)
+
+    return 0 if not divide_errors else 2
+
+
+def settle_command(args):
+    """Settles the owings of many receipts, paid by different shoppers, in as few transfers as possible."""
+
+    from Settlement import SettlementLedger, format_transfers
+
+    settlement_ledger = SettlementLedger()
+    skipped_lines = 0
+
+    for file_location in args.owings:
+        file = sys.stdin if file_location == "-" else open(file_location, "r")
+
+        try:
+            for line_num, line in enumerate(file, 1):
+                if not line.strip():
+                    continue
+
+                # A line that is not a set of owings is reported and skipped, the rest are still settled
+                try:
+                    settlement_ledger.add_owings(json.loads(line))
+                except (ValueError, KeyError, TypeError, AttributeError) as e:
+                    print(f"OWINGS_ERROR: Line {line_num} of {file_location} is not a set of owings, skipped. {e}",
+                          file=sys.stderr)
+                    skipped_lines += 1
+        finally:
+            if file is not sys.stdin:
+                file.close()
+
+    transfers = settlement_ledger.settle()
+
+    if args.json:
+        print(json.dumps([{"from": debtor, "to": creditor, "amount": cents / 100}
+                          for debtor, creditor, cents in transfers]))
+    else:
+        print(f"{settlement_ledger.get_receipt_count()} receipt(s) settled in {len(transfers)} transfer(s).")
+        print(format_transfers(transfers), end="")
+
+    return 0 if not skipped_lines else 2
+
+
+def shoppers_command(args):
+    """Displays the registered shoppers."""
+
+    from ReceiptDividerRev2 import ReceiptDivider
+
+    receipt_divider = ReceiptDivider()
+    receipt_divider.set_storage(open_storage(args))
+    receipt_divider.retreive_existing_shoppers(args.shoppers_file)
+    receipt_divider.show_registered_shoppers()
+
+    return 0
+
+
+def batch_command(args):
+    """Parses a folder or glob of receipts in parallel."""
+
+    import BatchScanner
+
+    return BatchScanner.main([args.source] + ([args.workers] if args.workers else []))
+
+
+def watch_command(args):
+    """Watches folders and parses new receipts into the parse cache until interrupted."""
+
+    from WatchDaemon import WatchDaemon
+
+    watch_daemon = WatchDaemon(args.folders, max_workers=args.workers, settle_time=args.settle,
+                               poll_interval=args.poll_interval, use_inotify=not args.polling)
+    watch_daemon.run(once=args.once)
+    print(watch_daemon)
+
+    return 0 if not watch_daemon.get_parse_errors() else 2
+
+
+def serve_command(args):
+    """Serves the divider over HTTP until interrupted."""
+
+    from ReceiptService import ReceiptService
+
+    receipt_service = ReceiptService(args.host, args.port, args.workers, args.queue, args.upload_dir,
+                                     args.shoppers_file, args.database)
+    receipt_service.run()
+    print(receipt_service)
+
+    return 0
+
+
+COMMANDS = {"parse": parse_command,
+            "divide": divide_command,
+            "bulk": bulk_command,
+            "settle": settle_command,
+            "shoppers": shoppers_command,
+            "batch": batch_command,
+            "watch": watch_command,
+            "serve": serve_command}
+
+
+def main(argv=None):
+    """
+    Command line entry point: python ReceiptDividerCLI.py <parse|divide|bulk|settle|shoppers|batch|watch|serve> ...
+    """
+
+    args = build_parser().parse_args(sys.argv[1:] if argv is None else argv)
+
+    return COMMANDS[args.command](args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
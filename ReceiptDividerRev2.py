@@ -1,7 +1,25 @@
 import os
-import fitz  # pip install PyMuPDF
-from tkinter import Tk, filedialog  # inbuilt
+import sys
 import time  # inbuilt
+import itertools  # inbuilt
+
+from ParseCache import ParseCache
+from Money import to_cents, from_cents, format_cents, scale_cents, split_cents
+from PipelineStats import NULL_STATS
+from ItemTable import ItemTable, describe_item
+from AssignmentIndex import AssignmentIndex
+from AssignmentRules import AssignmentRules
+from AssignmentHistory import AssignmentHistory
+from Settlement import SettlementLedger
+from ShopperJournal import ShopperJournal
+from ReceiptStream import iter_pdf_lines
+from ColumnExtractor import WordBoxExtractor
+from ReceiptTokenizer import LineTokenizer, EVERYDAY_EXTRA
+from DiscountEngine import DiscountResolver
+from RetailerProfiles import DETECTION_LINES, detect_profile, get_profile
+
+# Bump whenever a parser change alters the extracted data, so stale cache entries are ignored
+PARSER_VERSION = 3
 
 
 class PDFReader():
@@ -10,24 +28,31 @@ class PDFReader():
 
     Attributes:
     - __file_location (str): File location of the PDF receipt file.
-    - __header_rows (int): Number of rows in the receipt used for the header.
+    - __header_rows (int): Number of rows in the receipt used for the header, None to use the retailer profile's.
     - __extracted_total (float): Extracted total from the PDF receipt.
     - __everyday_extra_discount (float): Everyday Extra Discount applied to the receipt.
-    - __prepped_item_data (dict): Prepped data of grocery items extracted from the PDF.
+    - __prepped_item_data (ReceiptItems): Prepped data of grocery items extracted from the PDF, keyed by item number.
+    - __item_table (ItemTable): Columnar table the receipt's items are stored in, which may be shared between readers.
     - __digi_receipt (Receipt): Receipt object created from the extracted data.
+    - __parse_cache (ParseCache): Optional on-disk cache of parse results keyed by the PDF hash.
+    - __extraction_mode (str): "text" to split columns on runs of spaces, or "words" to split them by word box position.
+    - __profile (RetailerProfile): Layout settings of the receipt's retailer, detected from the receipt if not set.
+    - __discount_resolver (DiscountResolver): Tokenizes the item lines and resolves their discounts.
+    - __stats (PipelineStats): Collects stage timings and counters, NULL_STATS when instrumentation is off.
 
     Methods:
-    - read_file: Extracts text data from the PDF and identifies items and discounts.
+    - read_file: Extracts text data from the PDF (or the parse cache) and identifies items and discounts.
+    - parse_file: Extracts text data from the PDF, bypassing the parse cache.
     - identify_item: Identifies a single object (item or discount) in the receipt.
-    - discount_handling: Handles discounts in the unprocessed item list.
+    - discount_handling: Resolves the discounts in the unprocessed item list onto their items.
     - get_extracted_total: Retrieves the extracted total from the PDF receipt.
     - set_extracted_total: Sets the extracted total.
     - extract_discount: Extracts the discount value from a line.
     - set_digi_receipt: Sets the Digi Receipt object.
     - get_digi_receipt: Retrieves the Digi Receipt object.
     - extract_price_or_discount: Extracts the price value from a line.
-    - data_prep: Prepares data by extracting items and prices.
-    - create_item_dict: Creates a dictionary of grocery items from the identified data.
+    - data_prep: Prepares data by extracting items, prices and discount breakdowns.
+    - create_item_dict: Adds the identified items to the item table and sets the mapping of their item views.
     - set_file_location: Sets the file location of the PDF receipt file.
     - get_file_location: Retrieves the file location of the PDF receipt file.
     - set_header_rows: Sets the number of rows in the receipt used for the header.
@@ -36,17 +61,35 @@ class PDFReader():
     - set_prepped_item_data: Sets the prepped data of grocery items.
     - get_everyday_extra_discount: Retrieves the Everyday Extra Discount applied to the receipt.
     - set_everyday_extra_discount: Sets the Everyday Extra Discount.
+    - get_extraction_mode: Retrieves the extraction mode.
+    - set_extraction_mode: Sets the extraction mode.
+    - get_profile: Retrieves the retailer profile.
+    - set_profile: Sets the retailer profile.
+    - get_parse_cache: Retrieves the parse cache.
+    - set_parse_cache: Sets the parse cache.
+    - get_item_table: Retrieves the item table.
+    - set_item_table: Sets the item table.
+    - get_stats: Retrieves the stats object.
+    - set_stats: Sets the stats object.
     - __str__: Returns a user-friendly string representation of the contents of the PDF File.
     - __repr__: Returns a list of the items identified within the list.
     """
 
-    def __init__(self, file_location=None, header_rows=4):  # 4 is the header space for woolworths digi recipets
+    def __init__(self, file_location=None, header_rows=None, parse_cache=None, extraction_mode="text", profile=None,
+                 stats=None, item_table=None):
         """
         Initializes the PDFReader object.
 
         Parameters:
         - file_location (str): File location of the PDF receipt file.
-        - header_rows (int): Number of rows in the receipt used for the header.
+        - header_rows (int): Number of rows in the receipt used for the header, defaults to the retailer profile's.
+        - parse_cache (ParseCache): Optional on-disk cache of parse results keyed by the PDF hash.
+        - extraction_mode (str): "text" to split the columns on runs of spaces in the page text, or "words" to
+          split them by the x-position of the PyMuPDF word boxes.
+        - profile (str or RetailerProfile): Retailer profile of the receipt, detected from the receipt if not given.
+        - stats (PipelineStats): Collects stage timings and counters, instrumentation is off if not given.
+        - item_table (ItemTable): Table to store the receipt's items in, such as one shared by an archive of
+          receipts. A new table is created if not given.
         """
         
         self.__file_location = file_location
@@ -55,6 +98,15 @@ class PDFReader():
         self.__everyday_extra_discount = 0.0
         self.__prepped_item_data = None
         self.__digi_receipt = None
+        self.__parse_cache = parse_cache
+        self.__extraction_mode = extraction_mode
+        self.__profile = None
+        self.__discount_resolver = None
+        self.__stats = stats if stats is not None else NULL_STATS
+        self.__item_table = item_table if item_table is not None else ItemTable()
+
+        if profile is not None:
+            self.set_profile(profile)
         
 
     def read_file(self):
@@ -63,49 +115,135 @@ class PDFReader():
 
         Note:
         This method updates the internal state by identifying items and discounts from the PDF text.
+        If a parse cache is set and already holds this receipt, the PDF is never opened.
         """
 
-        doc = fitz.open(self.get_file_location())
+        parse_cache = self.get_parse_cache()
+        stats = self.get_stats()
 
-        for page in doc:
-            text = page.get_text("text")
+        # Serve the receipt straight from the cache when it has been parsed before
+        if parse_cache is not None:
+            with stats.stage("cache_lookup"):
+                digest = parse_cache.hash_file(self.get_file_location())
+                cached_result = parse_cache.get(digest)
 
-        # Split the text into lines
-        lines = text.split('\n')
+            if cached_result is not None:
+                stats.count("cache_hits")
+                items_found, extracted_total, everyday_extra_discount = cached_result
+                self.set_extracted_total(extracted_total)
+                self.set_everyday_extra_discount(everyday_extra_discount)
 
-        # Identify the items and discounts
-        self.identify_item(lines)
+                with stats.stage("create_item_dict"):
+                    self.create_item_dict(items_found)
+                return
+
+            stats.count("cache_misses")
+
+        self.parse_file()
+
+        # Store the result so the next read of the same receipt skips the PDF entirely
+        if parse_cache is not None:
+            with stats.stage("cache_store"):
+                items_found = [item.to_item_data() for item in self.get_prepped_item_data().values()]
+                parse_cache.put(digest, items_found, self.get_extracted_total(), self.get_everyday_extra_discount())
+
+    def parse_file(self):
+        """
+        Opens the PDF file and streams its text data page by page into `identify_item`, bypassing the parse cache.
+        """
+
+        stats = self.get_stats()
+
+        with stats.stage("fitz.open"):
+
+            # Imported here so scripts that never open a PDF, such as those served by the parse cache, start fast.
+            # Newer PyMuPDF releases print a deprecation notice to stdout on `import fitz`, which would end up in
+            # the command line's JSON output, so the pymupdf name is used where it exists
+            try:
+                import pymupdf as fitz  # pip install PyMuPDF
+            except ImportError:
+                import fitz
+
+            doc = fitz.open(self.get_file_location())
+
+        # Pages in the file, against the "pages" actually read before the receipt total was found
+        stats.count("pdf_pages", doc.page_count)
+
+        with doc:
+
+            # Rebuild the lines from the word boxes, or take them straight from the page text
+            if self.get_extraction_mode() == "words":
+                lines = WordBoxExtractor().iter_lines(doc, stats)
+            else:
+                lines = iter_pdf_lines(doc, stats)
+
+            # Identify the items and discounts, reading each page only when it is needed
+            with stats.stage("identify_item"):
+                self.identify_item(lines)
 
     def identify_item(self, unsorted_data_list):
         """
         Identifies a single object in the receipt from the given unsorted data list.
 
         Args:
-        - unsorted_data_list (list): List of strings containing unsorted data from the PDF.
+        - unsorted_data_list (iterable): List or generator of strings containing unsorted data from the PDF.
 
         Note:
         This method updates the internal state by setting the extracted total and performs discount handling.
+        Lines are consumed in a single pass and reading stops as soon as both the end of the items and the
+        receipt total have been found, so the remaining pages of a long receipt are never extracted.
+        An item whose name ends a page carries over to the price line at the top of the next page.
         """
 
         found_total = False
+        items_finished = False
         items_and_price_list = []
         current_item = ""
+        lines = iter(unsorted_data_list)
+
+        # Detect the retailer from the first few lines of page 1, rejecting unknown layouts before reading on
+        first_lines = list(itertools.islice(lines, DETECTION_LINES))
+        if self.get_profile() is None:
+            self.set_profile(detect_profile(first_lines))
+
+        profile = self.get_profile()
+        stop_markers = profile.get_stop_markers()
+        total_marker = profile.get_total_marker()
+        skip_prefixes = profile.get_skip_prefixes()
 
         # Identifying the items and price
-        for line in unsorted_data_list[self.get_header_rows():]:
-            
-            # Break the loop if the line starts with "^Promotional Price" or "SUBTOTAL" 
-            if "SUBTOTAL" in line or "^Promotional Price" in line:
+        for line in itertools.islice(itertools.chain(first_lines, lines), self.get_header_rows(), None):
+
+            # Search for the receipt total
+            if total_marker in line and not found_total:
+                total = self.extract_price_or_discount(line)
+                found_total = True
+                self.set_extracted_total(total)
+
+            # Stop reading once there is nothing left to find
+            if found_total and items_finished:
                 break
 
-            # Check if the line ends with spaces and is not a price reduced line
-            if line.endswith("  ") and not line.strip().startswith("PRICE REDUCED"):
-                current_item = line.strip()  # Set the current item
+            # Skip the remaining lines if the items have ended, they are only searched for the total
+            if items_finished:
+                continue
+
+            # Stop collecting items at the end of the item section, such as "^Promotional Price" or "SUBTOTAL"
+            if any(marker in line for marker in stop_markers):
+                items_finished = True
+
+            # Skip blank lines, such as those left at page breaks
+            elif not line.strip():
+                pass
 
-            # Check if the line starts with "PRICE REDUCED"
-            elif line.strip().startswith("PRICE REDUCED"):
+            # Check if the line is neither an item nor a discount, such as "PRICE REDUCED"
+            elif line.strip().startswith(skip_prefixes):
                 pass
 
+            # Check if the line ends with spaces, making it an item name continued on the next line
+            elif line.endswith("  "):
+                current_item = line.strip()  # Set the current item
+
             # If the line doesn't end with spaces, it is a new item
             else:
                 # If current_item is not empty, it means there's a preceding item
@@ -124,69 +262,40 @@ class PDFReader():
         if current_item:
             items_and_price_list.append(current_item)
 
-        # Search for the receipt total
-        for line in unsorted_data_list[self.get_header_rows():]:
-            if " TOTAL " in line and not found_total:
-                total = self.extract_price_or_discount(line)
-                found_total = True
-                self.set_extracted_total(total)
+        self.get_stats().count("item_lines", len(items_and_price_list))
 
         # Perform discount handling
-        self.discount_handling(items_and_price_list)
+        with self.get_stats().stage("discount_handling"):
+            self.discount_handling(items_and_price_list)
 
     def discount_handling(self, unprocessed_item_list):
         """
-        Processes and adjusts item prices based on discounts found in the unprocessed item list.
+        Resolves the discounts found in the unprocessed item list onto the items they apply to.
 
         Args:
         - unprocessed_item_list (list): A list of strings containing unprocessed item information.
 
         Note:
-        This method modifies the input list by adjusting item prices based on discounts. It also updates the everyday extra discount.
+        Member Price Saving and OFFER lines are attached to the item above them as adjustments, keeping each
+        item's original price and discount breakdown. It also updates the everyday extra discount.
         """
-        
-        index = 0
-        item_line_to_remove = []
 
-        # Loop through the list
-        while index < len(unprocessed_item_list):
-            item_line = unprocessed_item_list[index]
+        # Resolve every line into item records in a single pass, with the default layout if no profile is set
+        discount_resolver = self.__discount_resolver or DiscountResolver()
+        item_records, everyday_extra_discount = discount_resolver.resolve(unprocessed_item_list)
 
-            # Logic if line only contains additional pricing data and not item data
-            if item_line.startswith("Member Price Saving") or item_line.startswith("Everyday Extra Discount") or "OFFER" in item_line:
-                
-                # Extract the discount value
-                discount = self.extract_price_or_discount(item_line)
-                
-                # Add the current index to the list of indices to remove
-                item_line_to_remove.append(index)
+        if everyday_extra_discount:
+            self.set_everyday_extra_discount(everyday_extra_discount)
 
-                # Logic for 'members price saving' or 'OFFER'
-                if item_line.startswith("Member Price Saving") or "OFFER" in item_line:
+        stats = self.get_stats()
+        if stats.is_enabled():
+            stats.count("items", len(item_records))
+            stats.count("discounts", sum(len(record.get_adjustments()) for record in item_records)
+                        + (1 if everyday_extra_discount else 0))
 
-                    # Adjust the previous item's price
-                    if index > 0:
-                        previous_item_line = unprocessed_item_list[index - 1]
-                        original_price = self.extract_price_or_discount(previous_item_line)
-
-                        # If the previous item's price is successfully extracted, adjust it
-                        if original_price is not None:
-                            new_price = original_price + discount
-                            unprocessed_item_list[
-                                index - 1] = f"{previous_item_line[:-len(str(original_price)) - 1].rstrip()}{' ' * 6}{new_price:.2f}"
-                            
-                # Logic for 'Everyday Extra Discount' 
-                elif item_line.startswith("Everyday Extra Discount"):           
-                    self.set_everyday_extra_discount(discount)
-
-            index += 1
-
-        # After the loop, remove the lines with "Member Price Saving" in reverse order
-        for remove_index in sorted(item_line_to_remove, reverse=True):
-            unprocessed_item_list.pop(remove_index)
-
-        # Remove the lines with "Everyday Extra Discount"
-        self.data_prep(unprocessed_item_list)
+        # Prepare the item data from the resolved records
+        with stats.stage("data_prep"):
+            self.data_prep(item_records)
 
     def get_extracted_total(self):
         """Returns the extracted total."""
@@ -236,88 +345,43 @@ class PDFReader():
         except ValueError:
             return None
 
-    def data_prep(self, items_and_prices):
+    def data_prep(self, item_records):
         """
-        Processes raw item data and creates a dictionary of GroceryItem objects.
+        Processes resolved item records and creates a dictionary of GroceryItem objects.
 
         Args:
-        - items_and_prices (list): A list of strings containing raw item information.
+        - item_records (list): A list of ItemRecord objects with their discounts attached.
 
         Note:
-        This method extracts item names and prices from the input list and creates GroceryItem objects.
+        This method extracts item names, prices and discount breakdowns from the records and creates GroceryItem objects.
         The resulting dictionary is set as the prepped item data for further processing.
         """
 
         items_found = []
 
-        # Extract the item name and price from each line
-        for line in items_and_prices:
-            # i need to capture the item in the line, item == line until 1st "  "
-            space_char_count = 0
-            item_name = ""
-            item_start = False
-
-            # To extract the item from the line of text
-            for char in line:
-
-                # To check if the item has started
-                if item_start:
-                    if char == " ":
-                        space_char_count += 1
-                    else:
-                        space_char_count = 0
-
-                    if space_char_count == 3:
-                        break
-
-                    item_name += char
-
-                # To check if the item has started
-                elif char.isalnum() or char.isspace():
-
-                    if char.isalpha() or char.isdigit():
-                        item_start = True
-
-                    if item_start:
-                        item_name += char
-
-            item_name = item_name.strip()  # Remove leading and trailing whitespaces
-
-            # to extract the price of the item from the line of text.
-            temp_line = ""
-            for char in reversed(line):
-                if char.isdigit() or char == '.':
-                    temp_line += char
-                else:
-                    break
-
-            # Reverse the string and convert to float
-            item_price = float(temp_line[::-1])
-
-            # Append the item name and price to the list
-            items_found.append([item_name, item_price])
+        # Extract the item name and price from each record, along with the breakdown if it was discounted
+        for record in item_records:
+            if record.get_adjustments():
+                items_found.append([record.get_name(), record.get_price(), record.get_base_price(),
+                                    [list(adjustment) for adjustment in record.get_adjustments()]])
+            else:
+                items_found.append([record.get_name(), record.get_price()])
 
         # Create a dictionary of GroceryItem objects
-        self.create_item_dict(items_found)
+        with self.get_stats().stage("create_item_dict"):
+            self.create_item_dict(items_found)
 
     def create_item_dict(self, items_found):
         """
-        Creates a dictionary of grocery items from the identified data.
+        Adds the identified items to the item table and sets the mapping of their GroceryItem-compatible views.
 
         Parameters:
-        - items_found (list): List of identified grocery items.
+        - items_found (list): List of identified grocery items, each [name, price] or
+          [name, price, original price, adjustments] for discounted items.
         """
 
-        items_dict = {}
-        item_key = 1
-
-        # Create a dictionary of GroceryItem objects
-        for item in items_found:
-            items_dict[item_key] = GroceryItem(item[0], item[1])
-            item_key += 1
-
-        # Set the prepped item data
-        self.set_prepped_item_data(items_dict)
+        # Store the items as rows of the table, keyed by item number starting at 1
+        self.set_prepped_item_data(self.get_item_table().add_receipt(items_found))
 
     def set_file_loaction(self, file_location):
         """Sets the file location of the PDF receipt file."""
@@ -335,7 +399,10 @@ class PDFReader():
         self.__header_rows = header_rows
 
     def get_header_rows(self):
-        """Retrieves the number of rows occupied by the header."""
+        """Retrieves the number of rows occupied by the header, falling back to the retailer profile's."""
+
+        if self.__header_rows is None and self.__profile is not None:
+            return self.__profile.get_header_rows()
 
         return self.__header_rows
 
@@ -359,6 +426,66 @@ class PDFReader():
 
         self.__everyday_extra_discount = discount
 
+    def get_extraction_mode(self):
+        """Retrieves the extraction mode, "text" or "words"."""
+
+        return self.__extraction_mode
+
+    def set_extraction_mode(self, extraction_mode):
+        """Sets the extraction mode, "text" or "words"."""
+
+        self.__extraction_mode = extraction_mode
+
+    def get_profile(self):
+        """Retrieves the retailer profile, None until it has been set or detected."""
+
+        return self.__profile
+
+    def set_profile(self, profile):
+        """
+        Sets the retailer profile and builds the discount resolver for its layout.
+
+        Parameters:
+        - profile (str or RetailerProfile): The retailer profile, or the name of a registered profile.
+        """
+
+        if isinstance(profile, str):
+            profile = get_profile(profile)
+
+        self.__profile = profile
+        self.__discount_resolver = DiscountResolver(LineTokenizer(profile.get_column_gap(),
+                                                                  profile.get_discount_markers()))
+
+    def get_parse_cache(self):
+        """Retrieves the parse cache."""
+
+        return self.__parse_cache
+
+    def set_parse_cache(self, parse_cache):
+        """Sets the parse cache."""
+
+        self.__parse_cache = parse_cache
+
+    def get_item_table(self):
+        """Retrieves the item table the receipt's items are stored in."""
+
+        return self.__item_table
+
+    def set_item_table(self, item_table):
+        """Sets the item table the receipt's items are stored in."""
+
+        self.__item_table = item_table
+
+    def get_stats(self):
+        """Retrieves the stats object, NULL_STATS when instrumentation is off."""
+
+        return self.__stats
+
+    def set_stats(self, stats):
+        """Sets the stats object, None turns instrumentation off."""
+
+        self.__stats = stats if stats is not None else NULL_STATS
+
     def __str__(self):
         '''Returns a user-friendly string representation of the contents of the PDF File.'''
         
@@ -382,12 +509,20 @@ class GroceryItem():
     - __id_num (int): ID number of the grocery item.
     - __item_name (str): Name of the grocery item.
     - __item_price (float): Price of the grocery item.
+    - __price_cents (int): Price of the grocery item in cents, kept alongside the price so totals are exact.
+    - __original_price (float): Price of the grocery item before any discounts.
+    - __adjustments (list): List of (kind, amount) discounts applied to the grocery item.
 
     Methods:
     - get_id_num: Get the ID number of the grocery item.
     - get_item_name: Get the name of the grocery item.
     - get_item_price: Get the price of the grocery item.
     - set_item_price: Adjust the price of the grocery item.
+    - get_price_cents: Get the price of the grocery item in cents.
+    - get_original_price: Get the price of the grocery item before any discounts.
+    - get_adjustments: Get the discount breakdown of the grocery item.
+    - apply_adjustment: Apply a discount to the grocery item and record it in the breakdown.
+    - to_item_data: Return the item as the compact list stored by the parse cache.
     - __str__: Return an interface-friendly string of the item.
     - __repr__: Return the data associated with the item.
     """
@@ -395,13 +530,15 @@ class GroceryItem():
     # Class variable to assign unique IDs to grocery items
     next_id = 1
 
-    def __init__(self, item_name: str, item_price: float):
+    def __init__(self, item_name: str, item_price: float, original_price: float = None, adjustments=None):
         """
         Initialize the GroceryItem object.
 
         Parameters:
         - item_name (str): Name of the grocery item.
         - item_price (float): Price of the grocery item.
+        - original_price (float): Price of the grocery item before any discounts, defaults to the item price.
+        - adjustments (list): List of (kind, amount) discounts already applied to the item price.
         """
         
         # Assign a unique ID to the grocery item
@@ -410,6 +547,9 @@ class GroceryItem():
 
         self.__item_name = item_name
         self.__item_price = item_price
+        self.__price_cents = to_cents(item_price)
+        self.__original_price = item_price if original_price is None else original_price
+        self.__adjustments = [tuple(adjustment) for adjustment in adjustments] if adjustments else []
 
     def get_id_num(self):
         """Returns the itemID of the item."""
@@ -430,14 +570,49 @@ class GroceryItem():
         """Sets the price of the grocery item."""
 
         self.__item_price = new_price
+        self.__price_cents = to_cents(new_price)
+
+    def get_original_price(self):
+        """Returns the price of the item before any discounts."""
+
+        return self.__original_price
+
+    def get_adjustments(self):
+        """Returns the list of (kind, amount) discounts applied to the item."""
+
+        return self.__adjustments
+
+    def get_price_cents(self):
+        """Returns the item price in cents."""
+
+        return self.__price_cents
+
+    def apply_adjustment(self, kind, amount):
+        """
+        Apply a discount to the grocery item and record it in the breakdown.
+
+        Parameters:
+        - kind (str): Kind of discount, such as EVERYDAY_EXTRA.
+        - amount (float): Amount of the discount, negative for savings.
+        """
+
+        self.__adjustments.append((kind, amount))
+        self.__price_cents += to_cents(amount)
+        self.__item_price = from_cents(self.__price_cents)
+
+    def to_item_data(self):
+        """Returns the item as [name, price], or [name, price, original price, adjustments] if it was discounted."""
+
+        if not self.__adjustments:
+            return [self.__item_name, self.__item_price]
+
+        return [self.__item_name, self.__item_price, self.__original_price,
+                [list(adjustment) for adjustment in self.__adjustments]]
 
     def __str__(self):
         '''Return an interface-friendly string of the item.'''
 
-        grocery_item_str = f"Product:\t{self.get_item_name()}\nPrice: \t\t" + \
-                           f"${self.get_item_price():.2f}\n"
-
-        return grocery_item_str
+        return describe_item(self)
 
     def __repr__(self):
         '''Return the data associated with the item.'''
@@ -457,6 +632,7 @@ class Receipt():
 
     Methods:
     - recalculate_receipt_total: Recalculate the total cost of items in the receipt.
+    - recalculate_receipt_total_cents: Recalculate the total cost of items in the receipt in cents.
     - get_everyday_extra_discount: Get the everyday extra discount applied.
     - __str__: Return a friendly representation of the Receipt class.
     - __repr__: Return a string representation of the Receipt class.
@@ -482,7 +658,8 @@ class Receipt():
         # If a discount was applied, it is set
         else:
             
-            print("Discount found!")
+            # On stderr, so the JSON the command line writes to stdout stays parseable
+            print("Discount found!", file=sys.stderr)
             self.__everyday_extra_discount = applied_discount
             
             # Apply the discount to the receipt items
@@ -490,8 +667,8 @@ class Receipt():
                 
                 # Checks to see if the item is a giftcard
                 if "Giftcard" not in item.get_item_name():
-                    discounted_price = float("%.2f" % (item.get_item_price() * 0.9))
-                    item.set_item_price(discounted_price)
+                    price_cents = item.get_price_cents()
+                    item.apply_adjustment(EVERYDAY_EXTRA, from_cents(scale_cents(price_cents, 9, 10) - price_cents))
 
     def get_receipt_items(self):
         """Returns the items inside the receipt."""
@@ -514,14 +691,16 @@ class Receipt():
         Returns:
         - str: Formatted total cost of items in the receipt."""
         
-        # Recalculate the receipt total
-        receipt_total = 0.0
-        for item, obj in self.__receipt_items.items():
-            receipt_total += obj.get_item_price()
+        # Format the exact total in cents, without the '$' character
+        return format_cents(self.recalculate_receipt_total_cents()).replace("$", "")
 
-        formatted_total = f"{receipt_total:.2f}"
+    def recalculate_receipt_total_cents(self):
+        """Recalculate the total cost of items in the receipt.
+
+        Returns:
+        - int: Total cost of items in the receipt in cents."""
 
-        return formatted_total
+        return sum(item.get_price_cents() for item in self.__receipt_items.values())
 
     def __str__(self):
         '''
@@ -540,7 +719,7 @@ class Receipt():
             return_str += str(obj)
             item_num += 1
 
-        return_str += f"\nTotal: ${float('%.2f' % (self.get_receipt_total()-self.get_everyday_extra_discount()))}\n"
+        return_str += f"\nTotal: {format_cents(to_cents(self.get_receipt_total()) - to_cents(self.get_everyday_extra_discount()))}\n"
 
         # Check if an everyday extra discount was applied, and alters sting accordingly
         if self.get_everyday_extra_discount() != 0.0:
@@ -580,8 +759,12 @@ class Shopper():
     - __cart_total (float): Total cost of items in the shopper's cart.
     - __main_shopping_cart (bool): Flag indicating if the cart is the main shopping cart.
     - __spending_tracker (float): Tracker for the shopper's spending.
+    - __assignment_index (AssignmentIndex): Index the cart is derived from while dividing a receipt, None otherwise.
 
     Methods:
+    - set_assignment_index: Derive the shopper's cart from an assignment index.
+    - get_assignment_index: Get the assignment index the cart is derived from.
+    - is_main_shopping_cart: Check if the cart is the combined cart of the receipt.
     - add_to_personal_cart: Add a grocery item to the shopper's personal cart.
     - remove_from_personal_cart: Remove an item from the personal cart or reset the cart if specified.
     - calculate_cart_total: Calculate the total cost of items in the shopper's cart.
@@ -598,6 +781,7 @@ class Shopper():
         self.__cart_total = 0.0
         self.__main_shopping_cart = main_shopping_cart
         self.__spending_tracker = spending_tracker or 0.0
+        self.__assignment_index = None
 
     def get_name(self):
         '''Returns the name of the shopper.'''
@@ -624,41 +808,90 @@ class Shopper():
         self.__cart_total = cart_total
 
 
+    def is_main_shopping_cart(self):
+        '''Returns True if the cart is the combined cart shared by every shopper in the receipt.'''
+
+        return self.__main_shopping_cart
+
+    def set_assignment_index(self, assignment_index):
+        '''
+        Derive the shopper's cart from an assignment index, so cart moves and totals are O(1).
+
+        Parameters:
+        - assignment_index (AssignmentIndex): Index of the receipt being divided, None to go back to a plain cart.
+          The shopper's current cart items are assigned to the shopper in the index.
+        '''
+
+        if assignment_index is not None:
+            assignment_index.add_owner(self.get_name(), self.__personal_cart_items)
+            self.__personal_cart_items = []
+        elif self.__assignment_index is not None:
+            self.__personal_cart_items = self.__assignment_index.get_items(self.get_name())
+
+        self.__assignment_index = assignment_index
+
+    def get_assignment_index(self):
+        '''Returns the assignment index the cart is derived from, None if the shopper has a plain cart.'''
+
+        return self.__assignment_index
+
     def get_personal_cart_items(self):
         '''Returns the cart items allocated to the shopper.'''
         
+        if self.__assignment_index is not None:
+            return self.__assignment_index.get_items(self.get_name())
+
         return self.__personal_cart_items
 
-    def add_to_personal_cart(self, item_obj):
+    def add_to_personal_cart(self, item_obj, announce=True):
         '''
         Add a grocery item to the shopper's personal cart.
 
         Parameters:
         - item_obj: Grocery item object to be added.
+        - announce (bool): If False, the move is not printed.
         '''
 
-        # Adds the passed item to the personal shoppers cart
-        self.__personal_cart_items.append(item_obj)
-        print(f"{item_obj.get_item_name()} was added to {self.get_name()}'s cart.")
+        # Adds the passed item to the personal shoppers cart, moving it out of any other cart in the index
+        if self.__assignment_index is not None:
+            self.__assignment_index.assign(item_obj, self.get_name())
+        else:
+            self.__personal_cart_items.append(item_obj)
+
+        if announce:
+            print(f"{item_obj.get_item_name()} was added to {self.get_name()}'s cart.")
 
-    def remove_from_personal_cart(self, item_obj):
+    def remove_from_personal_cart(self, item_obj, announce=True):
         '''
         Remove an item from the personal cart or reset the cart if specified.
 
         Parameters:
         - item_obj: Grocery item object to be removed. 
           If "x" is passed, the personal cart is reset.
+        - announce (bool): If False, the move is not printed.
         '''
         
+        # With an assignment index the item is found and removed in constant time
+        if self.__assignment_index is not None and item_obj != "x":
+            if self.__assignment_index.get_owner(item_obj) == self.get_name():
+                self.__assignment_index.unassign(item_obj)
+                if announce:
+                    print(f"{item_obj.get_item_name()} was removed from {self.get_name().capitalize()}'s cart.")
+
+            elif announce:
+                print(f"{item_obj.get_item_name()} was not found in {self.get_name().capitalize()}'s cart")
+
         # Handles the scenario when the item is found
-        if item_obj in self.__personal_cart_items:
+        elif item_obj in self.__personal_cart_items:
             removed_item = item_obj
             self.__personal_cart_items.remove(item_obj)
-            print(f"{removed_item.get_item_name()} was removed from {self.get_name().capitalize()}'s cart.")
+            if announce:
+                print(f"{removed_item.get_item_name()} was removed from {self.get_name().capitalize()}'s cart.")
 
         # Handles the scenario when the item is not found
         elif item_obj not in self.__personal_cart_items:
-            print(f"{item_obj.get_item_name()} was not found in {self.get_name().capitalize()}'s cart")
+            if announce:
+                print(f"{item_obj.get_item_name()} was not found in {self.get_name().capitalize()}'s cart")
 
         # This grants the developer to ability to reset the cart list if they wish to do so.
         elif item_obj == "x":
@@ -677,11 +910,11 @@ class Shopper():
         - float: Total cost of items in the shopper's cart.
         '''
 
-        current_cart_total = 0.0
-        
-        # Loop through the shoppers cart and add the price of each item to the current cart total
-        for item in self.__personal_cart_items:
-            current_cart_total += item.get_item_price()
+        # An assignment index keeps a running total of the cart, otherwise add up each item exactly, in cents
+        if self.__assignment_index is not None:
+            current_cart_total = from_cents(self.__assignment_index.get_total_cents(self.get_name()))
+        else:
+            current_cart_total = from_cents(sum(item.get_price_cents() for item in self.__personal_cart_items))
 
         # If the setter is set to "y", the cart total is stored
         if setter == "y":
@@ -783,18 +1016,46 @@ class ReceiptDivider():
         - __shoppers_in_receipt (dict): Dictionary to store shoppers in the current receipt.
         - __receipt_file_location (str): File location of the current receipt.
         - __receipt: Digital receipt object.
+        - __parse_cache (ParseCache): On-disk cache of parsed receipts, so rescanning a receipt is instant.
+        - __stats (PipelineStats): Collects stage timings and counters, NULL_STATS when instrumentation is off.
+        - __assignment_index (AssignmentIndex): Owner of each item of the receipt being divided.
+        - __item_shares (dict): Weights of the items split unevenly, keyed by the item, kept in the combined cart.
+        - __assignment_rules (AssignmentRules): Keyword rules predicting who takes each item, None for no rules.
+        - __assignment_history (AssignmentHistory): Who took each item in past receipts, loaded when first used.
+        - __settlement_ledger (SettlementLedger): Net balance of each shopper across the receipts divided.
+        - __shopper_journal (ShopperJournal): Crash-safe store of the spending trackers, set when shoppers are retrieved.
+        - __storage (SQLiteStorage): Optional database of the shoppers, receipts, items and assignments, used
+          instead of the shoppers file when set.
 
         Methods:
         - display_menu: Display the main menu and handle user input for various options.
         - request_receipt_loaction: Open a file dialog to request the location of a receipt file.
         - greeting: Print a friendly greeting for the user.
-        - retreive_existing_shoppers: Retrieve and load existing shopper data from a file.
+        - retreive_existing_shoppers: Retrieve and load existing shopper data from a file and its journal.
+        - record_spending: Add to the spending trackers and save the change to the shopper journal.
+        - retreive_assignment_rules: Retrieve and load the keyword rules predicting who takes each item.
         - create_new_shopper: Create a new shopper and add them to the list of registered shoppers.
         - scan_receipt: Scan a receipt file and set the digital receipt for further processing.
         - divide_receipt: Divide the items in the current receipt among the shoppers.
+        - divide_receipt_by_assignment: Divide the items in the current receipt from a set of assignments without prompting.
+        - divide_receipt_by_spec: Divide the current receipt from an assignment spec without prompting.
+        - build_assignment_index: Build the assignment index of the receipt and derive each shopper's cart from it.
+        - apply_assignment_rules: Pre-assign the items of the receipt to the shoppers predicted by the keyword rules.
+        - apply_assignment_history: Pre-assign the items of the receipt to the shoppers who took them in the past.
+        - record_assignment_history: Record who took each item of the receipt in the assignment history.
+        - get_assignment_index: Get the assignment index of the receipt being divided.
+        - set_item_shares: Split an item of the receipt between shoppers by weight.
+        - get_item_shares: Get the weights of the items split unevenly.
+        - build_share_matrix: Build the items x shoppers share matrix of the receipt being divided.
+        - build_shopper_dict: Build the dictionary of shoppers in the receipt keyed by their selection letter.
+        - split_combined_cart: Split the combined cart between the other shoppers, evenly or by the item shares.
+        - compute_owings: Work out how much each shopper owes the shopper who paid and add it to the settlement ledger.
         - calculate_owings: Calculate the amount owed by each shopper and display the results.
+        - format_owings: Build the user-friendly string of who owes the shopper who paid.
         - show_registered_shoppers: Display the list of registered shoppers.
-        - store_shoppers_details: Store the details of registered shoppers in a file.
+        - store_shoppers_details: Fold the shopper journal into the shoppers file.
+        - build_receipt_record: Build the record of the divided receipt, its items and who took each item.
+        - store_receipt: Save the divided receipt to the storage backend.
         - run: Run the main program, including greetings, data retrieval, and displaying the menu.
         - quit_program: Quit the program and store shopper details before exiting.
         '''
@@ -806,6 +1067,15 @@ class ReceiptDivider():
         self.__shoppers_in_receipt = {}
         self.__receipt_file_location = ""
         self.__receipt = None
+        self.__parse_cache = ParseCache(parser_version=PARSER_VERSION)
+        self.__stats = NULL_STATS
+        self.__assignment_index = None
+        self.__item_shares = {}
+        self.__assignment_rules = None
+        self.__assignment_history = AssignmentHistory()
+        self.__settlement_ledger = SettlementLedger()
+        self.__shopper_journal = None
+        self.__storage = None
 
     def display_menu(self):
         '''Display the main menu and handle user input for various options.'''
@@ -1002,7 +1272,10 @@ class ReceiptDivider():
 
     def request_receipt_loaction(self):
         '''Open a file dialog to request the location of a receipt file.'''
-        
+
+        # Imported here so the headless command line never loads tkinter
+        from tkinter import Tk, filedialog  # inbuilt
+
         root = Tk()
         root.withdraw()  # Hide the main window
         downloads_path = os.path.expanduser("~/Downloads")
@@ -1023,6 +1296,79 @@ class ReceiptDivider():
         
         return self.__receipt
 
+    def get_parse_cache(self):
+        '''Get the parse cache used when scanning receipts.'''
+
+        return self.__parse_cache
+
+    def set_parse_cache(self, parse_cache):
+        '''Set the parse cache used when scanning receipts, None disables caching.'''
+
+        self.__parse_cache = parse_cache
+
+    def get_stats(self):
+        '''Get the stats object collecting stage timings and counters, NULL_STATS when instrumentation is off.'''
+
+        return self.__stats
+
+    def set_stats(self, stats):
+        '''Set the stats object collecting stage timings and counters, None turns instrumentation off.'''
+
+        self.__stats = stats if stats is not None else NULL_STATS
+
+    def get_assignment_rules(self):
+        '''Get the keyword rules predicting who takes each item, None if there are no rules.'''
+
+        return self.__assignment_rules
+
+    def set_assignment_rules(self, assignment_rules):
+        '''Set the keyword rules predicting who takes each item, None for no rules.'''
+
+        self.__assignment_rules = assignment_rules
+
+    def get_assignment_history(self):
+        '''Get the history of who took each item in past receipts.'''
+
+        return self.__assignment_history
+
+    def set_assignment_history(self, assignment_history):
+        '''Set the history of who took each item in past receipts, None for no history.'''
+
+        self.__assignment_history = assignment_history
+
+    def get_settlement_ledger(self):
+        '''Get the net balance of each shopper across the receipts divided.'''
+
+        return self.__settlement_ledger
+
+    def set_settlement_ledger(self, settlement_ledger):
+        '''Set the ledger the owings of each divided receipt are added to, such as one shared between dividers.'''
+
+        self.__settlement_ledger = settlement_ledger
+
+    def get_shopper_journal(self, file_name="shoppers.txt"):
+        '''Get the journal of the spending trackers, opening the journal of the shoppers file if none is set.'''
+
+        if self.__shopper_journal is None or self.__shopper_journal.get_snapshot_file() != file_name:
+            self.__shopper_journal = ShopperJournal(file_name)
+
+        return self.__shopper_journal
+
+    def set_shopper_journal(self, shopper_journal):
+        '''Set the journal of the spending trackers.'''
+
+        self.__shopper_journal = shopper_journal
+
+    def get_storage(self):
+        '''Get the storage backend, None if the shoppers file is used.'''
+
+        return self.__storage
+
+    def set_storage(self, storage):
+        '''Set the storage backend, such as an SQLiteStorage, None to use the shoppers file.'''
+
+        self.__storage = storage
+
     def get_receipt_file_loaction(self):
         '''Get the receipt file location.'''
         
@@ -1080,26 +1426,70 @@ class ReceiptDivider():
 
     def retreive_existing_shoppers(self, file_name="shoppers.txt"):
         '''
-        Retrieve and load existing shopper data from a file.
+        Retrieve and load existing shopper data from a file, replaying the changes saved in its journal since.
 
         Parameters:
         - file_name (str): The name of the file containing shopper data.
         '''
-        # Check if the file exists
+        # Rebuild the spending trackers from the storage backend, or the shoppers file and its journal
         try:
-            with open(file_name, 'r') as file:
-                for line in file:
-                    shopper_data = line.strip("\n").split(',')
-                    
-                    # Add the shopper to the list of registered shoppers
-                    self.add_registered_shopper(
-                        Shopper(str(shopper_data[0]),  # Using the Shopper class, the shopper name is set
-                                float(shopper_data[1])))  # Using the Shopper class, the shopper spending tracker is set
+            if self.get_storage() is not None:
+                saved_shoppers = self.get_storage().load_shoppers()
+            else:
+                saved_shoppers = self.get_shopper_journal(file_name).load()
+
+            for name, spending_cents in saved_shoppers.items():
+
+                # Add the shopper to the list of registered shoppers
+                self.add_registered_shopper(
+                    Shopper(name,  # Using the Shopper class, the shopper name is set
+                            from_cents(spending_cents)))  # Using the Shopper class, the shopper spending tracker is set
         
-        # If the file does not exist, create a new file
+        # If the file or journal is corrupt
         except Exception as e:
-            self.set_shoppers_dict_to_receipt("x")
-            print("CORRUPT_SHOPPER_DATA: The saved shopper was unable to be retrieved.")
+            self.set_shoppers_dict_in_receipt("x")
+            print("CORRUPT_SHOPPER_DATA: The saved shopper was unable to be retrieved.", file=sys.stderr)
+
+    def record_spending(self, spending_changes, file_name="shoppers.txt"):
+        '''
+        Add to the spending trackers of registered shoppers and save the change to the shopper journal, so it
+        survives a crash without rewriting the shoppers file. Shoppers who are not registered yet are registered.
+
+        Parameters:
+        - spending_changes (dict): Amount in cents to add to each shopper's spending tracker, keyed by name.
+        - file_name (str): The name of the file containing shopper data, used if no journal is open yet.
+        '''
+
+        for name, spending_cents in spending_changes.items():
+            if name not in self.get_registered_shoppers():
+                self.add_registered_shopper(Shopper(name))
+
+            shopper = self.get_registered_shoppers()[name]
+            shopper.set_spending_tracker(from_cents(to_cents(shopper.get_spending_tracker()) + spending_cents))
+
+        if self.get_storage() is not None:
+            self.get_storage().add_spending(spending_changes)
+        else:
+            journal = self.__shopper_journal or self.get_shopper_journal(file_name)
+            journal.record(spending_changes)
+
+    def retreive_assignment_rules(self, file_name="rules.txt"):
+        '''
+        Retrieve and load the keyword rules predicting who takes each item. The rules are optional, so a missing
+        file is not an error.
+
+        Parameters:
+        - file_name (str): The name of the file containing the rules.
+        '''
+
+        if not os.path.exists(file_name):
+            return
+
+        try:
+            self.set_assignment_rules(AssignmentRules.load(file_name))
+
+        except (OSError, ValueError) as e:
+            print(f"CORRUPT_RULES_DATA: The saved assignment rules were unable to be retrieved. {e}", file=sys.stderr)
 
     def create_new_shopper(self, receipt_cart=False):
         '''
@@ -1128,7 +1518,7 @@ class ReceiptDivider():
 
                 # Create a new shopper
                 else:
-                    self.add_registered_shopper(Shopper(user_input))
+                    self.record_spending({user_input: 0})
                     print(f"Welcome, {user_input.capitalize()}!")
                     valid_input = True
         
@@ -1146,12 +1536,15 @@ class ReceiptDivider():
         '''
 
         # Set the file location of the receipt
-        scanner = PDFReader()
+        self.set_receipt_file_location(file_location)
+        scanner = PDFReader(parse_cache=self.get_parse_cache(), stats=self.get_stats())
         scanner.set_file_loaction(file_location)
         
         # Read the file and set the digital receipt
         scanner.read_file()
-        scanner.set_digi_receipt()
+        with self.get_stats().stage("set_digi_receipt"):
+            scanner.set_digi_receipt()
+        self.get_stats().count("receipts")
         digi_receipt = scanner.get_digi_receipt()
 
         # Assign the generated receipt to the ReceiptDivider object
@@ -1164,19 +1557,23 @@ class ReceiptDivider():
         The function guides the user to assign items to specific shoppers and calculates the amount owed by each shopper.
         '''
         
-        # Create a dictionary of shoppers in the current receipt
-        def find_current_item_and_cart(while_index):
-            
-            # Loop through the shoppers in the current receipt
-            for shopper_obj in self.get_shoppers_in_receipt().values():
-                            for grocery_obj in shopper_obj.get_personal_cart_items():
-                                
-                                # Check if the item is in the shopper's cart
-                                if receipt.get_receipt_items()[while_index] == grocery_obj:
-                                    return shopper_obj, grocery_obj
+        # Derive every cart from one index, so finding and moving an item no longer scans the carts
+        assignment_index = self.build_assignment_index()
+        shoppers = self.get_shoppers_in_receipt()
+
+        # Registered shoppers keep the paid flag from the last receipt they were divided in
+        for shopper in shoppers.values():
+            shopper.set_paid(False)
+
+        # Start each item in the cart of the shopper the rules predict, then of the shopper who took it last time
+        predicted_items = self.apply_assignment_rules()
+        if predicted_items:
+            print(f"{predicted_items} item(s) pre-assigned from the assignment rules.")
+
+        remembered_items = self.apply_assignment_history()
+        if remembered_items:
+            print(f"{remembered_items} item(s) pre-assigned from past receipts.")
 
-        # Create a dictionary of shoppers in the current receipt
-        shopper_dict = {}
         receipt = self.get_receipt()
         receipt_len = len(receipt.get_receipt_items())
         
@@ -1189,11 +1586,7 @@ class ReceiptDivider():
                     f"(q) to go to previous item, (w) to go to next item.\n" 
         
         # Setting up shopper_dict
-        for i, shopper_obj in enumerate(self.get_shoppers_in_receipt().values(), start=1):
-                if shopper_obj.get_name() == "Combined":
-                    i = 0
-
-                shopper_dict[user_input_parameters[i+4]] = shopper_obj
+        shopper_dict = self.build_shopper_dict()
 
         # modifying the user_input_parameters based on number of shoppers
         shopper_str = ""
@@ -1216,7 +1609,8 @@ class ReceiptDivider():
         while not submit:
             
             # Find the current item and shopper
-            item_owner, grocery_item = find_current_item_and_cart(while_index)
+            grocery_item = receipt.get_receipt_items()[while_index]
+            item_owner = shoppers[assignment_index.get_owner(grocery_item)]
 
             print(top_str)
         
@@ -1265,18 +1659,27 @@ class ReceiptDivider():
                     item_owner.remove_from_personal_cart(grocery_item)
 
                     # Add item to selections cart
-                    shopper_dict[selection].add_to_personal_cart(receipt.get_receipt_items()[while_index])
+                    shopper_dict[selection].add_to_personal_cart(grocery_item)
 
                     while_index +=1
                     if while_index > receipt_len:
                         while_index = receipt_len
+
+        # Remember the submitted assignments for the next receipt
+        divided = submit
+        if divided:
+            self.record_assignment_history()
         
         # Calculate the cart total for each shopper
         for shopper in shopper_dict.values():
             shopper.calculate_cart_total("y")
 
         # Calculate the amount owed by each shopper
-        self.calculate_owings(shopper_dict)                
+        owings = self.calculate_owings(shopper_dict)
+
+        # Save the submitted receipt and who took each item
+        if divided:
+            self.store_receipt(owings["payer"])
 
         # Prombt to confirm and update personal spending tracker
         print("Confirm and update personal spending tracker? (y/n)")
@@ -1289,8 +1692,8 @@ class ReceiptDivider():
         
             # if the user wishes to update the spending tracker
             if confirm == "y":
-                for shopper in shopper_dict.values():
-                    shopper.set_spending_tracker(float('%.2f' % (shopper.get_spending_tracker() + shopper.get_cart_total())))
+                self.record_spending({shopper.get_name(): to_cents(shopper.get_cart_total())
+                                      for shopper in shopper_dict.values()})
                 submit = True
 
             # if the user wishes to return to the menu    
@@ -1300,23 +1703,365 @@ class ReceiptDivider():
             else:
                 print("Please select whether to record change in spending tracker. (y/n)")
 
+    def divide_receipt_by_assignment(self, assignments, shopper_paid):
+        '''
+        Divide the items in the current receipt among the shoppers without prompting, such as from the command line.
+
+        Parameters:
+        - assignments (dict): Maps receipt item numbers to the name of the shopper taking the item, or to a dict of
+          the weight each shopper takes of it, such as {"josh": 2, "jessica": 1}. Items not listed stay in the
+          combined cart and are split evenly.
+        - shopper_paid (str): Name of the shopper who made the payment.
+
+        Returns:
+        - dict: {"payer": name of the shopper who paid, "owings": {shopper name: amount owed}}
+
+        Raises:
+        - ValueError: If a shopper or item number is not part of the current receipt.
+        '''
+
+        receipt_items = self.get_receipt().get_receipt_items()
+        shoppers = self.get_shoppers_in_receipt()
+
+        if shopper_paid not in shoppers:
+            raise ValueError(f"'{shopper_paid}' is not a shopper in the receipt.")
+
+        # Registered shoppers keep the paid flag from the last receipt they were divided in
+        for shopper in shoppers.values():
+            shopper.set_paid(False)
+
+        # The combined cart starts off holding every item
+        if "Combined" not in shoppers:
+            self.create_new_shopper(True)
+        combined_cart = shoppers["Combined"]
+
+        self.build_assignment_index()
+        stats = self.get_stats()
+
+        # Move each assigned item into its shopper's cart
+        with stats.stage("assign_items"):
+            for item_num, shopper_name in assignments.items():
+                if int(item_num) not in receipt_items:
+                    raise ValueError(f"Item {item_num} is not in the receipt.")
+
+                grocery_item = receipt_items[int(item_num)]
+
+                # An item split by weight stays in the combined cart, the share matrix splits it
+                if isinstance(shopper_name, dict):
+                    self.set_item_shares(grocery_item, shopper_name)
+                    continue
+
+                if shopper_name not in shoppers:
+                    raise ValueError(f"'{shopper_name}' is not a shopper in the receipt.")
+
+                combined_cart.remove_from_personal_cart(grocery_item, announce=False)
+                shoppers[shopper_name].add_to_personal_cart(grocery_item, announce=False)
+
+        stats.count("assignments", len(assignments))
+
+        # Calculate the cart total for each shopper
+        shopper_dict = self.build_shopper_dict()
+        with stats.stage("calculate_cart_total"):
+            for shopper in shopper_dict.values():
+                shopper.calculate_cart_total("y")
+
+        self.split_combined_cart(shopper_dict)
+
+        paid_key = next(key for key, shopper in shopper_dict.items() if shopper.get_name() == shopper_paid)
+
+        return self.compute_owings(shopper_dict, paid_key)
+
+    def divide_receipt_by_spec(self, assignment_spec):
+        '''
+        Divide the current receipt between the shoppers of an assignment spec in one pass, without prompting.
+
+        Parameters:
+        - assignment_spec (AssignmentSpec): Who splits the receipt, who takes which items and who paid.
+          Shoppers named in the spec are registered if they are new.
+
+        Returns:
+        - dict: {"payer": name of the shopper who paid, "owings": {shopper name: amount owed}}
+
+        Raises:
+        - ValueError: If the spec names an item number the receipt does not have.
+        '''
+
+        # Add the spec's shoppers to the receipt, registering any new shoppers
+        for shopper_name in assignment_spec.get_shoppers():
+            if shopper_name not in self.get_registered_shoppers():
+                self.add_registered_shopper(Shopper(shopper_name))
+
+            self.add_shopper_to_receipt(self.get_registered_shoppers()[shopper_name])
+
+        assignments = assignment_spec.resolve(self.get_receipt().get_receipt_items())
+
+        return self.divide_receipt_by_assignment(assignments, assignment_spec.get_paid())
+
+    def build_assignment_index(self):
+        '''
+        Build the assignment index of the current receipt and derive each shopper's cart from it.
+
+        Returns:
+        - AssignmentIndex: The index, with the combined cart's items assigned to it and each shopper's current
+          cart items assigned to them.
+        '''
+
+        assignment_index = AssignmentIndex()
+
+        for shopper in self.get_shoppers_in_receipt().values():
+            shopper.set_assignment_index(assignment_index)
+
+        self.__assignment_index = assignment_index
+        self.__item_shares = {}
+
+        return assignment_index
+
+    def apply_assignment_rules(self):
+        '''
+        Pre-assign the items of the current receipt to the shoppers predicted by the keyword rules, so dividing
+        starts from the predicted owners. Only items still in the combined cart are moved, and only to shoppers
+        splitting the receipt.
+
+        Returns:
+        - int: Number of items moved.
+        '''
+
+        assignment_rules = self.get_assignment_rules()
+        assignment_index = self.get_assignment_index()
+        shoppers = self.get_shoppers_in_receipt()
+
+        if not assignment_rules or assignment_index is None or "Combined" not in shoppers:
+            return 0
+
+        receipt_items = self.get_receipt().get_receipt_items()
+        moved_items = 0
+
+        with self.get_stats().stage("apply_assignment_rules"):
+            predictions = assignment_rules.predict_owners(receipt_items, shoppers)
+
+            for item_num, shopper_name in predictions.items():
+                grocery_item = receipt_items[item_num]
+
+                if assignment_index.get_owner(grocery_item) == "Combined":
+                    shoppers["Combined"].remove_from_personal_cart(grocery_item, announce=False)
+                    shoppers[shopper_name].add_to_personal_cart(grocery_item, announce=False)
+                    moved_items += 1
+
+        self.get_stats().count("predicted_items", moved_items)
+
+        return moved_items
+
+    def apply_assignment_history(self):
+        '''
+        Pre-assign the items of the current receipt still in the combined cart to the shoppers who most likely
+        take them, going by past receipts. Only shoppers splitting the receipt are predicted.
+
+        Returns:
+        - int: Number of items moved.
+        '''
+
+        assignment_history = self.get_assignment_history()
+        assignment_index = self.get_assignment_index()
+        shoppers = self.get_shoppers_in_receipt()
+
+        if assignment_history is None or assignment_index is None or "Combined" not in shoppers:
+            return 0
+
+        receipt_items = self.get_receipt().get_receipt_items()
+        moved_items = 0
+
+        with self.get_stats().stage("apply_assignment_history"):
+            predictions = assignment_history.predict_owners(receipt_items, shoppers)
+
+            for item_num, shopper_name in predictions.items():
+                grocery_item = receipt_items[item_num]
+
+                if shopper_name != "Combined" and assignment_index.get_owner(grocery_item) == "Combined":
+                    shoppers["Combined"].remove_from_personal_cart(grocery_item, announce=False)
+                    shoppers[shopper_name].add_to_personal_cart(grocery_item, announce=False)
+                    moved_items += 1
+
+        self.get_stats().count("remembered_items", moved_items)
+
+        return moved_items
+
+    def record_assignment_history(self):
+        '''Record who took each item of the current receipt in the assignment history, including the combined cart.'''
+
+        assignment_history = self.get_assignment_history()
+        assignment_index = self.get_assignment_index()
+
+        if assignment_history is None or assignment_index is None:
+            return
+
+        receipt_items = self.get_receipt().get_receipt_items()
+
+        with self.get_stats().stage("record_assignment_history"):
+            assignment_history.record_receipt([(grocery_item.get_item_name(), assignment_index.get_owner(grocery_item))
+                                               for grocery_item in receipt_items.values()
+                                               if grocery_item in assignment_index])
+
+    def get_assignment_index(self):
+        '''Get the assignment index of the receipt being divided, None before dividing.'''
+
+        return self.__assignment_index
+
+    def set_item_shares(self, grocery_item, weights):
+        '''
+        Split an item of the receipt between shoppers by weight. The item stays in the combined cart, so it is
+        stored without an owner, and the share matrix splits it when the owings are calculated.
+
+        Parameters:
+        - grocery_item (GroceryItem): Item of the current receipt.
+        - weights (dict): Weight of each shopper taking a share, keyed by name, such as {"josh": 2, "jessica": 1}.
+
+        Raises:
+        - ValueError: If a shopper is not in the receipt, or a weight is negative or they add up to zero.
+        '''
+
+        shoppers = self.get_shoppers_in_receipt()
+
+        for shopper_name, weight in weights.items():
+            if shopper_name not in shoppers or shoppers[shopper_name].is_main_shopping_cart():
+                raise ValueError(f"'{shopper_name}' is not a shopper in the receipt.")
+            if weight < 0:
+                raise ValueError(f"{shopper_name}'s share of item '{grocery_item.get_item_name()}' cannot be negative.")
+
+        if sum(weights.values()) <= 0:
+            raise ValueError(f"Item '{grocery_item.get_item_name()}' must be shared by at least one shopper.")
+
+        self.__item_shares[grocery_item] = dict(weights)
+
+    def get_item_shares(self):
+        '''Get the weights of the items split unevenly, keyed by the item.'''
+
+        return self.__item_shares
+
+    def build_share_matrix(self, shopper_dict):
+        '''
+        Build the items x shoppers share matrix of the receipt being divided: each item in a shopper's cart goes
+        to that shopper, each item in the combined cart is split by its item shares, or evenly.
+
+        Parameters:
+        - shopper_dict (dict): The shoppers splitting the receipt, without the combined cart.
+
+        Returns:
+        - ShareMatrix: One row per receipt item, one column per shopper in the order of the dictionary.
+        '''
+
+        # Imported here so NumPy is only loaded once a receipt is divided, not when the program starts
+        from ShareMatrix import ShareMatrix
+
+        assignment_index = self.get_assignment_index()
+        receipt_items = list(self.get_receipt().get_receipt_items().values())
+        shopper_names = [shopper.get_name() for shopper in shopper_dict.values()]
+        splitting_shoppers = set(shopper_names)
+
+        owners = [assignment_index.get_owner(grocery_item) for grocery_item in receipt_items]
+        owners = [owner if owner in splitting_shoppers else None for owner in owners]
+        share_matrix = ShareMatrix.from_owners([grocery_item.get_price_cents() for grocery_item in receipt_items],
+                                               shopper_names, owners)
+
+        # Items split by weight, unless they were moved out of the combined cart since
+        for row, grocery_item in enumerate(receipt_items):
+            if owners[row] is None and grocery_item in self.__item_shares:
+                share_matrix.set_shares(row, self.__item_shares[grocery_item])
+
+        return share_matrix
+
+    def build_shopper_dict(self):
+        '''
+        Build the dictionary of shoppers in the current receipt, keyed by the letter used to select them.
+
+        Returns:
+        - dict: The combined cart under "e", followed by each shopper under "a", "s", "d", "f" and "g".
+        '''
+
+        user_input_parameters = ["q","w","x","v","e","a","s","d","f","g"]
+        shopper_dict = {}
+
+        for i, shopper_obj in enumerate(self.get_shoppers_in_receipt().values(), start=1):
+                if shopper_obj.get_name() == "Combined":
+                    i = 0
+
+                shopper_dict[user_input_parameters[i+4]] = shopper_obj
+
+        return shopper_dict
+
+    def split_combined_cart(self, shopper_dict):
+        '''
+        Split the combined cart between the other shoppers and set each shopper's cart total to their share of the
+        receipt. With an assignment index the totals come from the share matrix, so items split by weight are
+        split by their item shares and everything else in the combined cart evenly. Either way the shares are
+        allocated by largest remainder, so they add up to the receipt total to the cent.
+
+        Parameters:
+        - shopper_dict (dict): A dictionary containing shoppers and their assigned items.
+          The combined cart is removed from the dictionary.
+        '''
+
+        with self.get_stats().stage("split_combined_cart"):
+
+            # Remove the 'Combined' Shopper obj from the dictionary and split its cart, the shares add up to the cent
+            combined_key = next(key for key, shopper in shopper_dict.items() if shopper.is_main_shopping_cart())
+            combined_cart = shopper_dict.pop(combined_key)
+
+            # Every shopper's total is one matrix-vector product of the item prices and the shares
+            if self.get_assignment_index() is not None:
+                totals_cents = self.build_share_matrix(shopper_dict).get_totals_cents()
+                for shopper in shopper_dict.values():
+                    shopper.set_cart_total(from_cents(totals_cents[shopper.get_name()]))
+                return
+
+            split_cart_costs = split_cents(to_cents(combined_cart.get_cart_total()), len(shopper_dict))
+            
+            # Apply the split combined cart total to each shopper in receipt
+            for shopper, split_cart_cost in zip(shopper_dict.values(), split_cart_costs):
+                shopper.set_cart_total(from_cents(to_cents(shopper.get_cart_total()) + split_cart_cost))
+
+    def compute_owings(self, shopper_dict, shopper_paid):
+        '''
+        Work out how much each shopper owes the shopper who made the payment.
+
+        Parameters:
+        - shopper_dict (dict): A dictionary of shoppers with the combined cart already split between them.
+        - shopper_paid (str): Key of the shopper in the dictionary who made the payment.
+
+        Returns:
+        - dict: {"payer": name of the shopper who paid, "owings": {shopper name: amount owed}}
+        '''
+
+        with self.get_stats().stage("compute_owings"):
+
+            # Set the selcted Shopper self.__paid to TRUE and clear it on the rest
+            for key, shopper in shopper_dict.items():
+                shopper.set_paid(key == shopper_paid)
+
+            owings = {"payer": shopper_dict[shopper_paid].get_name(), "owings": {}}
+
+            for shopper in shopper_dict.values():
+                if shopper.get_paid() == False:
+                    owings["owings"][shopper.get_name()] = shopper.get_cart_total()
+
+            # Keep the running balances, so receipts paid by different shoppers can be settled together
+            self.get_settlement_ledger().add_owings(owings)
+
+        return owings
+
     def calculate_owings(self, shopper_dict):
         '''
         Calculate the amount owed by each shopper and display the results.
 
         Parameters:
         - shopper_dict (dict): A dictionary containing shoppers and their assigned items.
+
+        Returns:
+        - dict: {"payer": name of the shopper who paid, "owings": {shopper name: amount owed}}
         '''
 
             ### Split Combined Costs
 
-        # Calculate the split cart and remove the 'Combined' Shopper obj from the dictionary
-        split_cart_cost = float('%.2f' % (shopper_dict["e"].get_cart_total() / (len(self.get_shoppers_in_receipt())-1)))
-        shopper_dict.pop("e")
-        
-        # Apply the csplit combined cart toat to each shopper in receipt
-        for shopper in shopper_dict.values():
-            shopper.set_cart_total(float('%.2f' % (shopper.get_cart_total() + split_cart_cost)))
+        self.split_combined_cart(shopper_dict)
         
             ### Who Paid 
 
@@ -1337,29 +2082,35 @@ class ReceiptDivider():
 
             # if selection is valid
             if shopper_paid in shopper_dict:
-                # Set the selcted Shopper self.__paid to TRUE
-                shopper_dict[shopper_paid].set_paid(True)
                 valid_input = True
         
             else:
                 print("Invalid selection. Please enter the corresponding letter to the shopper who made the payment.")
 
             ### Build Owing-String
-        
-        owings_str = ""
-        
+
+        # Display Owing-String
+        owings = self.compute_owings(shopper_dict, shopper_paid)
+        print(self.format_owings(owings))
+
+        return owings
+
+    def format_owings(self, owings):
+        '''
+        Build the user-friendly string of who owes the shopper who paid.
+
+        Parameters:
+        - owings (dict): Owings structure returned by `compute_owings`.
+        '''
+
         # Build 'Shopper x' is owed
-        for shopper in shopper_dict.values():
-            if shopper.get_paid() == True:
-                owings_str += f"{shopper.get_name()} is owed: \n"
+        owings_str = f"{owings['payer']} is owed: \n"
 
         # Build 'amount from "shopper y,z,% etc."'    
-        for shopper in shopper_dict.values():
-            if shopper.get_paid() == False:
-                owings_str += f"${shopper.get_cart_total()} from {shopper.get_name()}.\n"    
+        for name, amount in owings["owings"].items():
+            owings_str += f"${amount} from {name}.\n"
 
-        # Display Owing-String
-        print(owings_str)
+        return owings_str
 
     def show_registered_shoppers(self):
         '''Display the list of registered shoppers.'''
@@ -1380,19 +2131,73 @@ class ReceiptDivider():
 
     def store_shoppers_details(self, file_name="shoppers.txt"):
         '''
-        Store the details of registered shoppers in a file.
+        Store the details of registered shoppers in a file by folding the shopper journal into it. Every change
+        is already in the journal, so changes saved by other sessions are kept rather than overwritten.
 
         Parameters:
         - file_name (str): The name of the file to store shopper details.
         '''
+        registered_shoppers = {name: to_cents(shopper_obj.get_spending_tracker())
+                               for name, shopper_obj in self.get_registered_shoppers().items()}
+
+        # The storage backend saves every change as it happens, only new shoppers need adding
+        if self.get_storage() is not None:
+            self.get_storage().add_shoppers(registered_shoppers)
+            return
+
+        journal = self.get_shopper_journal(file_name)
+
+        # Save any shopper the journal has not seen, such as one added without record_spending
+        saved_shoppers = journal.load()
+        new_shoppers = {name: spending_cents for name, spending_cents in registered_shoppers.items()
+                        if name not in saved_shoppers}
+        if new_shoppers:
+            journal.record(new_shoppers)
+
         # Check if there are any registered shoppers
-        if len(self.get_registered_shoppers()) != 0:
-            with open(file_name, 'w') as file:
+        if saved_shoppers or new_shoppers:
+            journal.compact()
+
+    def build_receipt_record(self, shopper_paid):
+        '''
+        Build the record of the divided receipt, its items and who took each item.
+
+        Parameters:
+        - shopper_paid (str): Name of the shopper who made the payment.
+
+        Returns:
+        - dict: {"file_location", "divided_at", "payer", "total_cents", "items": [(item number, name,
+          price in cents, shopper name or None for the combined cart)]}
+        '''
+
+        assignment_index = self.get_assignment_index()
+        receipt = self.get_receipt()
+        items = []
+
+        for item_num, grocery_item in receipt.get_receipt_items().items():
+            owner = assignment_index.get_owner(grocery_item) if assignment_index is not None else None
+            items.append((item_num, grocery_item.get_item_name(), grocery_item.get_price_cents(),
+                          None if owner == "Combined" else owner))
+
+        return {"file_location": self.get_receipt_file_loaction() or None,
+                "divided_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                "payer": shopper_paid,
+                "total_cents": receipt.recalculate_receipt_total_cents(),
+                "items": items}
+
+    def store_receipt(self, shopper_paid):
+        '''
+        Save the divided receipt, its items and who took each item to the storage backend, if one is set.
+
+        Parameters:
+        - shopper_paid (str): Name of the shopper who made the payment.
+        '''
+
+        if self.get_storage() is None:
+            return
 
-                # Loop through the registered shoppers and store their details
-                for name, shopper_obj in self.get_registered_shoppers().items():
-                    file.write(f'{name},' \
-                               f'{shopper_obj.get_spending_tracker()}\n')       
+        with self.get_stats().stage("store_receipt"):
+            self.get_storage().save_receipts([self.build_receipt_record(shopper_paid)])
 
     def run(self):
         '''Run the main program, including greetings, data retrieval, and displaying the menu.'''
@@ -1400,6 +2205,7 @@ class ReceiptDivider():
         # Opening functions to run upon start-up
         self.greeting()
         self.retreive_existing_shoppers()
+        self.retreive_assignment_rules()
         self.display_menu()
 
     def quit_program(self):
@@ -0,0 +1,600 @@
+import os
+import re
+import sys
+import json
+import signal  # inbuilt
+import asyncio  # inbuilt
+import hashlib  # inbuilt
+import tempfile  # inbuilt
+from email.parser import BytesParser  # inbuilt
+from email.policy import HTTP  # inbuilt
+from concurrent.futures import ProcessPoolExecutor  # inbuilt
+
+from ReceiptDividerRev2 import PDFReader, ReceiptDivider, PARSER_VERSION
+from ParseCache import ParseCache
+from AssignmentSpec import AssignmentSpec
+from Settlement import SettlementLedger
+from Money import to_cents
+
+# Reason phrase of every status the service answers with
+STATUS_REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed", 408: "Request Timeout",
+                  411: "Length Required", 413: "Payload Too Large", 422: "Unprocessable Entity",
+                  500: "Internal Server Error", 503: "Service Unavailable"}
+
+# Uploaded receipts are kept under the SHA-256 of their bytes, which is the id clients divide them by
+RECEIPT_ID = re.compile(r"[0-9a-f]{64}")
+
+# Limits on a request's head, and the seconds a client may take to send a request or sit idle between requests
+MAX_HEAD_BYTES = 16 * 1024
+REQUEST_TIMEOUT = 30.0
+
+
+class HTTPError(Exception):
+    """Raised by an endpoint to answer with an error status and a JSON {"error": message} body."""
+
+    def __init__(self, status, message, headers=None):
+        super().__init__(message)
+        self.status = status
+        self.headers = headers or {}
+
+
+def parse_upload(file_location, parse_cache):
+    """
+    Parses an uploaded receipt, through the parse cache.
+
+    Note:
+    This function runs inside the worker processes, so it must stay at module level to be picklable.
+
+    Parameters:
+    - file_location (str): File location of the uploaded PDF receipt.
+    - parse_cache (ParseCache): Cache of parse results shared with the divider.
+
+    Returns:
+    - dict: {"items": {item number: item data}, "total": receipt total, "everyday_extra_discount": discount}, the
+      item data as written by `parse --json`.
+    """
+
+    scanner = PDFReader(file_location, parse_cache=parse_cache)
+    scanner.read_file()
+    scanner.set_digi_receipt()
+    receipt = scanner.get_digi_receipt()
+
+    return {"items": {str(item_num): grocery_item.to_item_data()
+                      for item_num, grocery_item in receipt.get_receipt_items().items()},
+            "total": receipt.get_receipt_total(),
+            "everyday_extra_discount": receipt.get_everyday_extra_discount()}
+
+
+def divide_upload(file_location, spec, parse_cache, shoppers_file="shoppers.txt", database=None, save=False):
+    """
+    Divides an uploaded receipt from an assignment spec, saving the spending as `divide --save` does if asked.
+
+    Note:
+    This function runs inside the worker processes, so it must stay at module level to be picklable. The shopper
+    journal and the database both lock their writes, so workers saving at once keep every change.
+
+    Parameters:
+    - file_location (str): File location of the uploaded PDF receipt.
+    - spec (dict): Assignment spec in its JSON form, see AssignmentSpec.from_dict.
+    - parse_cache (ParseCache): Cache of parse results shared with the divider.
+    - shoppers_file (str): File of registered shoppers.
+    - database (str): SQLite database to use instead of the shoppers file, None for the shoppers file.
+    - save (bool): If True, the spending trackers, the assignment history and the database are updated.
+
+    Returns:
+    - dict: {"payer": name of the shopper who paid, "owings": {shopper name: amount owed}}
+    """
+
+    receipt_divider = ReceiptDivider()
+    receipt_divider.set_parse_cache(parse_cache)
+
+    if database:
+        from SQLiteStorage import SQLiteStorage
+
+        receipt_divider.set_storage(SQLiteStorage(database))
+
+    if save:
+        receipt_divider.retreive_existing_shoppers(shoppers_file)
+
+    receipt_divider.scan_receipt(file_location)
+    owings = receipt_divider.divide_receipt_by_spec(AssignmentSpec.from_dict(spec))
+
+    if save:
+        receipt_divider.record_spending({shopper.get_name(): to_cents(shopper.get_cart_total())
+                                         for shopper in receipt_divider.get_shoppers_in_receipt().values()
+                                         if not shopper.is_main_shopping_cart()}, shoppers_file)
+        receipt_divider.record_assignment_history()
+        receipt_divider.store_receipt(owings["payer"])
+
+    return owings
+
+
+def read_shoppers(shoppers_file="shoppers.txt", database=None, spending_changes=None):
+    """
+    Reads the spending trackers, first adding to them if changes are given.
+
+    Parameters:
+    - shoppers_file (str): File of registered shoppers.
+    - database (str): SQLite database to use instead of the shoppers file, None for the shoppers file.
+    - spending_changes (dict): Amount in cents to add to each shopper's spending tracker, keyed by name.
+
+    Returns:
+    - dict: Spending tracker in dollars keyed by shopper name.
+    """
+
+    receipt_divider = ReceiptDivider()
+
+    if database:
+        from SQLiteStorage import SQLiteStorage
+
+        receipt_divider.set_storage(SQLiteStorage(database))
+
+    receipt_divider.retreive_existing_shoppers(shoppers_file)
+
+    if spending_changes:
+        receipt_divider.record_spending(spending_changes, shoppers_file)
+
+    return {name: shopper.get_spending_tracker() for name, shopper in receipt_divider.get_registered_shoppers().items()}
+
+
+def read_upload(headers, body):
+    """
+    Retrieves the PDF bytes of an upload, sent either as the raw request body or as a multipart/form-data file.
+
+    Parameters:
+    - headers (dict): Request headers, keyed by lower case name.
+    - body (bytes): Request body.
+
+    Raises:
+    - HTTPError: If there is no PDF in the request.
+    """
+
+    content_type = headers.get("content-type", "")
+
+    # A browser form or a phone's share sheet sends the file as a part of a multipart body
+    if content_type.lower().startswith("multipart/form-data"):
+        message = BytesParser(policy=HTTP).parsebytes(f"Content-Type: {content_type}\r\n\r\n".encode("latin-1") + body)
+        parts = [part for part in message.iter_parts() if part.get_filename()] if message.is_multipart() else []
+
+        if not parts:
+            raise HTTPError(400, "The form has no file in it.")
+
+        body = parts[0].get_payload(decode=True) or b""
+
+    if not body.startswith(b"%PDF"):
+        raise HTTPError(400, "The upload is not a PDF.")
+
+    return body
+
+
+class ReceiptService():
+    """
+    Local HTTP service driving the divider from scripts and phones on the LAN, without the menu or GUI.
+
+    The service runs on an asyncio loop with a small HTTP/1.1 server from the standard library, so it needs
+    nothing installed beyond the divider itself. Endpoints, all answering JSON:
+    - GET /health: Status of the service and its worker pool.
+    - POST /parse: Upload a PDF receipt, as the raw body or a multipart form file. Returns the receipt id and items.
+    - POST /divide: {"receipt": id, "assignment": spec, "save": bool}. Returns the owings, as `divide --json` does.
+    - POST /settle: {"owings": [owings, ...]}. Returns the transfers that settle them, as `settle --json` does.
+    - GET /shoppers: The spending tracker of every registered shopper.
+    - POST /shoppers: {"spending": {name: dollars}}. Adds to the spending trackers and returns them all.
+
+    Parsing and dividing are CPU-bound, so they run in a process pool and the loop stays free to take requests.
+    At most one job per worker runs at once and a bounded number more wait their turn. Past that the service
+    answers 503 with a Retry-After header straight away, so a burst of uploads cannot queue without limit or
+    exhaust memory. Parses go through the same ParseCache the divider reads, so a receipt uploaded twice, or
+    first parsed then divided, is only parsed once.
+
+    Attributes:
+    - __host (str): Address the service listens on.
+    - __port (int): Port the service listens on, 0 for any free port.
+    - __max_workers (int): Number of worker processes.
+    - __max_queued (int): Number of jobs allowed to wait for a worker before the service answers 503.
+    - __upload_dir (str): Folder the uploaded receipts are kept in, a temporary folder if not given.
+    - __temp_dir (tempfile.TemporaryDirectory): Temporary upload folder, removed on close, None if one was given.
+    - __shoppers_file (str): File of registered shoppers.
+    - __database (str): SQLite database to use instead of the shoppers file, None for the shoppers file.
+    - __parse_cache (ParseCache): Cache of parse results shared with the divider.
+    - __max_upload_bytes (int): Largest request body accepted.
+    - __routes (dict): Endpoint method of each (HTTP method, path).
+    - __pending_jobs (int): Jobs running or waiting for a worker.
+    - __job_slots (asyncio.Semaphore): Limits the jobs running to one per worker.
+    - __executor (ProcessPoolExecutor): Worker processes parsing and dividing, while serving.
+    - __server (asyncio.Server): The listening server, while serving.
+    - __status_counts (dict): Number of responses of each status.
+
+    Methods:
+    - start: Starts the worker pool and starts listening.
+    - close: Stops listening and shuts the worker pool down.
+    - serve: Serves requests until stopped.
+    - run: Runs the service on a new event loop until interrupted.
+    - get_address: Retrieves the (host, port) the service listens on.
+    - get_status_counts: Retrieves the number of responses of each status.
+    - get_upload_dir: Retrieves the folder the uploaded receipts are kept in.
+    """
+
+    def __init__(self, host="127.0.0.1", port=8080, max_workers=None, max_queued=None, upload_dir=None,
+                 shoppers_file="shoppers.txt", database=None, parse_cache=None, max_upload_bytes=10 * 1024 * 1024):
+        """
+        Initializes the ReceiptService object without listening.
+
+        Parameters:
+        - host (str): Address to listen on, 127.0.0.1 for this machine only or 0.0.0.0 for the LAN.
+        - port (int): Port to listen on, 0 for any free port.
+        - max_workers (int): Number of worker processes, defaults to one per core.
+        - max_queued (int): Number of jobs allowed to wait for a worker, defaults to four per worker.
+        - upload_dir (str): Folder to keep the uploaded receipts in, defaults to a temporary folder removed on close.
+        - shoppers_file (str): File of registered shoppers.
+        - database (str): SQLite database to use instead of the shoppers file.
+        - parse_cache (ParseCache): Cache of parse results, defaults to the divider's cache.
+        - max_upload_bytes (int): Largest request body accepted.
+        """
+
+        self.__host = host
+        self.__port = port
+        self.__max_workers = max_workers or os.cpu_count() or 1
+        self.__max_queued = max_queued if max_queued is not None else 4 * self.__max_workers
+        self.__upload_dir = upload_dir
+        self.__temp_dir = None
+        self.__shoppers_file = shoppers_file
+        self.__database = database
+        self.__parse_cache = parse_cache or ParseCache(parser_version=PARSER_VERSION)
+        self.__max_upload_bytes = max_upload_bytes
+        self.__routes = {("GET", "/health"): self.__health,
+                         ("POST", "/parse"): self.__parse,
+                         ("POST", "/divide"): self.__divide,
+                         ("POST", "/settle"): self.__settle,
+                         ("GET", "/shoppers"): self.__get_shoppers,
+                         ("POST", "/shoppers"): self.__update_shoppers}
+        self.__pending_jobs = 0
+        self.__job_slots = None
+        self.__executor = None
+        self.__server = None
+        self.__status_counts = {}
+
+    async def __run_job(self, function, *args):
+        """
+        Runs a CPU-bound job in the worker pool, or answers 503 if the pool and its queue are full.
+
+        Raises:
+        - HTTPError: 503 if too many jobs are already running or waiting.
+        """
+
+        if self.__pending_jobs >= self.__max_workers + self.__max_queued:
+            raise HTTPError(503, "The service is busy, try again shortly.", {"Retry-After": "1"})
+
+        self.__pending_jobs += 1
+        try:
+            async with self.__job_slots:
+                return await asyncio.get_running_loop().run_in_executor(self.__executor, function, *args)
+        finally:
+            self.__pending_jobs -= 1
+
+    @staticmethod
+    def __json_body(body):
+        """Decodes a JSON object request body, raising a 400 if it is not one."""
+
+        try:
+            request = json.loads(body or b"{}")
+        except ValueError as e:
+            raise HTTPError(400, f"The body is not JSON. {e}")
+
+        if not isinstance(request, dict):
+            raise HTTPError(400, "The body must be a JSON object.")
+
+        return request
+
+    def __receipt_location(self, receipt_id):
+        """Returns the file location of an uploaded receipt, raising a 400 or 404 if there is no such receipt."""
+
+        if not isinstance(receipt_id, str) or not RECEIPT_ID.fullmatch(receipt_id):
+            raise HTTPError(400, "receipt must be the id returned by /parse.")
+
+        file_location = os.path.join(self.__upload_dir, f"{receipt_id}.pdf")
+        if not os.path.isfile(file_location):
+            raise HTTPError(404, f"No receipt {receipt_id} has been uploaded.")
+
+        return file_location
+
+    async def __health(self, headers, body):
+        """Answers GET /health."""
+
+        return {"status": "ok", "workers": self.__max_workers, "pending_jobs": self.__pending_jobs,
+                "max_queued": self.__max_queued}
+
+    async def __parse(self, headers, body):
+        """Answers POST /parse: keeps the uploaded receipt and returns its id and items."""
+
+        pdf_bytes = read_upload(headers, body)
+        receipt_id = hashlib.sha256(pdf_bytes).hexdigest()
+        file_location = os.path.join(self.__upload_dir, f"{receipt_id}.pdf")
+
+        # The same receipt uploaded again keeps its file, written whole before it is renamed into place
+        if not os.path.isfile(file_location):
+            temp_location = f"{file_location}.{os.getpid()}.part"
+            with open(temp_location, "wb") as file:
+                file.write(pdf_bytes)
+            os.replace(temp_location, file_location)
+
+        try:
+            parsed_receipt = await self.__run_job(parse_upload, file_location, self.__parse_cache)
+        except HTTPError:
+            raise
+        except Exception as e:
+            raise HTTPError(422, f"The receipt could not be read. {type(e).__name__}: {e}")
+
+        return dict(parsed_receipt, receipt=receipt_id)
+
+    async def __divide(self, headers, body):
+        """Answers POST /divide: divides an uploaded receipt and returns the owings."""
+
+        request = self.__json_body(body)
+        file_location = self.__receipt_location(request.get("receipt"))
+
+        # Check the spec here, so a bad one is the client's error and never reaches a worker
+        try:
+            AssignmentSpec.from_dict(request["assignment"])
+        except (ValueError, KeyError, TypeError, AttributeError) as e:
+            raise HTTPError(400, f"The assignment is not valid. {type(e).__name__}: {e}")
+
+        try:
+            return await self.__run_job(divide_upload, file_location, request["assignment"], self.__parse_cache,
+                                        self.__shoppers_file, self.__database, bool(request.get("save")))
+        except HTTPError:
+            raise
+        except Exception as e:
+            raise HTTPError(422, f"The receipt could not be divided. {type(e).__name__}: {e}")
+
+    async def __settle(self, headers, body):
+        """Answers POST /settle: works out the transfers that settle a list of owings."""
+
+        request = self.__json_body(body)
+        settlement_ledger = SettlementLedger()
+
+        owings_list = request.get("owings", [])
+        if not isinstance(owings_list, list):
+            raise HTTPError(400, 'owings must be a list of {"payer": name, "owings": {name: amount}}.')
+
+        for owings_num, owings in enumerate(owings_list, 1):
+            try:
+                settlement_ledger.add_owings(owings)
+            except (ValueError, KeyError, TypeError, AttributeError) as e:
+                raise HTTPError(400, f"Owings {owings_num} is not a set of owings. {e}")
+
+        return {"receipts": settlement_ledger.get_receipt_count(),
+                "transfers": [{"from": debtor, "to": creditor, "amount": cents / 100}
+                              for debtor, creditor, cents in settlement_ledger.settle()]}
+
+    async def __get_shoppers(self, headers, body):
+        """Answers GET /shoppers: the spending tracker of every registered shopper."""
+
+        # Replaying the journal reads files, so it runs on a thread rather than in the loop
+        return {"shoppers": await asyncio.get_running_loop().run_in_executor(
+            None, read_shoppers, self.__shoppers_file, self.__database)}
+
+    async def __update_shoppers(self, headers, body):
+        """Answers POST /shoppers: adds to the spending trackers and returns them all."""
+
+        spending = self.__json_body(body).get("spending")
+
+        if not isinstance(spending, dict) or not all(
+                isinstance(name, str) and name and isinstance(amount, (int, float)) and not isinstance(amount, bool)
+                for name, amount in spending.items()):
+            raise HTTPError(400, 'spending must be {"name": dollars, ...}.')
+
+        spending_changes = {name.strip().lower(): to_cents(amount) for name, amount in spending.items()}
+
+        return {"shoppers": await asyncio.get_running_loop().run_in_executor(
+            None, read_shoppers, self.__shoppers_file, self.__database, spending_changes)}
+
+    async def __read_request(self, reader):
+        """
+        Reads one request from a connection.
+
+        Returns:
+        - tuple: (method, path, HTTP version, headers keyed by lower case name, body), None if the client closed
+          the connection between requests.
+        """
+
+        try:
+            head = await reader.readuntil(b"\r\n\r\n")
+        except asyncio.IncompleteReadError as e:
+            if not e.partial.strip():
+                return None
+            raise HTTPError(400, "The request was cut short.")
+        except asyncio.LimitOverrunError:
+            raise HTTPError(413, "The request head is too large.")
+
+        request_line, *header_lines = head.decode("latin-1").rstrip("\r\n").split("\r\n")
+        try:
+            method, target, version = request_line.split(" ")
+        except ValueError:
+            raise HTTPError(400, "Malformed request line.")
+
+        headers = {}
+        for header_line in header_lines:
+            name, _, value = header_line.partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+        if "chunked" in headers.get("transfer-encoding", "").lower():
+            raise HTTPError(411, "Send the body with a Content-Length.")
+
+        try:
+            content_length = int(headers.get("content-length", 0))
+        except ValueError:
+            raise HTTPError(400, "Malformed Content-Length.")
+
+        if content_length > self.__max_upload_bytes:
+            raise HTTPError(413, f"The body is larger than {self.__max_upload_bytes} bytes.")
+
+        body = await reader.readexactly(content_length) if content_length > 0 else b""
+
+        return method.upper(), target.split("?", 1)[0], version, headers, body
+
+    async def __write_response(self, writer, status, payload, keep_alive, headers=None):
+        """Writes a JSON response to a connection."""
+
+        body = json.dumps(payload).encode("utf-8")
+        head = [f"HTTP/1.1 {status} {STATUS_REASONS.get(status, '')}",
+                "Content-Type: application/json",
+                f"Content-Length: {len(body)}",
+                f"Connection: {'keep-alive' if keep_alive else 'close'}"]
+        head.extend(f"{name}: {value}" for name, value in (headers or {}).items())
+
+        writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1") + body)
+        await writer.drain()
+        self.__status_counts[status] = self.__status_counts.get(status, 0) + 1
+
+    async def __handle_connection(self, reader, writer):
+        """Answers the requests of one connection, keeping it open between requests unless the client closes it."""
+
+        try:
+            keep_alive = True
+
+            while keep_alive:
+                try:
+                    request = await asyncio.wait_for(self.__read_request(reader), REQUEST_TIMEOUT)
+                    if request is None:
+                        break
+
+                    method, path, version, headers, body = request
+                    connection = headers.get("connection", "").lower()
+                    keep_alive = connection == "keep-alive" if version == "HTTP/1.0" else connection != "close"
+
+                    route = self.__routes.get((method, path))
+                    if route is None:
+                        allowed = [route_method for route_method, route_path in self.__routes if route_path == path]
+                        if allowed:
+                            raise HTTPError(405, f"{path} only answers {', '.join(allowed)}.",
+                                            {"Allow": ", ".join(allowed)})
+                        raise HTTPError(404, f"No endpoint {path}.")
+
+                    await self.__write_response(writer, 200, await route(headers, body), keep_alive)
+
+                except HTTPError as e:
+                    # After a malformed request the rest of the stream cannot be trusted, so the connection is closed
+                    keep_alive = keep_alive and e.status not in (400, 411, 413)
+                    await self.__write_response(writer, e.status, {"error": str(e)}, keep_alive, e.headers)
+                except asyncio.TimeoutError:
+                    break
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    break
+                except Exception as e:
+                    print(f"SERVICE_ERROR: {type(e).__name__}: {e}", file=sys.stderr)
+                    keep_alive = False
+                    await self.__write_response(writer, 500, {"error": f"{type(e).__name__}: {e}"}, keep_alive)
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def start(self):
+        """Starts the worker pool and starts listening."""
+
+        if self.__upload_dir is None:
+            self.__temp_dir = tempfile.TemporaryDirectory(prefix="receipt_uploads_")
+            self.__upload_dir = self.__temp_dir.name
+        os.makedirs(self.__upload_dir, exist_ok=True)
+
+        self.__job_slots = asyncio.Semaphore(self.__max_workers)
+        self.__executor = ProcessPoolExecutor(max_workers=self.__max_workers)
+        self.__server = await asyncio.start_server(self.__handle_connection, self.__host, self.__port,
+                                                   limit=MAX_HEAD_BYTES)
+
+    async def close(self):
+        """Stops listening, waits for the jobs in progress and shuts the worker pool down."""
+
+        if self.__server is not None:
+            self.__server.close()
+            await self.__server.wait_closed()
+            self.__server = None
+
+        if self.__executor is not None:
+            await asyncio.get_running_loop().run_in_executor(None, self.__executor.shutdown)
+            self.__executor = None
+
+        if self.__temp_dir is not None:
+            self.__temp_dir.cleanup()
+            self.__temp_dir = None
+            self.__upload_dir = None
+
+    async def serve(self, stop_event=None):
+        """
+        Serves requests until stopped.
+
+        Parameters:
+        - stop_event (asyncio.Event): Set to stop the service, which finishes the jobs in progress first.
+        """
+
+        stop_event = stop_event or asyncio.Event()
+
+        await self.start()
+        try:
+            host, port = self.get_address()
+            print(f"Serving on http://{host}:{port} with {self.__max_workers} worker(s), Ctrl+C to stop.")
+            await stop_event.wait()
+        finally:
+            await self.close()
+
+    def run(self):
+        """Runs the service on a new event loop until it is interrupted with Ctrl+C or SIGTERM."""
+
+        async def serve_until_signalled():
+            stop_event = asyncio.Event()
+            loop = asyncio.get_running_loop()
+
+            # Signal handlers are only available on Unix, elsewhere Ctrl+C raises KeyboardInterrupt
+            for signal_number in (signal.SIGINT, signal.SIGTERM):
+                try:
+                    loop.add_signal_handler(signal_number, stop_event.set)
+                except (NotImplementedError, RuntimeError):
+                    pass
+
+            await self.serve(stop_event)
+
+        try:
+            asyncio.run(serve_until_signalled())
+        except KeyboardInterrupt:
+            pass
+
+    def get_address(self):
+        """Retrieves the (host, port) the service listens on, the port chosen if it was started on port 0."""
+
+        if self.__server is None:
+            return self.__host, self.__port
+
+        return self.__server.sockets[0].getsockname()[:2]
+
+    def get_status_counts(self):
+        """Retrieves the number of responses of each status."""
+
+        return self.__status_counts
+
+    def get_upload_dir(self):
+        """Retrieves the folder the uploaded receipts are kept in, None until started if no folder was given."""
+
+        return self.__upload_dir
+
+    def __str__(self):
+        '''Returns a summary of the responses given.'''
+
+        responses = ", ".join(f"{count} x {status}" for status, count in sorted(self.__status_counts.items()))
+
+        return f"Answered {sum(self.__status_counts.values())} request(s) ({responses or 'none'})"
+
+
+def main(argv=None):
+    """Command line entry point: python ReceiptService.py [port]"""
+
+    argv = sys.argv[1:] if argv is None else argv
+
+    receipt_service = ReceiptService(port=int(argv[0]) if argv else 8080)
+    receipt_service.run()
+    print(receipt_service)
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
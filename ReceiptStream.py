@@ -0,0 +1,32 @@
+from PipelineStats import NULL_STATS
+
+
+def iter_pdf_lines(doc, stats=NULL_STATS):
+    """
+    Yields the text lines of a PDF document page by page.
+
+    Only the text of the current page is held in memory, so the memory used stays bounded no matter how many
+    pages the receipt runs to. Pages are only read as the consumer asks for more lines, so a consumer that stops
+    early (for example at the receipt TOTAL) never extracts the remaining pages.
+
+    Parameters:
+    - doc (fitz.Document): The opened PDF document.
+    - stats (PipelineStats): Collects the time spent in get_text and the number of pages and lines read.
+
+    Yields:
+    - str: A single line of text, without the trailing newline.
+    """
+
+    for page in doc:
+        with stats.stage("get_text"):
+            text = page.get_text("text")
+
+        # Split the text into lines, dropping the empty line left by the page's trailing newline
+        lines = text.split('\n')
+        if lines and lines[-1] == "":
+            lines.pop()
+
+        stats.count("pages")
+        stats.count("lines", len(lines))
+
+        yield from lines
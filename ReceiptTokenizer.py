@@ -0,0 +1,130 @@
+import re  # inbuilt
+
+# Symbols such as '^' or '*' that mark promotions in front of an item name
+LEADING_SYMBOLS = re.compile(r"[\W_]*")
+
+# Characters making up the price at the end of a line
+PRICE_CHARS = "0123456789."
+
+# Kinds of line found in the item section of a receipt
+ITEM = "item"
+MEMBER_SAVING = "member_saving"
+OFFER = "offer"
+EVERYDAY_EXTRA = "everyday_extra"
+
+# (kind, marker, at start) entries identifying the discount lines of a Woolworths receipt, in priority order
+DEFAULT_DISCOUNT_MARKERS = ((MEMBER_SAVING, "Member Price Saving", True),
+                            (OFFER, "OFFER", False),
+                            (EVERYDAY_EXTRA, "Everyday Extra Discount", True))
+
+
+class LineTokenizer():
+    """
+    Class used to turn a receipt line into its (name, price, kind) tokens with precompiled patterns.
+
+    The name column ends at the first run of `column_gap` spaces and the price is the run of digits at the end
+    of the line. Both are found with a precompiled pattern and C-level string searches in a single pass,
+    instead of character by character loops.
+
+    Attributes:
+    - __column_gap (int): Number of consecutive spaces separating the name column from the price column.
+    - __gap (str): The run of spaces separating the name column from the price column.
+    - __discount_markers (tuple): (kind, marker, at start) entries identifying discount lines, in priority order.
+
+    Methods:
+    - split_line: Splits a line into its raw name and price text.
+    - tokenize: Turns a line into its (name, price, kind) tokens.
+    - classify_line: Identifies the kind of a line.
+    - get_column_gap: Retrieves the number of spaces separating the name and price columns.
+    """
+
+    def __init__(self, column_gap=3, discount_markers=DEFAULT_DISCOUNT_MARKERS):
+        """
+        Initializes the LineTokenizer object.
+
+        Parameters:
+        - column_gap (int): Number of consecutive spaces separating the name column from the price column.
+        - discount_markers (tuple): (kind, marker, at start) entries identifying discount lines, in priority
+          order. A marker with at start set must begin the line, otherwise it may appear anywhere in it.
+        """
+
+        self.__column_gap = column_gap
+        self.__gap = " " * column_gap
+        self.__discount_markers = tuple(discount_markers)
+
+    def get_column_gap(self):
+        """Retrieves the number of spaces separating the name and price columns."""
+
+        return self.__column_gap
+
+    def split_line(self, line):
+        """
+        Splits a line into its raw name and price text.
+
+        Parameters:
+        - line (str): Line of text from the receipt.
+
+        Returns:
+        - tuple: (name, price text)
+        """
+
+        # Skip any leading symbols, then the name runs to the first gap
+        name_start = LEADING_SYMBOLS.match(line).end()
+        gap_index = line.find(self.__gap, name_start)
+        name = line[name_start:] if gap_index == -1 else line[name_start:gap_index]
+
+        # The price is the run of digits at the end of the line, along with its '$' and sign if present
+        price_start = len(line.rstrip(PRICE_CHARS))
+        if line.endswith("$", 0, price_start):
+            price_start -= 1
+        if line.endswith("-", 0, price_start):
+            price_start -= 1
+
+        return name.strip(), line[price_start:]
+
+    def tokenize(self, line):
+        """
+        Turns a line into its (name, price, kind) tokens.
+
+        Parameters:
+        - line (str): Line of text from the receipt.
+
+        Returns:
+        - tuple: (name, price, kind), where price is None if the line has no readable price.
+          Item prices are always positive, discount lines keep their sign.
+        """
+
+        name, price_text = self.split_line(line)
+        kind = self.classify_line(line)
+
+        negative = price_text.startswith("-")
+
+        try:
+            price = float(price_text.lstrip("-$"))
+        except ValueError:
+            return name, None, kind
+
+        # Only discounts carry a sign, an item's price is read from its trailing digits alone
+        if negative and kind != ITEM:
+            price = -price
+
+        return name, price, kind
+
+    def classify_line(self, line):
+        """
+        Identifies the kind of a line.
+
+        Parameters:
+        - line (str): Line of text from the receipt.
+
+        Returns:
+        - str: One of ITEM, MEMBER_SAVING, OFFER or EVERYDAY_EXTRA.
+        """
+
+        line = line.lstrip()
+
+        for kind, marker, at_start in self.__discount_markers:
+            if line.startswith(marker) if at_start else marker in line:
+                return kind
+
+        return ITEM
@@ -0,0 +1,187 @@
+import re  # inbuilt
+
+from ReceiptTokenizer import DEFAULT_DISCOUNT_MARKERS
+
+# Number of lines at the top of page 1 used to detect the retailer
+DETECTION_LINES = 8
+
+# Everything but letters and digits is dropped before the header is matched
+NOT_ALPHANUMERIC = re.compile(r"[\W_]+")
+
+
+class UnsupportedReceiptError(Exception):
+    """Raised when a receipt does not match any registered retailer profile."""
+
+
+class RetailerProfile():
+    """
+    Class holding the layout settings of one retailer's digital receipts.
+
+    Attributes:
+    - __name (str): Unique name of the retailer profile.
+    - __detect_markers (tuple): Text of which at least one appears in the first lines of the retailer's receipts,
+      lower case with only the letters and digits kept.
+    - __header_rows (int): Number of rows in the receipt used for the header.
+    - __stop_markers (tuple): Text marking the end of the item section.
+    - __total_marker (str): Text identifying the line holding the receipt total.
+    - __skip_prefixes (tuple): Prefixes of lines in the item section that are neither items nor discounts.
+    - __discount_markers (tuple): (kind, marker, at start) entries identifying discount lines, in priority order.
+    - __column_gap (int): Number of consecutive spaces separating the name column from the price column.
+
+    Methods:
+    - matches: Checks whether the first lines of a receipt belong to this retailer.
+    - get_name, get_detect_markers, get_header_rows, get_stop_markers, get_total_marker, get_skip_prefixes,
+      get_discount_markers, get_column_gap: Retrieve the profile settings.
+    """
+
+    def __init__(self, name, detect_markers, header_rows, stop_markers, total_marker, skip_prefixes=(),
+                 discount_markers=(), column_gap=3):
+        """
+        Initializes the RetailerProfile object.
+
+        Parameters:
+        - name (str): Unique name of the retailer profile.
+        - detect_markers (tuple): Text of which at least one appears in the first lines of the retailer's receipts.
+        - header_rows (int): Number of rows in the receipt used for the header.
+        - stop_markers (tuple): Text marking the end of the item section.
+        - total_marker (str): Text identifying the line holding the receipt total.
+        - skip_prefixes (tuple): Prefixes of lines in the item section that are neither items nor discounts.
+        - discount_markers (tuple): (kind, marker, at start) entries identifying discount lines, in priority order.
+        - column_gap (int): Number of consecutive spaces separating the name column from the price column.
+        """
+
+        self.__name = name
+        self.__detect_markers = tuple(NOT_ALPHANUMERIC.sub("", marker.lower()) for marker in detect_markers)
+        self.__header_rows = header_rows
+        self.__stop_markers = tuple(stop_markers)
+        self.__total_marker = total_marker
+        self.__skip_prefixes = tuple(skip_prefixes)
+        self.__discount_markers = tuple(discount_markers)
+        self.__column_gap = column_gap
+
+    def matches(self, first_lines):
+        """
+        Checks whether the first lines of a receipt belong to this retailer.
+
+        Text is compared in lower case with only the letters and digits kept, so "ABN: 88 000 014 675" and
+        "ABN 88000014675" both match, as do markers split over two lines.
+
+        Parameters:
+        - first_lines (list): The first few lines of page 1 of the receipt.
+        """
+
+        header_text = NOT_ALPHANUMERIC.sub("", "".join(first_lines).lower())
+
+        return any(marker in header_text for marker in self.__detect_markers)
+
+    def get_name(self):
+        """Retrieves the name of the retailer profile."""
+
+        return self.__name
+
+    def get_detect_markers(self):
+        """Retrieves the text used to detect the retailer."""
+
+        return self.__detect_markers
+
+    def get_header_rows(self):
+        """Retrieves the number of rows in the receipt used for the header."""
+
+        return self.__header_rows
+
+    def get_stop_markers(self):
+        """Retrieves the text marking the end of the item section."""
+
+        return self.__stop_markers
+
+    def get_total_marker(self):
+        """Retrieves the text identifying the line holding the receipt total."""
+
+        return self.__total_marker
+
+    def get_skip_prefixes(self):
+        """Retrieves the prefixes of item section lines that are neither items nor discounts."""
+
+        return self.__skip_prefixes
+
+    def get_discount_markers(self):
+        """Retrieves the (kind, marker, at start) entries identifying discount lines."""
+
+        return self.__discount_markers
+
+    def get_column_gap(self):
+        """Retrieves the number of spaces separating the name and price columns."""
+
+        return self.__column_gap
+
+    def __repr__(self):
+        '''Return the data associated with the profile.'''
+
+        return f"RetailerProfile('{self.__name}', header_rows={self.__header_rows})"
+
+
+# Registry of the known retailer profiles, in detection order
+RETAILER_PROFILES = {}
+
+
+def register_profile(profile):
+    """
+    Adds a retailer profile to the registry, replacing any profile of the same name.
+
+    Parameters:
+    - profile (RetailerProfile): The retailer profile to register.
+    """
+
+    RETAILER_PROFILES[profile.get_name()] = profile
+
+
+def get_profile(name):
+    """
+    Retrieves a registered retailer profile by name.
+
+    Parameters:
+    - name (str): Name of the retailer profile.
+    """
+
+    try:
+        return RETAILER_PROFILES[name]
+    except KeyError:
+        raise UnsupportedReceiptError(f"No retailer profile named '{name}'.") from None
+
+
+def detect_profile(first_lines):
+    """
+    Detects the retailer of a receipt from the first few lines of page 1.
+
+    Parameters:
+    - first_lines (list): The first few lines of page 1 of the receipt.
+
+    Returns:
+    - RetailerProfile: The first registered profile matching the receipt.
+
+    Raises:
+    - UnsupportedReceiptError: If no registered profile matches, so unknown layouts are rejected before the
+      rest of the receipt is read.
+    """
+
+    first_lines = list(first_lines)[:DETECTION_LINES]
+
+    for profile in RETAILER_PROFILES.values():
+        if profile.matches(first_lines):
+            return profile
+
+    raise UnsupportedReceiptError("Receipt layout not recognised, no retailer profile matches its header.")
+
+
+# Woolworths digital receipts (eReceipts). Not every eReceipt prints the store name as text, the logo can be an
+# image, but every tax invoice carries the Woolworths Group ABN
+WOOLWORTHS = RetailerProfile(name="woolworths",
+                             detect_markers=("woolworths", "ABN 88 000 014 675"),
+                             header_rows=4,
+                             stop_markers=("SUBTOTAL", "^Promotional Price"),
+                             total_marker=" TOTAL ",
+                             skip_prefixes=("PRICE REDUCED",),
+                             discount_markers=DEFAULT_DISCOUNT_MARKERS,
+                             column_gap=3)
+
+register_profile(WOOLWORTHS)
@@ -0,0 +1,266 @@
+import sqlite3  # inbuilt
+
+# Bump whenever the schema changes
+SCHEMA_VERSION = 1
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS shoppers (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE,
+    spending_cents INTEGER NOT NULL DEFAULT 0
+);
+
+CREATE TABLE IF NOT EXISTS receipts (
+    id INTEGER PRIMARY KEY,
+    file_location TEXT,
+    divided_at TEXT NOT NULL,
+    payer_id INTEGER REFERENCES shoppers (id),
+    total_cents INTEGER NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS items (
+    receipt_id INTEGER NOT NULL REFERENCES receipts (id) ON DELETE CASCADE,
+    item_num INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    price_cents INTEGER NOT NULL,
+    PRIMARY KEY (receipt_id, item_num)
+);
+
+CREATE TABLE IF NOT EXISTS assignments (
+    receipt_id INTEGER NOT NULL,
+    item_num INTEGER NOT NULL,
+    shopper_id INTEGER REFERENCES shoppers (id),
+    PRIMARY KEY (receipt_id, item_num),
+    FOREIGN KEY (receipt_id, item_num) REFERENCES items (receipt_id, item_num) ON DELETE CASCADE
+);
+
+CREATE INDEX IF NOT EXISTS idx_receipts_divided_at ON receipts (divided_at);
+CREATE INDEX IF NOT EXISTS idx_receipts_payer ON receipts (payer_id, divided_at);
+CREATE INDEX IF NOT EXISTS idx_items_name ON items (name);
+CREATE INDEX IF NOT EXISTS idx_assignments_shopper ON assignments (shopper_id, receipt_id);
+"""
+
+
+class SQLiteStorage():
+    """
+    Optional SQLite store of the shoppers, the receipts they divided, the receipt items and who took each item.
+
+    The database runs in WAL mode, so reading the history never blocks a save, and every save is a single
+    transaction of bulk inserts, so storing a receipt costs one commit however many items it has. Receipts are
+    indexed by date and payer, items by name and assignments by shopper, so lookups stay fast with years of
+    history. Items left in the combined cart are stored with no shopper.
+
+    Attributes:
+    - __database_file (str): File name of the SQLite database.
+    - __connection (sqlite3.Connection): Connection to the database, opened when first needed.
+
+    Methods:
+    - load_shoppers: Retrieves every shopper's spending tracker.
+    - add_shoppers: Saves shoppers the database does not have yet.
+    - add_spending: Adds to the spending trackers of shoppers.
+    - save_receipts: Saves divided receipts, their items and who took each item.
+    - get_receipts: Retrieves the divided receipts, optionally of one payer or between two dates.
+    - get_item_owners: Retrieves who took an item, most recent first.
+    - get_spending_between: Retrieves what each shopper took between two dates.
+    - close: Closes the connection to the database.
+    """
+
+    def __init__(self, database_file="receipt_divider.db"):
+        """
+        Initializes the SQLiteStorage object without opening the database.
+
+        Parameters:
+        - database_file (str): File name of the SQLite database, created if it does not exist.
+        """
+
+        self.__database_file = database_file
+        self.__connection = None
+
+    def __connect(self):
+        """Retrieves the connection to the database, opening it and creating the schema the first time."""
+
+        if self.__connection is None:
+            connection = sqlite3.connect(self.__database_file)
+            connection.execute("PRAGMA journal_mode = WAL")
+            connection.execute("PRAGMA synchronous = NORMAL")
+            connection.execute("PRAGMA foreign_keys = ON")
+
+            with connection:
+                connection.executescript(SCHEMA)
+                connection.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+            self.__connection = connection
+
+        return self.__connection
+
+    def __shopper_ids(self, connection, names):
+        """Retrieves the id of each shopper keyed by name, adding the shoppers the database does not have."""
+
+        names = list(names)
+        connection.executemany("INSERT OR IGNORE INTO shoppers (name) VALUES (?)", ((name,) for name in names))
+
+        return dict(connection.execute(f"SELECT name, id FROM shoppers WHERE name IN ({', '.join('?' * len(names))})",
+                                       names))
+
+    def load_shoppers(self):
+        """
+        Retrieves every shopper's spending tracker.
+
+        Returns:
+        - dict: Spending tracker in cents keyed by shopper name, in the order the shoppers were added.
+        """
+
+        return dict(self.__connect().execute("SELECT name, spending_cents FROM shoppers ORDER BY id"))
+
+    def add_shoppers(self, spending):
+        """
+        Saves shoppers the database does not have yet, leaving the shoppers it has as they are.
+
+        Parameters:
+        - spending (dict): Spending tracker in cents keyed by shopper name.
+        """
+
+        connection = self.__connect()
+
+        with connection:
+            connection.executemany("INSERT OR IGNORE INTO shoppers (name, spending_cents) VALUES (?, ?)",
+                                   spending.items())
+
+    def add_spending(self, spending_changes):
+        """
+        Adds to the spending trackers of shoppers in one transaction, adding the shoppers that are new.
+
+        Parameters:
+        - spending_changes (dict): Amount in cents to add to each shopper's spending tracker, keyed by name.
+        """
+
+        connection = self.__connect()
+
+        with connection:
+            connection.executemany("INSERT INTO shoppers (name, spending_cents) VALUES (?, ?) "
+                                   "ON CONFLICT (name) DO UPDATE "
+                                   "SET spending_cents = spending_cents + excluded.spending_cents",
+                                   spending_changes.items())
+
+    def save_receipts(self, receipt_records):
+        """
+        Saves divided receipts, their items and who took each item, all in one transaction.
+
+        Parameters:
+        - receipt_records (list): Receipt records as built by ReceiptDivider.build_receipt_record, dicts of
+          {"file_location", "divided_at", "payer", "total_cents", "items": [(item number, name, price in cents,
+          shopper name or None for the combined cart)]}.
+
+        Returns:
+        - list: Id of each saved receipt.
+        """
+
+        connection = self.__connect()
+        receipt_ids = []
+
+        with connection:
+            shopper_names = {record["payer"] for record in receipt_records}
+            shopper_names.update(owner for record in receipt_records for *_, owner in record["items"] if owner)
+            shopper_ids = self.__shopper_ids(connection, shopper_names)
+
+            for record in receipt_records:
+                cursor = connection.execute("INSERT INTO receipts (file_location, divided_at, payer_id, total_cents) "
+                                            "VALUES (?, ?, ?, ?)",
+                                            (record["file_location"], record["divided_at"],
+                                             shopper_ids[record["payer"]], record["total_cents"]))
+                receipt_id = cursor.lastrowid
+                receipt_ids.append(receipt_id)
+
+                connection.executemany("INSERT INTO items (receipt_id, item_num, name, price_cents) "
+                                       "VALUES (?, ?, ?, ?)",
+                                       ((receipt_id, item_num, name, price_cents)
+                                        for item_num, name, price_cents, _ in record["items"]))
+                connection.executemany("INSERT INTO assignments (receipt_id, item_num, shopper_id) "
+                                       "VALUES (?, ?, ?)",
+                                       ((receipt_id, item_num, shopper_ids.get(owner))
+                                        for item_num, _, _, owner in record["items"]))
+
+        return receipt_ids
+
+    def get_receipts(self, payer=None, since=None, until=None):
+        """
+        Retrieves the divided receipts, most recent first.
+
+        Parameters:
+        - payer (str): Only the receipts this shopper paid, None for every payer.
+        - since (str): Only the receipts divided on or after this ISO date, None for no lower bound.
+        - until (str): Only the receipts divided before this ISO date, None for no upper bound.
+
+        Returns:
+        - list: Dicts of {"id", "file_location", "divided_at", "payer", "total_cents"}.
+        """
+
+        query = ("SELECT receipts.id, file_location, divided_at, shoppers.name, total_cents FROM receipts "
+                 "LEFT JOIN shoppers ON shoppers.id = receipts.payer_id WHERE 1")
+        parameters = []
+
+        if payer is not None:
+            query += " AND shoppers.name = ?"
+            parameters.append(payer)
+        if since is not None:
+            query += " AND divided_at >= ?"
+            parameters.append(since)
+        if until is not None:
+            query += " AND divided_at < ?"
+            parameters.append(until)
+
+        rows = self.__connect().execute(query + " ORDER BY divided_at DESC, receipts.id DESC", parameters)
+
+        return [{"id": receipt_id, "file_location": file_location, "divided_at": divided_at, "payer": payer_name,
+                 "total_cents": total_cents}
+                for receipt_id, file_location, divided_at, payer_name, total_cents in rows]
+
+    def get_item_owners(self, item_name, limit=20):
+        """
+        Retrieves who took an item, most recent first.
+
+        Parameters:
+        - item_name (str): Name of the item as it appears on the receipt.
+        - limit (int): Maximum number of results.
+
+        Returns:
+        - list: (date divided, shopper name or None for the combined cart) tuples.
+        """
+
+        return self.__connect().execute(
+            "SELECT receipts.divided_at, shoppers.name FROM items "
+            "JOIN receipts ON receipts.id = items.receipt_id "
+            "JOIN assignments ON assignments.receipt_id = items.receipt_id AND assignments.item_num = items.item_num "
+            "LEFT JOIN shoppers ON shoppers.id = assignments.shopper_id "
+            "WHERE items.name = ? ORDER BY receipts.divided_at DESC LIMIT ?", (item_name, limit)).fetchall()
+
+    def get_spending_between(self, since, until):
+        """
+        Retrieves the total of the items each shopper took between two dates, not counting the combined carts.
+
+        Parameters:
+        - since (str): ISO date the period starts on.
+        - until (str): ISO date the period ends before.
+
+        Returns:
+        - dict: Total in cents keyed by shopper name.
+        """
+
+        return dict(self.__connect().execute(
+            "SELECT shoppers.name, SUM(items.price_cents) FROM receipts "
+            "JOIN assignments ON assignments.receipt_id = receipts.id "
+            "JOIN items ON items.receipt_id = assignments.receipt_id AND items.item_num = assignments.item_num "
+            "JOIN shoppers ON shoppers.id = assignments.shopper_id "
+            "WHERE receipts.divided_at >= ? AND receipts.divided_at < ? GROUP BY shoppers.name", (since, until)))
+
+    def close(self):
+        """Closes the connection to the database."""
+
+        if self.__connection is not None:
+            self.__connection.close()
+            self.__connection = None
+
+    def __repr__(self):
+        '''Return the data associated with the storage.'''
+
+        return f"SQLiteStorage(database_file={self.__database_file})"
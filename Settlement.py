@@ -0,0 +1,172 @@
+import heapq  # inbuilt
+
+from Money import to_cents, format_cents
+
+
+def settle_balances(balances):
+    """
+    Works out a short list of transfers that brings every balance to zero.
+
+    Shoppers whose debt exactly matches another shopper's credit are paired first, since one transfer then closes
+    two balances. The rest are settled greedily: the largest debtor pays the largest creditor as much as they can,
+    and whoever still has a balance goes back on their heap. This takes at most one transfer less than the number
+    of shoppers with a balance, in O(n log n) time.
+
+    Parameters:
+    - balances (dict): Net balance in cents keyed by shopper name, positive if the shopper is owed money.
+
+    Returns:
+    - list: (debtor name, creditor name, cents) transfers.
+
+    Raises:
+    - ValueError: If the balances do not add up to zero.
+    """
+
+    if sum(balances.values()) != 0:
+        raise ValueError(f"Balances do not add up to zero, they are off by {format_cents(sum(balances.values()))}.")
+
+    transfers = []
+
+    # Pair the debts that exactly match a credit
+    creditors_by_amount = {}
+    for name, cents in balances.items():
+        if cents > 0:
+            creditors_by_amount.setdefault(cents, []).append(name)
+
+    debtors = []
+    for name, cents in balances.items():
+        if cents < 0:
+            matching_creditors = creditors_by_amount.get(-cents)
+            if matching_creditors:
+                transfers.append((name, matching_creditors.pop(), -cents))
+            else:
+                debtors.append((cents, name))
+
+    creditors = [(-cents, name) for cents, names in creditors_by_amount.items() for name in names]
+
+    # Largest debtor pays largest creditor, both heaps hold negated amounts so the largest comes first
+    heapq.heapify(debtors)
+    heapq.heapify(creditors)
+
+    while debtors:
+        debt, debtor = heapq.heappop(debtors)
+        credit, creditor = heapq.heappop(creditors)
+        amount = min(-debt, -credit)
+
+        transfers.append((debtor, creditor, amount))
+
+        if -debt > amount:
+            heapq.heappush(debtors, (debt + amount, debtor))
+        if -credit > amount:
+            heapq.heappush(creditors, (credit + amount, creditor))
+
+    return transfers
+
+
+def format_transfers(transfers):
+    """
+    Builds the user-friendly string of who pays whom.
+
+    Parameters:
+    - transfers (list): (debtor name, creditor name, cents) transfers, as returned by settle_balances.
+    """
+
+    if not transfers:
+        return "Everyone is settled up.\n"
+
+    return "".join(f"{debtor} pays {creditor}: {format_cents(cents)}.\n" for debtor, creditor, cents in transfers)
+
+
+class SettlementLedger():
+    """
+    Class keeping the net balance of every shopper across any number of receipts and payers.
+
+    Each receipt credits the shopper who paid with what the others owe them and debits each of the others, so the
+    balances always add up to zero. Settling the ledger gives a near-minimal list of transfers instead of one
+    payment per receipt.
+
+    Attributes:
+    - __balances (dict): Net balance in cents keyed by shopper name, positive if the shopper is owed money.
+    - __receipt_count (int): Number of receipts added to the ledger.
+
+    Methods:
+    - add_receipt: Adds a receipt from who paid and each shopper's share.
+    - add_owings: Adds a receipt from the owings returned by ReceiptDivider.compute_owings.
+    - add_transfer: Records money paid from one shopper to another.
+    - settle: Works out the transfers that settle every balance.
+    - get_balance: Retrieves a shopper's net balance.
+    - get_balances: Retrieves every non-zero net balance.
+    - get_receipt_count: Retrieves the number of receipts added.
+    """
+
+    def __init__(self):
+        """Initializes an empty SettlementLedger object."""
+
+        self.__balances = {}
+        self.__receipt_count = 0
+
+    def add_receipt(self, payer, shares):
+        """
+        Adds a receipt from who paid and each shopper's share.
+
+        Parameters:
+        - payer (str): Name of the shopper who paid the receipt.
+        - shares (dict): Share of the receipt in cents keyed by shopper name, which may include the payer.
+        """
+
+        balances = self.__balances
+
+        for name, cents in shares.items():
+            balances[name] = balances.get(name, 0) - cents
+        balances[payer] = balances.get(payer, 0) + sum(shares.values())
+
+        self.__receipt_count += 1
+
+    def add_owings(self, owings):
+        """
+        Adds a receipt from its owings.
+
+        Parameters:
+        - owings (dict): {"payer": name, "owings": {shopper name: amount owed}}, as returned by
+          ReceiptDivider.compute_owings, with the amounts in dollars.
+        """
+
+        self.add_receipt(owings["payer"], {name: to_cents(amount) for name, amount in owings["owings"].items()})
+
+    def add_transfer(self, debtor, creditor, cents):
+        """
+        Records money paid from one shopper to another, such as a settled transfer.
+
+        Parameters:
+        - debtor (str): Name of the shopper who paid the money.
+        - creditor (str): Name of the shopper who received the money.
+        - cents (int): Amount paid in cents.
+        """
+
+        self.__balances[debtor] = self.__balances.get(debtor, 0) + cents
+        self.__balances[creditor] = self.__balances.get(creditor, 0) - cents
+
+    def settle(self):
+        """Works out the (debtor name, creditor name, cents) transfers that settle every balance."""
+
+        return settle_balances(self.get_balances())
+
+    def get_balance(self, name):
+        """Retrieves a shopper's net balance in cents, positive if the shopper is owed money."""
+
+        return self.__balances.get(name, 0)
+
+    def get_balances(self):
+        """Retrieves every non-zero net balance in cents, keyed by shopper name."""
+
+        return {name: cents for name, cents in self.__balances.items() if cents}
+
+    def get_receipt_count(self):
+        """Retrieves the number of receipts added to the ledger."""
+
+        return self.__receipt_count
+
+    def __repr__(self):
+        '''Return the data associated with the ledger.'''
+
+        return f"SettlementLedger(receipts={self.__receipt_count}, shoppers={len(self.__balances)})"
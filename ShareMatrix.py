@@ -0,0 +1,188 @@
+import math  # inbuilt
+
+# NumPy evaluates the matrix in one matrix-vector product, without it the same sums are done in plain Python
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# Shares are rounded to millionths of a cent and compared as whole numbers, so float noise never decides who gets
+# a leftover cent
+SHARE_SCALE = 10 ** 6
+
+
+class ShareMatrix():
+    """
+    Items x shoppers matrix of the share each shopper takes of each item of a receipt.
+
+    Each row holds the weights an item is split by, such as 1 for the one shopper taking it, 1 for every shopper
+    for an even split, or 2 and 1 for a 2:1 split. Rows are normalised to fractions as they are set, so each
+    shopper's total is one matrix-vector product of the item prices and the fractions. The totals are then
+    allocated to whole cents by largest remainder (ties going to the earlier shopper), so they add up to the
+    receipt to the cent, and an even split of the items gives the same cents as split_cents.
+
+    Attributes:
+    - __shopper_names (list): Name of the shopper of each column.
+    - __columns (dict): Column of each shopper, keyed by name.
+    - __prices (numpy.ndarray or list): Price of each item in cents.
+    - __fractions (numpy.ndarray or list): Share of each item each shopper takes, rows adding up to 1.
+    - __total_cents (int): Total of the items in cents.
+
+    Methods:
+    - from_owners: Builds a matrix from the owner of each item, splitting the items with no owner evenly.
+    - set_shares: Sets the weights an item is split by.
+    - assign: Gives an item to one shopper.
+    - split_evenly: Splits an item evenly between every shopper.
+    - get_shares: Retrieves the share of an item each shopper takes.
+    - get_totals_cents: Works out each shopper's total in cents.
+    - get_shopper_names: Retrieves the names of the shoppers.
+    - get_item_count: Retrieves the number of items.
+    """
+
+    def __init__(self, prices_cents, shopper_names):
+        """
+        Initializes the ShareMatrix object with every item split evenly.
+
+        Parameters:
+        - prices_cents (list): Price of each item in cents, the rows of the matrix.
+        - shopper_names (list): Names of the shoppers splitting the items, the columns of the matrix.
+
+        Raises:
+        - ValueError: If there are no shoppers or a shopper is named twice.
+        """
+
+        self.__shopper_names = list(shopper_names)
+        self.__columns = {name: column for column, name in enumerate(self.__shopper_names)}
+
+        if not self.__shopper_names or len(self.__columns) != len(self.__shopper_names):
+            raise ValueError("A share matrix needs one column per shopper, each shopper named once.")
+
+        prices_cents = [int(price) for price in prices_cents]
+        shopper_count = len(self.__shopper_names)
+        self.__total_cents = sum(prices_cents)
+
+        if numpy is not None:
+            self.__prices = numpy.array(prices_cents, dtype=numpy.float64)
+            self.__fractions = numpy.full((len(prices_cents), shopper_count), 1 / shopper_count)
+        else:
+            self.__prices = prices_cents
+            self.__fractions = [[1 / shopper_count] * shopper_count for _ in prices_cents]
+
+    @classmethod
+    def from_owners(cls, prices_cents, shopper_names, owners):
+        """
+        Builds a matrix from the owner of each item, splitting the items with no owner evenly.
+
+        Parameters:
+        - prices_cents (list): Price of each item in cents.
+        - shopper_names (list): Names of the shoppers splitting the items.
+        - owners (list): Name of the shopper taking each item, None for an item split evenly.
+
+        Raises:
+        - KeyError: If an owner is not one of the shoppers.
+        """
+
+        share_matrix = cls(prices_cents, shopper_names)
+        owned = [(row, share_matrix.__columns[owner]) for row, owner in enumerate(owners) if owner is not None]
+
+        if not owned:
+            return share_matrix
+
+        # Every owned row at once: clear the rows, then put a whole share in the owner's column
+        if numpy is not None:
+            rows, columns = numpy.array(owned).T
+            share_matrix.__fractions[rows] = 0.0
+            share_matrix.__fractions[rows, columns] = 1.0
+        else:
+            for row, column in owned:
+                share_matrix.__fractions[row] = [0.0] * len(shopper_names)
+                share_matrix.__fractions[row][column] = 1.0
+
+        return share_matrix
+
+    def set_shares(self, row, weights):
+        """
+        Sets the weights an item is split by.
+
+        Parameters:
+        - row (int): Index of the item.
+        - weights (dict): Weight of each shopper taking a share, keyed by name, such as {"josh": 2, "jessica": 1}.
+          Shoppers not named take no share.
+
+        Raises:
+        - KeyError: If a shopper is not in the matrix.
+        - ValueError: If a weight is negative or they add up to zero.
+        """
+
+        fractions = [0.0] * len(self.__shopper_names)
+        for name, weight in weights.items():
+            if weight < 0:
+                raise ValueError(f"{name}'s share of an item cannot be negative.")
+            fractions[self.__columns[name]] += weight
+
+        weight_total = sum(fractions)
+        if weight_total <= 0:
+            raise ValueError("An item must be shared by at least one shopper.")
+
+        self.__fractions[row] = [weight / weight_total for weight in fractions]
+
+    def assign(self, row, shopper_name):
+        """Gives an item to one shopper."""
+
+        self.set_shares(row, {shopper_name: 1})
+
+    def split_evenly(self, row):
+        """Splits an item evenly between every shopper."""
+
+        self.set_shares(row, dict.fromkeys(self.__shopper_names, 1))
+
+    def get_shares(self, row):
+        """
+        Retrieves the share of an item each shopper takes.
+
+        Returns:
+        - dict: Fraction of the item keyed by shopper name, for the shoppers taking a share.
+        """
+
+        return {name: float(fraction) for name, fraction in zip(self.__shopper_names, self.__fractions[row])
+                if fraction}
+
+    def get_totals_cents(self):
+        """
+        Works out each shopper's total in cents, the shares of the items adding up to the items' total exactly.
+
+        Returns:
+        - dict: Total in cents keyed by shopper name, in column order.
+        """
+
+        # One matrix-vector product of the prices and the fractions gives each shopper's exact share
+        if numpy is not None:
+            shares = (self.__prices @ self.__fractions).tolist()
+        else:
+            shares = [math.fsum(price * fractions[column] for price, fractions in zip(self.__prices, self.__fractions))
+                      for column in range(len(self.__shopper_names))]
+
+        # Round every share down to the cent, then hand out the cents left over, largest remainder first
+        scaled_shares = [divmod(round(share * SHARE_SCALE), SHARE_SCALE) for share in shares]
+        totals = [cents for cents, _ in scaled_shares]
+        remainders = sorted(range(len(shares)), key=lambda column: (-scaled_shares[column][1], column))
+
+        for column in remainders[:self.__total_cents - sum(totals)]:
+            totals[column] += 1
+
+        return dict(zip(self.__shopper_names, totals))
+
+    def get_shopper_names(self):
+        """Retrieves the names of the shoppers, in column order."""
+
+        return self.__shopper_names
+
+    def get_item_count(self):
+        """Retrieves the number of items."""
+
+        return len(self.__prices)
+
+    def __repr__(self):
+        '''Return the data associated with the matrix.'''
+
+        return f"ShareMatrix(items={len(self.__prices)}, shoppers={self.__shopper_names})"
@@ -0,0 +1,265 @@
+import os
+
+from Money import to_cents, from_cents
+
+# File locking is only available on Unix, elsewhere concurrent sessions rely on appends alone
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+# Bytes read at a time when looking back for the end of the last complete journal line
+REPAIR_CHUNK_SIZE = 4096
+
+
+class ShopperJournal():
+    """
+    Crash-safe store of the shoppers' spending trackers: a snapshot file plus an append-only journal of changes.
+
+    The snapshot is the shoppers file ("name,spending tracker" per line). Every save is appended to the journal
+    as one line of tab separated "name,change in cents" pairs and flushed to disk before returning, so saving
+    after a divide costs one small append instead of rewriting every shopper, and a crash loses nothing that was
+    saved. Loading replays the journal on top of the snapshot. A line cut short by a crash has no newline, so it
+    is skipped and cut off before the next save, and a divide is never half saved.
+
+    Every so often the journal is compacted: the snapshot is rebuilt from the snapshot plus the journal and
+    written to a temporary file, the journal is renamed aside, the temporary file is renamed over the snapshot and
+    the old journal is deleted. Each step is an atomic rename, and loading finishes a compaction a crash
+    interrupted, so no change is lost or counted twice. Appends and compaction hold a lock on Unix, so two
+    sessions saving at once both keep their changes.
+
+    Attributes:
+    - __snapshot_file (str): Name of the snapshot file.
+    - __journal_file (str): Name of the journal file.
+    - __compact_every (int): Number of saves after which the journal is compacted.
+    - __journal_lines (int): Number of saves in the journal, as far as this session knows.
+
+    Methods:
+    - load: Rebuilds the spending trackers from the snapshot and the journal.
+    - record: Appends changes to the spending trackers to the journal.
+    - compact: Folds the journal into the snapshot.
+    - get_snapshot_file: Retrieves the name of the snapshot file.
+    - get_journal_lines: Retrieves the number of saves in the journal.
+    """
+
+    def __init__(self, snapshot_file="shoppers.txt", journal_file=None, compact_every=200):
+        """
+        Initializes the ShopperJournal object.
+
+        Parameters:
+        - snapshot_file (str): Name of the snapshot file.
+        - journal_file (str): Name of the journal file, defaults to the snapshot file name plus ".journal".
+        - compact_every (int): Number of saves after which the journal is compacted.
+        """
+
+        self.__snapshot_file = snapshot_file
+        self.__journal_file = journal_file or f"{snapshot_file}.journal"
+        self.__compact_every = compact_every
+        self.__journal_lines = 0
+
+    def __lock(self):
+        """Opens and locks the lock file of the journal, returning it so the caller can release it by closing it."""
+
+        lock_file = open(f"{self.__journal_file}.lock", 'a')
+
+        if fcntl is not None:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+
+        return lock_file
+
+    def __recover(self):
+        """Finishes or rolls back a compaction interrupted by a crash, called with the lock held."""
+
+        temp_file = f"{self.__snapshot_file}.tmp"
+        compacted_journal = f"{self.__journal_file}.compacted"
+
+        # The journal was set aside after the new snapshot was written in full, so the snapshot can be swapped in
+        if os.path.exists(compacted_journal):
+            if os.path.exists(temp_file):
+                os.replace(temp_file, self.__snapshot_file)
+            os.remove(compacted_journal)
+
+        # The new snapshot may be incomplete, the old snapshot and journal still hold every change
+        elif os.path.exists(temp_file):
+            os.remove(temp_file)
+
+    def __repair(self):
+        """
+        Cuts off a journal line left incomplete by a crash, called with the lock held before appending. Only the
+        last byte is read unless the journal ends in a torn line, so a save costs the same however long it is.
+        """
+
+        if not os.path.exists(self.__journal_file):
+            return
+
+        with open(self.__journal_file, 'rb+') as file:
+            end = file.seek(0, os.SEEK_END)
+            if end == 0:
+                return
+
+            file.seek(-1, os.SEEK_END)
+            if file.read(1) == b"\n":
+                return
+
+            # Look back chunk by chunk for the newline ending the last complete line
+            chunk_end = end
+            while chunk_end > 0:
+                chunk_start = max(chunk_end - REPAIR_CHUNK_SIZE, 0)
+                file.seek(chunk_start)
+                newline = file.read(chunk_end - chunk_start).rfind(b"\n")
+
+                if newline != -1:
+                    file.truncate(chunk_start + newline + 1)
+                    return
+
+                chunk_end = chunk_start
+
+            file.truncate(0)
+
+    def __sync_directories(self):
+        """Flushes the renames in the folders of the snapshot and the journal to disk, where the platform can."""
+
+        # Folders can only be opened and fsynced on Unix
+        if not hasattr(os, "O_DIRECTORY"):
+            return
+
+        for folder in {os.path.dirname(os.path.abspath(file_name))
+                       for file_name in (self.__snapshot_file, self.__journal_file)}:
+            folder_fd = os.open(folder, os.O_RDONLY | os.O_DIRECTORY)
+            try:
+                os.fsync(folder_fd)
+            finally:
+                os.close(folder_fd)
+
+    def __replay(self):
+        """Returns the spending trackers in cents keyed by shopper name, and the number of journal lines."""
+
+        spending = {}
+
+        # Snapshot first, a missing snapshot is an empty one
+        if os.path.exists(self.__snapshot_file):
+            with open(self.__snapshot_file, 'r') as file:
+                for line in file:
+                    if not line.strip():
+                        continue
+
+                    shopper_data = line.strip("\n").split(',')
+                    spending[shopper_data[0]] = to_cents(shopper_data[1])
+
+        # Then every complete journal line
+        journal_lines = 0
+        if os.path.exists(self.__journal_file):
+            with open(self.__journal_file, 'r') as file:
+                for line in file:
+                    if not line.endswith("\n"):
+                        break
+
+                    for change in line[:-1].split('\t'):
+                        name, cents = change.rsplit(',', 1)
+                        spending[name] = spending.get(name, 0) + int(cents)
+                    journal_lines += 1
+
+        return spending, journal_lines
+
+    def load(self):
+        """
+        Rebuilds the spending trackers from the snapshot and the journal.
+
+        Returns:
+        - dict: Spending tracker in cents keyed by shopper name, in the order the shoppers were first saved.
+
+        Raises:
+        - ValueError: If the snapshot or a complete journal line is corrupt.
+        """
+
+        lock_file = self.__lock()
+        try:
+            self.__recover()
+            spending, self.__journal_lines = self.__replay()
+        finally:
+            lock_file.close()
+
+        return spending
+
+    def record(self, spending_changes):
+        """
+        Appends changes to the spending trackers to the journal, flushed to disk before returning.
+
+        Parameters:
+        - spending_changes (dict): Change in cents keyed by shopper name, 0 to only register a shopper. The
+          changes are saved together or not at all.
+        """
+
+        if not spending_changes:
+            return
+
+        line = "\t".join(f"{name},{cents}" for name, cents in spending_changes.items()) + "\n"
+
+        lock_file = self.__lock()
+        try:
+            self.__repair()
+
+            with open(self.__journal_file, 'a') as file:
+                file.write(line)
+                file.flush()
+                os.fsync(file.fileno())
+        finally:
+            lock_file.close()
+
+        self.__journal_lines += 1
+
+        if self.__journal_lines >= self.__compact_every:
+            self.compact()
+
+    def compact(self):
+        """
+        Folds the journal into the snapshot and empties the journal.
+
+        Returns:
+        - dict: Spending tracker in cents keyed by shopper name.
+        """
+
+        temp_file = f"{self.__snapshot_file}.tmp"
+        compacted_journal = f"{self.__journal_file}.compacted"
+
+        lock_file = self.__lock()
+        try:
+            self.__recover()
+            spending, _ = self.__replay()
+
+            with open(temp_file, 'w') as file:
+                for name, cents in spending.items():
+                    file.write(f'{name},{from_cents(cents)}\n')
+                file.flush()
+                os.fsync(file.fileno())
+
+            # Set the journal aside, swap in the new snapshot, then drop the old journal. Each rename is flushed
+            # before the next, so a crash never leaves the new snapshot in place with the old journal still live
+            if os.path.exists(self.__journal_file):
+                os.replace(self.__journal_file, compacted_journal)
+                self.__sync_directories()
+            os.replace(temp_file, self.__snapshot_file)
+            self.__sync_directories()
+            if os.path.exists(compacted_journal):
+                os.remove(compacted_journal)
+        finally:
+            lock_file.close()
+
+        self.__journal_lines = 0
+
+        return spending
+
+    def get_snapshot_file(self):
+        """Retrieves the name of the snapshot file."""
+
+        return self.__snapshot_file
+
+    def get_journal_lines(self):
+        """Retrieves the number of saves in the journal, as far as this session knows."""
+
+        return self.__journal_lines
+
+    def __repr__(self):
+        '''Return the data associated with the journal.'''
+
+        return f"ShopperJournal(snapshot_file={self.__snapshot_file}, journal_lines={self.__journal_lines})"
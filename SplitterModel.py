@@ -0,0 +1,179 @@
+from Money import to_cents
+from ShareMatrix import ShareMatrix
+
+# Radio button value of each cart an item can be put in on the GUI splitter page
+SHOPPER_1 = 1
+BOTH = 2
+SHOPPER_2 = 3
+
+# Columns of the share matrix, and the shares of each cart
+SHOPPER_NAMES = ("shopper_1", "shopper_2")
+CART_SHARES = {SHOPPER_1: {"shopper_1": 1}, BOTH: {"shopper_1": 1, "shopper_2": 1}, SHOPPER_2: {"shopper_2": 1}}
+
+
+class SplitterModel():
+    """
+    Assignments of the GUI splitter page, kept apart from the widgets that display them.
+
+    Each receipt item is a row holding its name, price and the cart it is in. The GUI only builds widgets for the
+    rows on screen and rebinds them to other rows as the page scrolls, so the model, not the widgets, is the record
+    of which cart each item is in. The carts are kept as dicts of item name to price, and the total of each cart
+    is kept in cents and updated as items move, so the totals never need to be summed again. What each shopper
+    owes comes from a ShareMatrix of the items, the same split ReceiptDivider uses.
+
+    Attributes:
+    - __names (list): Item name of each row, in receipt order.
+    - __prices (list): Price of each row.
+    - __prices_cents (list): Price of each row in cents.
+    - __choices (list): Cart each row is in, SHOPPER_1, BOTH or SHOPPER_2.
+    - __carts (dict): Dict of item name to price of the items in each cart, keyed by cart.
+    - __totals (dict): Total of each cart in cents, keyed by cart.
+    - __share_matrix (ShareMatrix): Share of each item each shopper takes.
+
+    Methods:
+    - get_row_count: Retrieves the number of rows.
+    - get_name: Retrieves the item name of a row.
+    - get_price: Retrieves the price of a row.
+    - get_choice: Retrieves the cart a row is in.
+    - set_choice: Moves a row to another cart.
+    - get_cart: Retrieves the items in a cart.
+    - get_total_cents: Retrieves the total of a cart in cents.
+    - get_owed_cents: Works out what the other shopper owes the shopper who paid.
+    - get_share_matrix: Retrieves the share matrix of the items.
+    - get_visible_rows: Works out which rows are inside a window of the page.
+    """
+
+    def __init__(self, items_bought):
+        """
+        Initializes the SplitterModel object with every item in the BOTH cart.
+
+        Parameters:
+        - items_bought (dict): Price keyed by item name, as returned by grab_items_and_price.
+        """
+
+        self.__names = list(items_bought)
+        self.__prices = list(items_bought.values())
+        self.__prices_cents = [to_cents(price) for price in self.__prices]
+        self.__choices = [BOTH] * len(self.__names)
+        self.__carts = {SHOPPER_1: {}, BOTH: dict(items_bought), SHOPPER_2: {}}
+        self.__totals = {SHOPPER_1: 0, BOTH: sum(self.__prices_cents), SHOPPER_2: 0}
+        self.__share_matrix = ShareMatrix(self.__prices_cents, SHOPPER_NAMES)
+
+    def get_row_count(self):
+        """Retrieves the number of rows."""
+
+        return len(self.__names)
+
+    def get_name(self, row):
+        """Retrieves the item name of a row."""
+
+        return self.__names[row]
+
+    def get_price(self, row):
+        """Retrieves the price of a row."""
+
+        return self.__prices[row]
+
+    def get_choice(self, row):
+        """Retrieves the cart a row is in."""
+
+        return self.__choices[row]
+
+    def set_choice(self, row, choice):
+        """
+        Moves a row to another cart, updating the two cart totals it affects.
+
+        Parameters:
+        - row (int): Index of the row.
+        - choice (int): Cart the row is moved to, SHOPPER_1, BOTH or SHOPPER_2.
+
+        Returns:
+        - bool: True if the row moved, False if it was already in that cart.
+        """
+
+        if choice not in self.__carts:
+            raise ValueError(f"Unknown cart {choice}")
+
+        previous_choice = self.__choices[row]
+        if previous_choice == choice:
+            return False
+
+        name = self.__names[row]
+        del self.__carts[previous_choice][name]
+        self.__carts[choice][name] = self.__prices[row]
+        self.__choices[row] = choice
+        self.__totals[previous_choice] -= self.__prices_cents[row]
+        self.__totals[choice] += self.__prices_cents[row]
+        self.__share_matrix.set_shares(row, CART_SHARES[choice])
+
+        return True
+
+    def get_cart(self, choice):
+        """
+        Retrieves the items in a cart.
+
+        Parameters:
+        - choice (int): SHOPPER_1, BOTH or SHOPPER_2.
+
+        Returns:
+        - dict: Price keyed by item name.
+        """
+
+        return self.__carts[choice]
+
+    def get_total_cents(self, choice):
+        """
+        Retrieves the total of a cart in cents.
+
+        Parameters:
+        - choice (int): SHOPPER_1, BOTH or SHOPPER_2.
+        """
+
+        return self.__totals[choice]
+
+    def get_owed_cents(self, payer):
+        """
+        Works out what the other shopper owes the shopper who paid: their own cart plus their half of the BOTH
+        cart, from the share matrix, so the cents are split as ReceiptDivider splits them.
+
+        Parameters:
+        - payer (int): SHOPPER_1 or SHOPPER_2.
+
+        Returns:
+        - int: Amount in cents the other shopper owes the payer.
+        """
+
+        totals_cents = self.__share_matrix.get_totals_cents()
+
+        return totals_cents["shopper_2"] if payer == SHOPPER_1 else totals_cents["shopper_1"]
+
+    def get_share_matrix(self):
+        """Retrieves the share matrix of the items."""
+
+        return self.__share_matrix
+
+    def get_visible_rows(self, view_top, view_height, row_top, row_height, overscan=0):
+        """
+        Works out which rows are inside a window of the page, so only those rows need widgets.
+
+        Parameters:
+        - view_top (float): Top of the window, in the coordinates the rows are laid out in.
+        - view_height (float): Height of the window.
+        - row_top (int): Top of the first row.
+        - row_height (int): Height of each row.
+        - overscan (int): Rows added either side of the window, so scrolling does not show empty rows.
+
+        Returns:
+        - tuple: (first, last) rows, last not included.
+        """
+
+        row_count = len(self.__names)
+        first = min(max(int((view_top - row_top) // row_height) - overscan, 0), row_count)
+        last = min(int((view_top + view_height - row_top) // row_height) + 1 + overscan, row_count)
+
+        return first, max(last, first)
+
+    def __repr__(self):
+        '''Return the data associated with the model.'''
+
+        return f"SplitterModel(rows={len(self.__names)}, totals={self.__totals})"
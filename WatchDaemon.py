@@ -0,0 +1,565 @@
+import os
+import sys
+import struct  # inbuilt
+import signal  # inbuilt
+import asyncio  # inbuilt
+import ctypes  # inbuilt
+import ctypes.util  # inbuilt
+from concurrent.futures import ProcessPoolExecutor  # inbuilt
+
+from ReceiptDividerRev2 import PDFReader, PARSER_VERSION
+from ParseCache import ParseCache
+from PipelineStats import PipelineStats
+
+# inotify event flags (linux/inotify.h)
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_Q_OVERFLOW = 0x00004000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+# A file is looked at whenever it is created, written, closed or moved into a watched folder
+WATCH_MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE
+
+# struct inotify_event: watch descriptor, mask, cookie and name length, followed by the name
+EVENT_HEADER = struct.Struct("iIII")
+
+# Settle times an empty file is waited on for its download to start, before it is reported as a parse error
+EMPTY_FILE_SETTLE_CHECKS = 5
+
+
+def parse_receipt_into_cache(file_location, parse_cache):
+    """
+    Parses a receipt into the parse cache, so the divider later reads it straight from the cache.
+
+    Note:
+    This function runs inside the worker processes, so it must stay at module level to be picklable.
+
+    Parameters:
+    - file_location (str): File location of the PDF receipt file.
+    - parse_cache (ParseCache): Cache the parse result is stored in.
+
+    Returns:
+    - tuple: (number of items, receipt total, True if the receipt was already in the cache).
+    """
+
+    stats = PipelineStats()
+    scanner = PDFReader(file_location, parse_cache=parse_cache, stats=stats)
+    scanner.read_file()
+    scanner.set_digi_receipt()
+    receipt = scanner.get_digi_receipt()
+
+    return len(receipt.get_receipt_items()), receipt.get_receipt_total(), bool(stats.get_counters().get("cache_hits"))
+
+
+def is_receipt_file(file_location):
+    """Returns True for the PDF files a watched folder may receive, skipping hidden and partial downloads."""
+
+    file_name = os.path.basename(file_location)
+
+    return file_name.lower().endswith(".pdf") and not file_name.startswith(".")
+
+
+class InotifyWatcher():
+    """
+    Watches folders with Linux inotify, called through ctypes and read from the asyncio loop.
+
+    The inotify descriptor is non-blocking and registered with `loop.add_reader`, so events are read only when
+    the kernel has some and the loop never blocks or polls. Each event on a receipt file is passed to a callback.
+
+    Attributes:
+    - __folders (list): Folders being watched.
+    - __on_change (function): Called with the file location of each receipt file that changed.
+    - __on_overflow (function): Called when the kernel dropped events, so the folders can be rescanned.
+    - __fd (int): The inotify file descriptor, None until started.
+    - __watched_folders (dict): Folder of each watch descriptor.
+    - __loop (asyncio.AbstractEventLoop): Loop the descriptor is registered with.
+
+    Methods:
+    - start: Opens the inotify descriptor, watches the folders and registers with the loop.
+    - close: Unregisters from the loop and closes the descriptor.
+    """
+
+    def __init__(self, folders, on_change, on_overflow):
+        """
+        Initializes the InotifyWatcher object without watching anything.
+
+        Parameters:
+        - folders (list): Folders to watch.
+        - on_change (function): Called with the file location of each receipt file that changed.
+        - on_overflow (function): Called when the kernel dropped events.
+        """
+
+        self.__folders = folders
+        self.__on_change = on_change
+        self.__on_overflow = on_overflow
+        self.__fd = None
+        self.__watched_folders = {}
+        self.__loop = None
+
+    def start(self, loop):
+        """
+        Opens the inotify descriptor, watches the folders and registers with the loop.
+
+        Raises:
+        - OSError: If inotify is not available, such as on macOS or Windows, or a folder cannot be watched.
+        """
+
+        library = ctypes.util.find_library("c")
+        if library is None:
+            raise OSError("The C library could not be found.")
+
+        libc = ctypes.CDLL(library, use_errno=True)
+        if not hasattr(libc, "inotify_init1"):
+            raise OSError("inotify is not available on this platform.")
+
+        fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+
+        try:
+            for folder in self.__folders:
+                watch_descriptor = libc.inotify_add_watch(fd, os.fsencode(folder), WATCH_MASK)
+                if watch_descriptor < 0:
+                    errno = ctypes.get_errno()
+                    raise OSError(errno, os.strerror(errno), folder)
+
+                self.__watched_folders[watch_descriptor] = folder
+
+            loop.add_reader(fd, self.__read_events)
+        except BaseException:
+            os.close(fd)
+            raise
+
+        self.__fd = fd
+        self.__loop = loop
+
+    def __read_events(self):
+        """Reads every event the kernel has queued and reports the receipt files they name."""
+
+        while True:
+            try:
+                buffer = os.read(self.__fd, 64 * 1024)
+            except BlockingIOError:
+                return
+
+            offset = 0
+            while offset < len(buffer):
+                watch_descriptor, mask, _, name_length = EVENT_HEADER.unpack_from(buffer, offset)
+                offset += EVENT_HEADER.size
+                name = buffer[offset:offset + name_length].rstrip(b"\0")
+                offset += name_length
+
+                if mask & IN_Q_OVERFLOW:
+                    self.__on_overflow()
+                    continue
+
+                folder = self.__watched_folders.get(watch_descriptor)
+                if folder is not None and name:
+                    file_location = os.path.join(folder, os.fsdecode(name))
+                    if is_receipt_file(file_location):
+                        self.__on_change(file_location)
+
+    def close(self):
+        """Unregisters from the loop and closes the descriptor."""
+
+        if self.__fd is not None:
+            self.__loop.remove_reader(self.__fd)
+            os.close(self.__fd)
+            self.__fd = None
+
+    def __repr__(self):
+        '''Return the data associated with the watcher.'''
+
+        return f"InotifyWatcher(folders={self.__folders})"
+
+
+class PollingWatcher():
+    """
+    Watches folders by listing them every few seconds, for platforms without inotify.
+
+    Each listing is compared with the last one by file size and modification time, and every receipt file that is
+    new or changed is passed to the callback.
+
+    Attributes:
+    - __folders (list): Folders being watched.
+    - __on_change (function): Called with the file location of each receipt file that changed.
+    - __poll_interval (float): Seconds between listings.
+    - __signatures (dict): (size, modification time) of each receipt file at the last listing.
+    - __task (asyncio.Task): The polling task, None until started.
+
+    Methods:
+    - start: Takes the first listing and starts polling.
+    - close: Stops polling.
+    """
+
+    def __init__(self, folders, on_change, poll_interval=2.0):
+        """
+        Initializes the PollingWatcher object without watching anything.
+
+        Parameters:
+        - folders (list): Folders to watch.
+        - on_change (function): Called with the file location of each receipt file that changed.
+        - poll_interval (float): Seconds between listings.
+        """
+
+        self.__folders = folders
+        self.__on_change = on_change
+        self.__poll_interval = poll_interval
+        self.__signatures = {}
+        self.__task = None
+
+    def __list_folders(self):
+        """Returns the (size, modification time) of every receipt file in the folders."""
+
+        signatures = {}
+
+        for folder in self.__folders:
+            try:
+                with os.scandir(folder) as scan:
+                    for dir_entry in scan:
+                        if is_receipt_file(dir_entry.name) and dir_entry.is_file():
+                            stat = dir_entry.stat()
+                            signatures[dir_entry.path] = (stat.st_size, stat.st_mtime_ns)
+            except OSError:
+                continue
+
+        return signatures
+
+    async def __poll(self):
+        """Lists the folders every poll interval and reports the receipt files that are new or changed."""
+
+        while True:
+            await asyncio.sleep(self.__poll_interval)
+            signatures = self.__list_folders()
+
+            for file_location, signature in signatures.items():
+                if self.__signatures.get(file_location) != signature:
+                    self.__on_change(file_location)
+
+            self.__signatures = signatures
+
+    def start(self, loop):
+        """Takes the first listing and starts polling, the files already there are left to the daemon's scan."""
+
+        self.__signatures = self.__list_folders()
+        self.__task = loop.create_task(self.__poll())
+
+    def close(self):
+        """Stops polling."""
+
+        if self.__task is not None:
+            self.__task.cancel()
+            self.__task = None
+
+    def __repr__(self):
+        '''Return the data associated with the watcher.'''
+
+        return f"PollingWatcher(folders={self.__folders}, poll_interval={self.__poll_interval})"
+
+
+class WatchDaemon():
+    """
+    Long-running daemon that watches folders for new eReceipts and parses them into the parse cache as they arrive.
+
+    The daemon runs on an asyncio loop. Folders are watched with inotify where the platform has it, otherwise by
+    polling. A browser writes a download in many small pieces, so every change to a file restarts its settle
+    timer, and the file is only parsed once its size and modification time have stayed the same for the settle
+    time. Parsing runs in a process pool, at most one receipt per worker at a time, so the loop stays free to
+    take events. The results go into the same ParseCache the divider reads, so a receipt that arrived while the
+    daemon was running opens instantly.
+
+    Attributes:
+    - __folders (list): Folders being watched.
+    - __parse_cache (ParseCache): Cache the parsed receipts are stored in.
+    - __max_workers (int): Number of worker processes parsing receipts.
+    - __settle_time (float): Seconds a file must stay unchanged before it is parsed.
+    - __poll_interval (float): Seconds between listings when polling.
+    - __use_inotify (bool): If False, the folders are polled even where inotify is available.
+    - __watch_mode (str): "inotify" or "polling" once the daemon is serving, None before.
+    - __settle_timers (dict): Settle timer of each file waiting to be parsed, keyed by file location.
+    - __parsed_signatures (dict): (size, modification time) of each file when it was last parsed.
+    - __parse_tasks (set): Parses in progress.
+    - __parsed_receipts (list): (file location, number of items, total, already cached) of every parsed file.
+    - __parse_errors (list): (file location, error message) of every file that failed to parse.
+    - __loop (asyncio.AbstractEventLoop): Loop the daemon is serving on.
+    - __executor (ProcessPoolExecutor): Worker processes parsing the receipts, while serving.
+    - __parse_slots (asyncio.Semaphore): Limits the parses in progress to one per worker.
+
+    Methods:
+    - serve: Watches the folders and parses new receipts until stopped.
+    - run: Runs the daemon on a new event loop until interrupted.
+    - file_changed: Restarts the settle timer of a receipt file.
+    - scan_folders: Looks at every receipt file already in the folders.
+    - get_watch_mode: Retrieves how the folders are watched.
+    - get_parsed_receipts: Retrieves the receipts parsed so far.
+    - get_parse_errors: Retrieves the files that failed to parse.
+    """
+
+    def __init__(self, folders, parse_cache=None, max_workers=None, settle_time=1.0, poll_interval=2.0,
+                 use_inotify=True):
+        """
+        Initializes the WatchDaemon object.
+
+        Parameters:
+        - folders (list): Folders to watch, such as ["~/Downloads"].
+        - parse_cache (ParseCache): Cache the parsed receipts are stored in, defaults to the divider's cache.
+        - max_workers (int): Number of worker processes parsing receipts, defaults to one per core.
+        - settle_time (float): Seconds a file must stay unchanged before it is parsed.
+        - poll_interval (float): Seconds between listings when polling.
+        - use_inotify (bool): If False, the folders are polled even where inotify is available.
+        """
+
+        self.__folders = [os.path.abspath(os.path.expanduser(folder)) for folder in folders]
+        self.__parse_cache = parse_cache or ParseCache(parser_version=PARSER_VERSION)
+        self.__max_workers = max_workers or os.cpu_count() or 1
+        self.__settle_time = settle_time
+        self.__poll_interval = poll_interval
+        self.__use_inotify = use_inotify
+        self.__watch_mode = None
+        self.__settle_timers = {}
+        self.__parsed_signatures = {}
+        self.__parse_tasks = set()
+        self.__parsed_receipts = []
+        self.__parse_errors = []
+        self.__loop = None
+        self.__executor = None
+        self.__parse_slots = None
+
+    @staticmethod
+    def __signature(file_location):
+        """Returns the (size, modification time) of a file, None if it is gone."""
+
+        try:
+            stat = os.stat(file_location)
+        except OSError:
+            return None
+
+        return stat.st_size, stat.st_mtime_ns
+
+    def file_changed(self, file_location):
+        """
+        Restarts the settle timer of a receipt file, so it is parsed once it stops changing.
+
+        Parameters:
+        - file_location (str): File location of the receipt file that changed.
+        """
+
+        settle_timer = self.__settle_timers.pop(file_location, None)
+        if settle_timer is not None:
+            settle_timer.cancel()
+
+        self.__settle_timers[file_location] = self.__loop.call_later(
+            self.__settle_time, self.__check_settled, file_location, self.__signature(file_location))
+
+    def __check_settled(self, file_location, signature, empty_checks=0):
+        """
+        Parses a file if it has not changed since its settle timer started, otherwise waits again.
+
+        Parameters:
+        - file_location (str): File location of the receipt file.
+        - signature (tuple): (size, modification time) of the file when its settle timer started.
+        - empty_checks (int): Settle times the file has already stayed empty.
+        """
+
+        del self.__settle_timers[file_location]
+        current_signature = self.__signature(file_location)
+
+        # Deleted, or moved away before it settled
+        if current_signature is None:
+            return
+
+        # Still being written, or created empty with the download yet to start
+        empty_checks = empty_checks + 1 if current_signature == signature and current_signature[0] == 0 else 0
+        if current_signature != signature or 0 < empty_checks < EMPTY_FILE_SETTLE_CHECKS:
+            self.__settle_timers[file_location] = self.__loop.call_later(
+                self.__settle_time, self.__check_settled, file_location, current_signature, empty_checks)
+            return
+
+        # Already parsed as it is now
+        if self.__parsed_signatures.get(file_location) == current_signature:
+            return
+
+        self.__parsed_signatures[file_location] = current_signature
+
+        # Stayed empty, reported once until it changes
+        if empty_checks:
+            self.__parse_errors.append((file_location, "The file is empty."))
+            print(f"FAILED {os.path.basename(file_location)}: The file is empty.")
+            return
+
+        parse_task = self.__loop.create_task(self.__parse(file_location))
+        self.__parse_tasks.add(parse_task)
+        parse_task.add_done_callback(self.__parse_tasks.discard)
+
+    async def __parse(self, file_location):
+        """Parses a settled receipt in the process pool and reports the result."""
+
+        file_name = os.path.basename(file_location)
+
+        async with self.__parse_slots:
+            try:
+                item_count, total, cached = await self.__loop.run_in_executor(
+                    self.__executor, parse_receipt_into_cache, file_location, self.__parse_cache)
+            except Exception as e:
+                self.__parse_errors.append((file_location, f"{type(e).__name__}: {e}"))
+                print(f"FAILED {file_name}: {type(e).__name__}: {e}")
+                return
+
+        self.__parsed_receipts.append((file_location, item_count, total, cached))
+        print(f"{'Already parsed' if cached else 'Parsed'} {file_name}: {item_count} items, total ${total}")
+
+    def scan_folders(self):
+        """Looks at every receipt file already in the folders, such as the files that arrived while it was off."""
+
+        for folder in self.__folders:
+            try:
+                file_names = sorted(os.listdir(folder))
+            except OSError as e:
+                print(f"Cannot list {folder}: {e}")
+                continue
+
+            for file_name in file_names:
+                file_location = os.path.join(folder, file_name)
+                if is_receipt_file(file_location) and os.path.isfile(file_location):
+                    self.file_changed(file_location)
+
+    def __start_watcher(self):
+        """Starts watching the folders with inotify, or by polling if inotify is not available."""
+
+        if self.__use_inotify:
+            watcher = InotifyWatcher(self.__folders, self.file_changed, self.scan_folders)
+            try:
+                watcher.start(self.__loop)
+                self.__watch_mode = "inotify"
+                return watcher
+            except (OSError, AttributeError) as e:
+                print(f"inotify is not available ({e}), polling the folders instead.")
+
+        watcher = PollingWatcher(self.__folders, self.file_changed, self.__poll_interval)
+        watcher.start(self.__loop)
+        self.__watch_mode = "polling"
+
+        return watcher
+
+    def __is_idle(self):
+        """Returns True if no file is waiting to settle and no parse is in progress."""
+
+        return not self.__settle_timers and not self.__parse_tasks
+
+    async def serve(self, stop_event=None, once=False):
+        """
+        Watches the folders and parses new receipts until stopped.
+
+        Parameters:
+        - stop_event (asyncio.Event): Set to stop the daemon, which finishes the parses in progress first.
+        - once (bool): If True, only the receipt files already in the folders are parsed, then the daemon stops.
+        """
+
+        self.__loop = asyncio.get_running_loop()
+        self.__parse_slots = asyncio.Semaphore(self.__max_workers)
+        stop_event = stop_event or asyncio.Event()
+        watcher = None
+
+        with ProcessPoolExecutor(max_workers=self.__max_workers) as executor:
+            self.__executor = executor
+
+            try:
+                if not once:
+                    watcher = self.__start_watcher()
+                    print(f"Watching {', '.join(self.__folders)} ({self.__watch_mode}), Ctrl+C to stop.")
+
+                self.scan_folders()
+
+                # In one-shot mode stop as soon as every file found has been parsed
+                while not stop_event.is_set():
+                    if once and self.__is_idle():
+                        break
+
+                    try:
+                        await asyncio.wait_for(stop_event.wait(), timeout=self.__settle_time)
+                    except asyncio.TimeoutError:
+                        pass
+            finally:
+                if watcher is not None:
+                    watcher.close()
+
+                for settle_timer in self.__settle_timers.values():
+                    settle_timer.cancel()
+                self.__settle_timers.clear()
+
+                if self.__parse_tasks:
+                    await asyncio.gather(*self.__parse_tasks, return_exceptions=True)
+
+                self.__executor = None
+
+    def run(self, once=False):
+        """
+        Runs the daemon on a new event loop until it is interrupted with Ctrl+C or SIGTERM.
+
+        Parameters:
+        - once (bool): If True, only the receipt files already in the folders are parsed, then the daemon stops.
+        """
+
+        async def serve_until_signalled():
+            stop_event = asyncio.Event()
+            loop = asyncio.get_running_loop()
+
+            # Signal handlers are only available on Unix, elsewhere Ctrl+C raises KeyboardInterrupt
+            for signal_number in (signal.SIGINT, signal.SIGTERM):
+                try:
+                    loop.add_signal_handler(signal_number, stop_event.set)
+                except (NotImplementedError, RuntimeError):
+                    pass
+
+            await self.serve(stop_event, once)
+
+        try:
+            asyncio.run(serve_until_signalled())
+        except KeyboardInterrupt:
+            pass
+
+    def get_watch_mode(self):
+        """Retrieves how the folders are watched, "inotify" or "polling", None before the daemon is serving."""
+
+        return self.__watch_mode
+
+    def get_parsed_receipts(self):
+        """Retrieves the (file location, number of items, total, already cached) of every parsed file."""
+
+        return self.__parsed_receipts
+
+    def get_parse_errors(self):
+        """Retrieves the (file location, error message) of every file that failed to parse."""
+
+        return self.__parse_errors
+
+    def __str__(self):
+        '''Returns a summary of the files parsed so far.'''
+
+        return f"Parsed {len(self.__parsed_receipts)} receipt(s), {len(self.__parse_errors)} error(s)"
+
+    def __repr__(self):
+        '''Return the data associated with the daemon.'''
+
+        return f"WatchDaemon(folders={self.__folders}, watch_mode={self.__watch_mode}, " \
+               f"max_workers={self.__max_workers})"
+
+
+def main(argv=None):
+    """
+    Command line entry point: python WatchDaemon.py [folder ...]
+    """
+
+    argv = sys.argv[1:] if argv is None else argv
+    watch_daemon = WatchDaemon(argv or ["~/Downloads"])
+    watch_daemon.run()
+    print(watch_daemon)
+
+    return 0 if not watch_daemon.get_parse_errors() else 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,97 @@
+"""
+Benchmark of the divide_receipt item moves with the AssignmentIndex against scanning the shopper carts.
+
+Replays the same key presses as divide_receipt (find who owns the current item, move it to the chosen shopper,
+then total every cart) on receipts of growing size. Scanning costs O(items) per move, the index O(1).
+
+Usage: python benchmarks/bench_assignment.py [item count ...]
+"""
+
+import os
+import sys
+import time
+import random
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ReceiptDividerRev2 import Shopper
+from ItemTable import ItemTable
+from AssignmentIndex import AssignmentIndex
+
+SHOPPER_NAMES = ("josh", "jessica", "sam")
+
+
+def build_shoppers(receipt_items, assignment_index=None):
+    """Returns the shoppers of the receipt keyed by name, the combined cart holding every item."""
+
+    shoppers = {name: Shopper(name) for name in SHOPPER_NAMES}
+    shoppers["Combined"] = Shopper("Combined", None, True, list(receipt_items.values()))
+
+    if assignment_index is not None:
+        for shopper in shoppers.values():
+            shopper.set_assignment_index(assignment_index)
+
+    return shoppers
+
+
+def divide_by_scanning(receipt_items, moves):
+    """The previous divide_receipt: find each item's owner by scanning every cart."""
+
+    shoppers = build_shoppers(receipt_items)
+
+    for item_num, new_owner in moves:
+        grocery_item = receipt_items[item_num]
+        item_owner = next(shopper for shopper in shoppers.values()
+                          if grocery_item in shopper.get_personal_cart_items())
+
+        item_owner.remove_from_personal_cart(grocery_item, announce=False)
+        shoppers[new_owner].add_to_personal_cart(grocery_item, announce=False)
+
+    return {name: shopper.calculate_cart_total() for name, shopper in shoppers.items()}
+
+
+def divide_with_index(receipt_items, moves):
+    """The current divide_receipt: look each item's owner up in the assignment index."""
+
+    assignment_index = AssignmentIndex()
+    shoppers = build_shoppers(receipt_items, assignment_index)
+
+    for item_num, new_owner in moves:
+        grocery_item = receipt_items[item_num]
+        item_owner = shoppers[assignment_index.get_owner(grocery_item)]
+
+        item_owner.remove_from_personal_cart(grocery_item, announce=False)
+        shoppers[new_owner].add_to_personal_cart(grocery_item, announce=False)
+
+    return {name: shopper.calculate_cart_total() for name, shopper in shoppers.items()}
+
+
+def main():
+    sizes = [int(size) for size in sys.argv[1:]] or [100, 1000, 5000]
+    rng = random.Random(0)
+
+    print(f"{'items':>8}{'scanning ms':>14}{'index ms':>12}{'speed-up':>10}")
+
+    for item_count in sizes:
+        receipt_items = ItemTable().add_receipt([[f"Item {item_num}", rng.randint(50, 2500) / 100]
+                                                 for item_num in range(item_count)])
+
+        # Each item is moved once, the way a user steps through the receipt
+        moves = [(item_num, rng.choice(SHOPPER_NAMES + ("Combined",))) for item_num in range(1, item_count + 1)]
+
+        timings = []
+        for divide in (divide_by_scanning, divide_with_index):
+            start_time = time.perf_counter()
+            totals = divide(receipt_items, moves)
+            timings.append(time.perf_counter() - start_time)
+
+            if divide is divide_by_scanning:
+                expected_totals = totals
+
+        assert totals == expected_totals
+
+        print(f"{item_count:>8}{timings[0] * 1000:>14.2f}{timings[1] * 1000:>12.2f}{timings[0] / timings[1]:>9.0f}x")
+
+
+if __name__ == "__main__":
+    main()
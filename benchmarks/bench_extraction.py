@@ -0,0 +1,63 @@
+"""
+Benchmark of the word box extraction mode against the text extraction mode of PDFReader.
+
+Runs both modes over a corpus of synthetic receipts, plus any real receipts passed on the command line, checks
+that they produce the same item records and reports the time each mode takes.
+
+Usage: python benchmarks/bench_extraction.py [receipt.pdf | "receipts/*.pdf" ...]
+"""
+
+import os
+import sys
+import glob
+import time
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ReceiptDividerRev2 import PDFReader
+from synthetic_receipt import write_receipt_pdf
+
+SYNTHETIC_SIZES = (10, 100, 1000)
+
+
+def parse(file_location, extraction_mode):
+    """Returns (best time in seconds, item records, total) for one receipt in the given extraction mode."""
+
+    best_time = float("inf")
+
+    for _ in range(3):
+        scanner = PDFReader(file_location, extraction_mode=extraction_mode)
+        start_time = time.perf_counter()
+        scanner.parse_file()
+        best_time = min(best_time, time.perf_counter() - start_time)
+
+    records = [item.to_item_data() for item in scanner.get_prepped_item_data().values()]
+
+    return best_time, records, scanner.get_extracted_total()
+
+
+def main():
+    real_receipts = sorted(file_location for pattern in sys.argv[1:] for file_location in glob.glob(pattern))
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        corpus = list(real_receipts)
+
+        for item_count in SYNTHETIC_SIZES:
+            file_location = os.path.join(temp_dir, f"synthetic_{item_count}.pdf")
+            write_receipt_pdf(file_location, item_count)
+            corpus.append(file_location)
+
+        print(f"{'receipt':<32}{'items':>7}{'text ms':>10}{'words ms':>10}  records match")
+
+        for file_location in corpus:
+            text_time, text_records, text_total = parse(file_location, "text")
+            words_time, words_records, words_total = parse(file_location, "words")
+            match = text_records == words_records and text_total == words_total
+
+            print(f"{os.path.basename(file_location)[:31]:<32}{len(text_records):>7}"
+                  f"{text_time * 1000:>10.2f}{words_time * 1000:>10.2f}  {match}")
+
+
+if __name__ == "__main__":
+    main()
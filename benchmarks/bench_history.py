@@ -0,0 +1,79 @@
+"""
+Benchmark of the AssignmentHistory with hundreds of thousands of recorded lines.
+
+Records a long run of synthetic receipts, then times creating the history (start-up), the first prediction (which
+replays the log and compacts it), loading the compacted log, and predicting the owners of a receipt.
+
+Usage: python benchmarks/bench_history.py [receipt count] [items per receipt]
+"""
+
+import os
+import sys
+import time
+import random
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ItemTable import ItemTable
+from AssignmentHistory import AssignmentHistory
+
+SHOPPER_NAMES = ("josh", "jessica", "sam", "Combined")
+PRODUCT_COUNT = 5000
+
+
+def main():
+    receipt_count = int(sys.argv[1]) if len(sys.argv) > 1 else 3000
+    items_per_receipt = int(sys.argv[2]) if len(sys.argv) > 2 else 100
+    rng = random.Random(0)
+
+    # Each product mostly goes to one shopper, now and then to another
+    products = [(f"PRODUCT {product_num} {rng.randint(1, 9)}00G", rng.choice(SHOPPER_NAMES))
+                for product_num in range(PRODUCT_COUNT)]
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        file_name = os.path.join(temp_dir, "history.txt")
+
+        start_time = time.perf_counter()
+        assignment_history = AssignmentHistory(file_name)
+        for _ in range(receipt_count):
+            receipt = rng.sample(products, items_per_receipt)
+            assignment_history.record_receipt([(name, owner if rng.random() < 0.8 else rng.choice(SHOPPER_NAMES))
+                                               for name, owner in receipt])
+        record_time = time.perf_counter() - start_time
+
+        with open(file_name, "r") as file:
+            log_lines = sum(1 for _ in file)
+
+        receipt_items = ItemTable().add_receipt([[name, 1.0] for name, _ in rng.sample(products, items_per_receipt)])
+
+        start_time = time.perf_counter()
+        assignment_history = AssignmentHistory(file_name)
+        startup_time = time.perf_counter() - start_time
+
+        start_time = time.perf_counter()
+        assignment_history.predict_owners(receipt_items)
+        replay_time = time.perf_counter() - start_time
+
+        with open(file_name, "r") as file:
+            compacted_lines = sum(1 for _ in file)
+
+        start_time = time.perf_counter()
+        assignment_history = AssignmentHistory(file_name)
+        predictions = assignment_history.predict_owners(receipt_items)
+        compacted_time = time.perf_counter() - start_time
+
+        start_time = time.perf_counter()
+        predictions = assignment_history.predict_owners(receipt_items)
+        predict_time = time.perf_counter() - start_time
+
+    print(f"Recorded {receipt_count} receipts, {log_lines} lines in {record_time:.2f}s")
+    print(f"{'start-up':>28}: {startup_time * 1000:10.3f} ms")
+    print(f"{'first prediction (replay)':>28}: {replay_time * 1000:10.3f} ms  ({log_lines} lines)")
+    print(f"{'first prediction (compacted)':>28}: {compacted_time * 1000:10.3f} ms  ({compacted_lines} lines)")
+    print(f"{'predict a receipt':>28}: {predict_time * 1000:10.3f} ms  ({len(predictions)} of "
+          f"{items_per_receipt} items predicted)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+Memory benchmark of the columnar ItemTable against a dictionary of GroceryItem objects per receipt.
+
+Builds an archive of synthetic receipts both ways, reports the memory each holds (traced by tracemalloc) and
+the time taken to total the spend per item name across the whole archive.
+
+Usage: python benchmarks/bench_item_table.py [receipts] [items per receipt]
+"""
+
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ReceiptDividerRev2 import PDFReader, GroceryItem
+from ItemTable import ItemTable
+from Money import to_cents
+from synthetic_receipt import build_receipt_lines
+
+
+def build_archive_data(receipt_count, item_count):
+    """Returns the item data of each synthetic receipt, as stored by the parse cache."""
+
+    archive_data = []
+
+    for seed in range(receipt_count):
+        scanner = PDFReader()
+        scanner.identify_item(build_receipt_lines(item_count, seed, offer_every=11))
+        archive_data.append([item.to_item_data() for item in scanner.get_prepped_item_data().values()])
+
+    return archive_data
+
+
+def fresh_name(name):
+    """Returns a new copy of an item name, the way parsing each receipt creates its own strings."""
+
+    return name.encode().decode()
+
+
+def build_grocery_items(archive_data):
+    """The previous representation: one dictionary of GroceryItem objects per receipt."""
+
+    return [{item_num: GroceryItem(fresh_name(item[0]), *item[1:])
+             for item_num, item in enumerate(items_found, start=1)}
+            for items_found in archive_data]
+
+
+def build_item_table(archive_data):
+    """The columnar representation: every receipt in one shared ItemTable."""
+
+    item_table = ItemTable()
+    receipts = [item_table.add_receipt([[fresh_name(item[0])] + item[1:] for item in items_found])
+                for items_found in archive_data]
+
+    return item_table, receipts
+
+
+def measure_memory(build, archive_data):
+    """Returns (bytes held after the build, the built archive)."""
+
+    tracemalloc.start()
+    archive = build(archive_data)
+    held_memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    return held_memory, archive
+
+
+def main():
+    receipt_count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    item_count = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+
+    archive_data = build_archive_data(receipt_count, item_count)
+
+    grocery_memory, grocery_archive = measure_memory(build_grocery_items, archive_data)
+    table_memory, (item_table, _) = measure_memory(build_item_table, archive_data)
+
+    # Total spend per item name across the archive
+    start_time = time.perf_counter()
+    grocery_totals = {}
+    for receipt_items in grocery_archive:
+        for grocery_item in receipt_items.values():
+            name = grocery_item.get_item_name()
+            grocery_totals[name] = grocery_totals.get(name, 0) + to_cents(grocery_item.get_item_price())
+    grocery_time = time.perf_counter() - start_time
+
+    start_time = time.perf_counter()
+    table_totals = item_table.totals_by_name()
+    table_time = time.perf_counter() - start_time
+
+    assert grocery_totals == table_totals
+
+    rows = len(item_table)
+    print(f"{receipt_count} receipts, {rows} items")
+    print(f"{'':>18}{'memory':>12}{'bytes/item':>12}{'totals ms':>12}")
+    print(f"{'GroceryItem dicts':>18}{grocery_memory / 2**20:>10.1f}MB{grocery_memory / rows:>12.0f}"
+          f"{grocery_time * 1000:>12.2f}")
+    print(f"{'ItemTable':>18}{table_memory / 2**20:>10.1f}MB{table_memory / rows:>12.0f}"
+          f"{table_time * 1000:>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Benchmark of predicting item owners with the AssignmentRules keyword automaton against checking every rule.
+
+Checking every rule against every item name costs rules x items substring searches, the automaton one pass over
+the item names whatever the number of rules.
+
+Usage: python benchmarks/bench_rules.py [rule count ...]
+"""
+
+import os
+import sys
+import time
+import random
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ItemTable import ItemTable
+from AssignmentRules import AssignmentRules
+
+SHOPPER_NAMES = ("josh", "jessica", "sam")
+WORDS = ("PROTEIN", "MILK", "BREAD", "COFFEE", "CHOCOLATE", "YOGHURT", "CHICKEN", "RICE", "PASTA", "APPLES",
+         "BANANAS", "CHEESE", "BUTTER", "EGGS", "TEA", "JUICE", "CEREAL", "SAUCE", "SOAP", "SHAMPOO")
+ITEM_COUNT = 5000
+
+
+def predict_by_checking_every_rule(rules, receipt_items):
+    """Returns the owner of each item from the first rule whose keyword the item name contains."""
+
+    predictions = {}
+
+    for item_num, grocery_item in receipt_items.items():
+        item_name = grocery_item.get_item_name().upper()
+
+        for keyword, shopper_name in rules:
+            if keyword in item_name:
+                predictions[item_num] = shopper_name
+                break
+
+    return predictions
+
+
+def main():
+    rule_counts = [int(count) for count in sys.argv[1:]] or [10, 100, 1000, 5000]
+    rng = random.Random(0)
+
+    receipt_items = ItemTable().add_receipt([[f"{rng.choice(WORDS)} {rng.choice(WORDS)} {rng.randint(1, 999)}G",
+                                              rng.randint(50, 2500) / 100] for _ in range(ITEM_COUNT)])
+
+    print(f"{ITEM_COUNT} items")
+    print(f"{'rules':>8}{'every rule ms':>16}{'automaton ms':>15}{'speed-up':>10}")
+
+    for rule_count in rule_counts:
+
+        # A few real keywords among many that never match, as a long-lived rules file would have
+        keywords = list(WORDS[:5]) + [f"{rng.choice(WORDS)}{rule_num}" for rule_num in range(rule_count - 5)]
+        assignment_rules = AssignmentRules([(keyword, rng.choice(SHOPPER_NAMES)) for keyword in keywords])
+        rules = assignment_rules.get_rules()
+
+        start_time = time.perf_counter()
+        expected_predictions = predict_by_checking_every_rule(rules, receipt_items)
+        every_rule_time = time.perf_counter() - start_time
+
+        # The automaton is built on the first prediction, so it is timed as part of the run
+        start_time = time.perf_counter()
+        predictions = assignment_rules.predict_owners(receipt_items)
+        automaton_time = time.perf_counter() - start_time
+
+        assert predictions == expected_predictions
+
+        print(f"{rule_count:>8}{every_rule_time * 1000:>16.2f}{automaton_time * 1000:>15.2f}"
+              f"{every_rule_time / automaton_time:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Benchmark of the SettlementLedger against naive pairwise settlement.
+
+Builds a share house history of receipts, each paid by a random shopper and split with a few others, then settles
+it both ways: pairwise settlement nets what each pair of shoppers owe each other and pays every non-zero pair, the
+ledger nets each shopper's balance and settles the balances with the heap-based greedy matcher.
+
+Usage: python benchmarks/bench_settlement.py [shopper count ...]
+"""
+
+import os
+import sys
+import time
+import random
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Settlement import SettlementLedger
+
+RECEIPTS_PER_SHOPPER = 10
+
+
+def build_receipts(shopper_count, rng):
+    """Returns (payer, {shopper name: cents owed}) receipts, each split between two to five shoppers."""
+
+    names = [f"shopper{shopper_num}" for shopper_num in range(shopper_count)]
+    receipts = []
+
+    for _ in range(shopper_count * RECEIPTS_PER_SHOPPER):
+        splitters = rng.sample(names, min(rng.randint(2, 5), shopper_count))
+        payer = splitters[0]
+        receipts.append((payer, {name: rng.randint(100, 10000) for name in splitters[1:]}))
+
+    return receipts
+
+
+def settle_pairwise(receipts):
+    """Nets what each pair of shoppers owe each other and returns one transfer per pair still owing."""
+
+    pair_debts = {}
+
+    for payer, owings in receipts:
+        for name, cents in owings.items():
+            if name < payer:
+                pair_debts[(name, payer)] = pair_debts.get((name, payer), 0) + cents
+            else:
+                pair_debts[(payer, name)] = pair_debts.get((payer, name), 0) - cents
+
+    return [(first, second, cents) if cents > 0 else (second, first, -cents)
+            for (first, second), cents in pair_debts.items() if cents]
+
+
+def settle_with_ledger(receipts):
+    """Nets each shopper's balance in a SettlementLedger and settles the balances."""
+
+    settlement_ledger = SettlementLedger()
+
+    for payer, owings in receipts:
+        settlement_ledger.add_receipt(payer, owings)
+
+    return settlement_ledger.settle()
+
+
+def net_balances(transfers):
+    """Returns the balances the transfers settle, to check both settlements settle the same debts."""
+
+    balances = {}
+
+    for debtor, creditor, cents in transfers:
+        balances[debtor] = balances.get(debtor, 0) - cents
+        balances[creditor] = balances.get(creditor, 0) + cents
+
+    return {name: cents for name, cents in balances.items() if cents}
+
+
+def main():
+    shopper_counts = [int(count) for count in sys.argv[1:]] or [10, 100, 1000, 5000]
+    rng = random.Random(0)
+
+    print(f"{'shoppers':>9}{'receipts':>10}{'pairwise ms':>13}{'transfers':>11}{'ledger ms':>11}{'transfers':>11}")
+
+    for shopper_count in shopper_counts:
+        receipts = build_receipts(shopper_count, rng)
+
+        results = []
+        for settle in (settle_pairwise, settle_with_ledger):
+            start_time = time.perf_counter()
+            transfers = settle(receipts)
+            results.append((time.perf_counter() - start_time, transfers))
+
+        assert net_balances(results[0][1]) == net_balances(results[1][1])
+
+        print(f"{shopper_count:>9}{len(receipts):>10}"
+              f"{results[0][0] * 1000:>13.2f}{len(results[0][1]):>11}"
+              f"{results[1][0] * 1000:>11.2f}{len(results[1][1]):>11}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Benchmark of recomputing every shopper's total from the ShareMatrix, with NumPy and with the plain Python fallback.
+
+Builds a receipt of items each taken by one shopper, split evenly or split 2:1, then times one recompute of the
+totals: a matrix-vector product of the prices and the shares, and the exact cent allocation.
+
+Usage: python benchmarks/bench_share_matrix.py [item count] [shopper count]
+"""
+
+import os
+import sys
+import time
+import random
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import ShareMatrix
+from ShareMatrix import ShareMatrix as Matrix
+
+REPEATS = 200
+
+
+def build_matrix(item_count, shopper_count, rng):
+    """Returns a share matrix with a third of the items split evenly and a tenth split 2:1 between two shoppers."""
+
+    names = [f"shopper{shopper_num}" for shopper_num in range(shopper_count)]
+    prices_cents = [rng.randint(50, 3000) for _ in range(item_count)]
+    owners = [rng.choice(names) if rng.random() > 1 / 3 else None for _ in range(item_count)]
+
+    share_matrix = Matrix.from_owners(prices_cents, names, owners)
+    for row in rng.sample(range(item_count), item_count // 10):
+        first, second = rng.sample(names, 2)
+        share_matrix.set_shares(row, {first: 2, second: 1})
+
+    return share_matrix
+
+
+def time_totals(share_matrix, repeats):
+    """Returns the totals and the mean time of one recompute in microseconds."""
+
+    start_time = time.perf_counter()
+    for _ in range(repeats):
+        totals_cents = share_matrix.get_totals_cents()
+
+    return totals_cents, (time.perf_counter() - start_time) * 1e6 / repeats
+
+
+def main():
+    item_count = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    shopper_count = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+
+    print(f"{item_count} items x {shopper_count} shoppers")
+
+    numpy_module = ShareMatrix.numpy
+    if numpy_module is not None:
+        start_time = time.perf_counter()
+        share_matrix = build_matrix(item_count, shopper_count, random.Random(0))
+        print(f"{'build (NumPy)':>18}: {(time.perf_counter() - start_time) * 1000:10.3f} ms")
+
+        numpy_totals, numpy_time = time_totals(share_matrix, REPEATS)
+        print(f"{'recompute (NumPy)':>18}: {numpy_time:10.1f} us")
+    else:
+        numpy_totals = None
+        print("NumPy is not installed, only the plain Python fallback is timed")
+
+    # The same matrix without NumPy
+    ShareMatrix.numpy = None
+    try:
+        share_matrix = build_matrix(item_count, shopper_count, random.Random(0))
+        python_totals, python_time = time_totals(share_matrix, max(REPEATS // 20, 1))
+    finally:
+        ShareMatrix.numpy = numpy_module
+
+    print(f"{'recompute (Python)':>18}: {python_time:10.1f} us")
+
+    assert numpy_totals is None or numpy_totals == python_totals
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Benchmark of saving the spending trackers through the ShopperJournal against rewriting the shoppers file.
+
+Each save after a divide changes the trackers of a few shoppers. Rewriting the shoppers file costs O(shoppers)
+per save, appending the change to the journal O(1). Both are flushed to disk, as a save that can be lost in a
+crash is no save.
+
+Usage: python benchmarks/bench_shopper_journal.py [shopper count ...]
+"""
+
+import os
+import sys
+import time
+import random
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Money import from_cents
+from ShopperJournal import ShopperJournal
+
+SAVES = 200
+
+
+def save_by_rewriting(file_name, spending, saves):
+    """Adds each save to the trackers and rewrites the whole shoppers file, as store_shoppers_details used to."""
+
+    for spending_changes in saves:
+        for name, cents in spending_changes.items():
+            spending[name] += cents
+
+        with open(file_name, 'w') as file:
+            for name, cents in spending.items():
+                file.write(f'{name},{from_cents(cents)}\n')
+            file.flush()
+            os.fsync(file.fileno())
+
+
+def save_with_journal(file_name, spending, saves):
+    """Appends each save to the shopper journal, compacting it every so often."""
+
+    shopper_journal = ShopperJournal(file_name)
+
+    for spending_changes in saves:
+        shopper_journal.record(spending_changes)
+
+
+def main():
+    shopper_counts = [int(count) for count in sys.argv[1:]] or [10, 1000, 10000]
+    rng = random.Random(0)
+
+    print(f"{SAVES} saves of three shoppers each")
+    print(f"{'shoppers':>9}{'rewrite ms/save':>17}{'journal ms/save':>17}")
+
+    for shopper_count in shopper_counts:
+        names = [f"shopper{shopper_num}" for shopper_num in range(shopper_count)]
+        saves = [{name: rng.randint(100, 10000) for name in rng.sample(names, 3)} for _ in range(SAVES)]
+
+        timings = []
+        results = []
+        for save in (save_by_rewriting, save_with_journal):
+            with tempfile.TemporaryDirectory() as temp_dir:
+                file_name = os.path.join(temp_dir, "shoppers.txt")
+                spending = {name: 0 for name in names}
+
+                with open(file_name, 'w') as file:
+                    file.writelines(f'{name},0.0\n' for name in names)
+
+                start_time = time.perf_counter()
+                save(file_name, spending, saves)
+                timings.append(time.perf_counter() - start_time)
+
+                results.append(ShopperJournal(file_name).load())
+
+        assert results[0] == results[1]
+
+        print(f"{shopper_count:>9}{timings[0] * 1000 / SAVES:>17.3f}{timings[1] * 1000 / SAVES:>17.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+Benchmark of the SQLiteStorage with years of receipt history.
+
+Saves a share house's receipts (three a week, 60 items each) one receipt per transaction, as ReceiptDivider
+saves them, and all in one transaction, as BulkDivider does. It then times the lookups that run while dividing:
+loading the shoppers, the receipts of the last month, who took an item, and what each shopper took in a year.
+
+Usage: python benchmarks/bench_storage.py [years]
+"""
+
+import os
+import sys
+import time
+import random
+import datetime
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from SQLiteStorage import SQLiteStorage
+
+SHOPPER_NAMES = ("josh", "jessica", "sam", "alex")
+PRODUCT_COUNT = 2000
+ITEMS_PER_RECEIPT = 60
+RECEIPTS_PER_WEEK = 3
+
+
+def build_receipt_records(years, rng):
+    """Returns receipt records dated every few days over the given number of years."""
+
+    products = [f"PRODUCT {product_num}" for product_num in range(PRODUCT_COUNT)]
+    start_date = datetime.datetime(2020, 1, 1)
+    receipt_records = []
+
+    for receipt_num in range(int(years * 52 * RECEIPTS_PER_WEEK)):
+        divided_at = start_date + datetime.timedelta(days=receipt_num * 7 / RECEIPTS_PER_WEEK)
+        items = [(item_num, name, rng.randint(50, 2500), rng.choice(SHOPPER_NAMES + (None,)))
+                 for item_num, name in enumerate(rng.sample(products, ITEMS_PER_RECEIPT), 1)]
+
+        receipt_records.append({"file_location": f"receipt_{receipt_num}.pdf",
+                                "divided_at": divided_at.strftime("%Y-%m-%dT%H:%M:%S"),
+                                "payer": rng.choice(SHOPPER_NAMES),
+                                "total_cents": sum(price_cents for _, _, price_cents, _ in items),
+                                "items": items})
+
+    return receipt_records
+
+
+def timed(function, *args):
+    """Returns the result of a call and the time it took in milliseconds."""
+
+    start_time = time.perf_counter()
+    result = function(*args)
+
+    return result, (time.perf_counter() - start_time) * 1000
+
+
+def main():
+    years = float(sys.argv[1]) if len(sys.argv) > 1 else 5
+    receipt_records = build_receipt_records(years, random.Random(0))
+    item_count = len(receipt_records) * ITEMS_PER_RECEIPT
+
+    print(f"{len(receipt_records)} receipts, {item_count} items over {years:g} years")
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+
+        # One transaction per receipt
+        storage = SQLiteStorage(os.path.join(temp_dir, "one_by_one.db"))
+        storage.add_shoppers({name: 0 for name in SHOPPER_NAMES})
+        start_time = time.perf_counter()
+        for receipt_record in receipt_records:
+            storage.save_receipts([receipt_record])
+        one_by_one_time = time.perf_counter() - start_time
+        storage.close()
+
+        # Every receipt in one transaction
+        storage = SQLiteStorage(os.path.join(temp_dir, "bulk.db"))
+        storage.add_shoppers({name: 0 for name in SHOPPER_NAMES})
+        _, bulk_time = timed(storage.save_receipts, receipt_records)
+
+        print(f"{'save, one per transaction':>30}: {one_by_one_time * 1000 / len(receipt_records):10.3f} ms/receipt")
+        print(f"{'save, one transaction':>30}: {bulk_time / len(receipt_records):10.3f} ms/receipt")
+
+        last_date = receipt_records[-1]["divided_at"]
+        month_ago = (datetime.datetime.fromisoformat(last_date) - datetime.timedelta(days=30)).isoformat()
+        year_ago = (datetime.datetime.fromisoformat(last_date) - datetime.timedelta(days=365)).isoformat()
+
+        lookups = (("load shoppers", storage.load_shoppers, ()),
+                   ("receipts of the last month", storage.get_receipts, (None, month_ago)),
+                   ("receipts one payer paid", storage.get_receipts, ("sam",)),
+                   ("who took an item", storage.get_item_owners, ("PRODUCT 42",)),
+                   ("spending over the last year", storage.get_spending_between, (year_ago, "9999")))
+
+        for label, lookup, args in lookups:
+            result, lookup_time = timed(lookup, *args)
+            print(f"{label:>30}: {lookup_time:10.3f} ms  ({len(result)} rows)")
+
+        storage.close()
+
+
+if __name__ == "__main__":
+    main()
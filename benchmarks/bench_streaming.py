@@ -0,0 +1,90 @@
+"""
+Benchmark of the streaming multi-page extraction pipeline on a synthetic 50-page receipt.
+
+Compares PDFReader.parse_file, which streams lines page by page, against reading every page into a single
+line list up front. Reports the time taken and the peak memory allocated by Python during the parse.
+
+Usage: python benchmarks/bench_streaming.py [pages]
+"""
+
+import os
+import sys
+import time
+import tempfile
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# The pymupdf name where it exists, newer releases print a deprecation notice on `import fitz`
+try:
+    import pymupdf as fitz  # pip install PyMuPDF
+except ImportError:
+    import fitz
+
+from ReceiptDividerRev2 import PDFReader
+from synthetic_receipt import write_receipt_pdf
+
+LINES_PER_PAGE = 60
+
+
+def parse_streaming(file_location):
+    """Parses the receipt with the streaming pipeline."""
+
+    scanner = PDFReader(file_location)
+    scanner.parse_file()
+
+    return scanner
+
+
+def parse_eager(file_location):
+    """Parses the receipt after reading the lines of every page into one list."""
+
+    scanner = PDFReader(file_location)
+
+    with fitz.open(file_location) as doc:
+        lines = []
+        for page in doc:
+            lines.extend(page.get_text("text").split('\n'))
+
+    scanner.identify_item(lines)
+
+    return scanner
+
+
+def measure(parse, file_location, repeats=5):
+    """Returns (best time in seconds, peak traced memory in bytes, number of items) for a parse function."""
+
+    best_time = float("inf")
+    for _ in range(repeats):
+        start_time = time.perf_counter()
+        scanner = parse(file_location)
+        best_time = min(best_time, time.perf_counter() - start_time)
+
+    tracemalloc.start()
+    parse(file_location)
+    peak_memory = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    return best_time, peak_memory, len(scanner.get_prepped_item_data())
+
+
+def main():
+    pages = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+
+    # Roughly 44 items fill a page once the quantity and member saving lines are counted
+    item_count = pages * 44
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        file_location = os.path.join(temp_dir, "synthetic_receipt.pdf")
+        page_count = write_receipt_pdf(file_location, item_count, LINES_PER_PAGE)
+
+        print(f"Synthetic receipt: {page_count} pages, {item_count} items")
+
+        for label, parse in (("streaming", parse_streaming), ("eager", parse_eager)):
+            best_time, peak_memory, items_found = measure(parse, file_location)
+            print(f"{label:>10}: {best_time * 1000:8.1f} ms  peak {peak_memory / 1024:8.1f} KiB  "
+                  f"{items_found} items ({page_count / best_time:.0f} pages/s)")
+
+
+if __name__ == "__main__":
+    main()
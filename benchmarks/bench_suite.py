@@ -0,0 +1,167 @@
+"""
+Benchmark suite of the parse and divide path on synthetic receipts.
+
+Times PDFReader.read_file, ReceiptReader.grab_items_and_price, Receipt construction, Shopper.calculate_cart_total
+and ReceiptDivider.calculate_owings on synthetic eReceipts of 10 to 10,000 items, with member savings, OFFER lines,
+PRICE REDUCED lines and an Everyday Extra Discount switched on. The best time of several runs is reported, and the
+results are saved as JSON so runs before and after a change can be compared.
+
+Usage: python benchmarks/bench_suite.py [--sizes 10 100 1000 10000] [--output results.json] [--compare old.json]
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import builtins
+import platform
+import tempfile
+import contextlib
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ReceiptDividerRev2 import PDFReader, Receipt, Shopper, ReceiptDivider
+from ItemTable import ItemTable
+from ReceiptReader import grab_items_and_price
+from synthetic_receipt import write_receipt_pdf
+
+DEFAULT_SIZES = (10, 100, 1000, 10000)
+
+# Discount lines switched on in every synthetic receipt of the suite
+RECEIPT_OPTIONS = {"offer_every": 11, "price_reduced_every": 13, "everyday_extra": True}
+
+
+def best_time(function, setup=None, repeats=5):
+    """
+    Returns the best time in seconds of several calls to a function.
+
+    Parameters:
+    - function (callable): Function to time, called with the value returned by `setup`.
+    - setup (callable): Builds fresh input for each call outside of the timed section, as several of the timed
+      functions change their input.
+    - repeats (int): Number of timed calls.
+    """
+
+    best = float("inf")
+
+    for _ in range(repeats):
+        args = setup() if setup else ()
+        start_time = time.perf_counter()
+        function(*args)
+        best = min(best, time.perf_counter() - start_time)
+
+    return best
+
+
+def bench_receipt(file_location, repeats):
+    """Times each stage of the parse and divide path on one receipt, returning {stage: seconds}."""
+
+    scanner = PDFReader(file_location)
+    scanner.read_file()
+    item_data = [item.to_item_data() for item in scanner.get_prepped_item_data().values()]
+    total = scanner.get_extracted_total()
+    everyday_extra_discount = scanner.get_everyday_extra_discount()
+
+    def fresh_items():
+        return (ItemTable().add_receipt(item_data),)
+
+    def read_file():
+        PDFReader(file_location).read_file()
+
+    def construct_receipt(receipt_items):
+        Receipt(receipt_items, total, everyday_extra_discount)
+
+    def cart_setup():
+        return (Shopper("combined", None, True, list(fresh_items()[0].values())),)
+
+    def divider_setup():
+        receipt_divider = ReceiptDivider()
+        receipt_divider.set_receipt(Receipt(fresh_items()[0], total))
+
+        for name in ("josh", "jessica"):
+            receipt_divider.add_shopper_to_receipt(Shopper(name))
+        receipt_divider.create_new_shopper(True)
+
+        # Every third item is taken by each shopper, the rest stay in the combined cart
+        shoppers = receipt_divider.get_shoppers_in_receipt()
+        for item_num, grocery_item in receipt_divider.get_receipt().get_receipt_items().items():
+            if item_num % 3:
+                shoppers["Combined"].remove_from_personal_cart(grocery_item, announce=False)
+                shoppers["josh" if item_num % 3 == 1 else "jessica"].add_to_personal_cart(grocery_item, announce=False)
+
+        shopper_dict = receipt_divider.build_shopper_dict()
+        for shopper in shopper_dict.values():
+            shopper.calculate_cart_total("y")
+
+        return receipt_divider, shopper_dict
+
+    def calculate_owings(receipt_divider, shopper_dict):
+        receipt_divider.calculate_owings(shopper_dict)
+
+    # calculate_owings asks who paid and prints the owings, so its prompt is answered and its output discarded
+    original_input = builtins.input
+    builtins.input = lambda prompt="": "a"
+    try:
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            timings = {"read_file": best_time(read_file, repeats=repeats),
+                       "grab_items_and_price": best_time(grab_items_and_price, lambda: (file_location,), repeats),
+                       "receipt_construction": best_time(construct_receipt, fresh_items, repeats),
+                       "calculate_cart_total": best_time(Shopper.calculate_cart_total, cart_setup, repeats),
+                       "calculate_owings": best_time(calculate_owings, divider_setup, repeats)}
+    finally:
+        builtins.input = original_input
+
+    return len(item_data), timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="Item counts to benchmark.")
+    parser.add_argument("--repeats", type=int, default=5, help="Timed runs of each stage, the best is reported.")
+    parser.add_argument("--output", help="File to save the results to as JSON.")
+    parser.add_argument("--compare", help="JSON results of an earlier run to compare against.")
+    args = parser.parse_args()
+
+    results = {"python": platform.python_version(),
+               "platform": platform.platform(),
+               "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+               "receipt_options": RECEIPT_OPTIONS,
+               "runs": []}
+
+    previous_runs = {}
+    if args.compare:
+        with open(args.compare, "r") as file:
+            previous_runs = {run["items"]: run["timings"] for run in json.load(file)["runs"]}
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for item_count in args.sizes:
+            file_location = os.path.join(temp_dir, f"synthetic_{item_count}.pdf")
+            pages = write_receipt_pdf(file_location, item_count, **RECEIPT_OPTIONS)
+
+            # Fewer runs for the largest receipts keep the suite quick
+            repeats = args.repeats if item_count < 10000 else max(1, args.repeats // 2)
+            parsed_items, timings = bench_receipt(file_location, repeats)
+
+            results["runs"].append({"items": item_count, "pages": pages, "parsed_items": parsed_items,
+                                    "timings": timings})
+
+            print(f"\n{item_count} items ({pages} pages)")
+            for stage, seconds in timings.items():
+                line = f"{stage:>24}: {seconds * 1000:10.3f} ms"
+
+                previous = previous_runs.get(item_count, {}).get(stage)
+                if previous:
+                    line += f"   {previous / seconds:6.2f}x vs previous"
+
+                print(line)
+
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(results, file, indent=2)
+
+        print(f"\nResults saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
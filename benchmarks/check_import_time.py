@@ -0,0 +1,75 @@
+"""
+Import-time budget check of the headless command line.
+
+Runs `python -X importtime -c "import ReceiptDividerCLI"` in a fresh interpreter and fails if any heavy module
+(PyMuPDF, tkinter, customtkinter) is imported at start-up, or if the cumulative import time of the command line
+and the receipt modules goes over the budget. The same check is run on ReceiptDividerRev2, whose PDF and file
+dialog imports are deferred to the methods that use them.
+
+Usage: python benchmarks/check_import_time.py [budget in ms]
+"""
+
+import os
+import sys
+import subprocess
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules which must never be imported just by starting the command line
+HEAVY_MODULES = ("fitz", "pymupdf", "tkinter", "_tkinter", "customtkinter", "numpy")
+
+CHECKED_MODULES = ("ReceiptDividerCLI", "ReceiptDividerRev2")
+
+DEFAULT_BUDGET_MS = 75.0
+
+
+def measure_imports(module_name):
+    """
+    Imports a module in a fresh interpreter with -X importtime.
+
+    Returns:
+    - dict: Cumulative import time in microseconds of each imported module, keyed by module name.
+    """
+
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module_name}"],
+                            cwd=REPO_ROOT, capture_output=True, text=True, check=True)
+
+    import_times = {}
+
+    # Lines look like "import time:       123 |        456 |   package.module"
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+
+        _, cumulative, name = line[len("import time:"):].split("|")
+        import_times[name.strip()] = int(cumulative)
+
+    return import_times
+
+
+def main():
+    budget_ms = float(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_BUDGET_MS
+    failures = []
+
+    for module_name in CHECKED_MODULES:
+        import_times = measure_imports(module_name)
+
+        heavy_imports = sorted(name for name in import_times if name.split(".")[0] in HEAVY_MODULES)
+        import_ms = import_times[module_name] / 1000
+
+        print(f"{module_name:<20}{import_ms:>8.1f} ms  (budget {budget_ms:.0f} ms)  "
+              f"heavy imports: {', '.join(heavy_imports) or 'none'}")
+
+        if heavy_imports:
+            failures.append(f"{module_name} imports {', '.join(heavy_imports)} at start-up")
+        if import_ms > budget_ms:
+            failures.append(f"{module_name} took {import_ms:.1f} ms to import")
+
+    for failure in failures:
+        print(f"FAILED: {failure}")
+
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
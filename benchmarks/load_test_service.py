@@ -0,0 +1,164 @@
+"""
+Load test of the ReceiptService with concurrent clients.
+
+Starts the service on a free port with a fresh parse cache, then runs waves of clients against it. Each client
+keeps one connection open and, for each receipt it is given, uploads the PDF to /parse (a cold parse in the worker
+pool) and divides it with /divide (read back from the parse cache). The receipts per second, the latency
+percentiles of each endpoint and the number of 503 answers are reported for each level of concurrency, so the
+point where the bounded queue starts turning clients away can be seen.
+
+Usage: python benchmarks/load_test_service.py [--concurrency 1 4 16 64] [--receipts 40] [--items 80]
+                                              [--workers 2] [--queue 8]
+"""
+
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ReceiptService import ReceiptService
+from ParseCache import ParseCache
+from ReceiptDividerRev2 import PARSER_VERSION
+from synthetic_receipt import write_receipt_pdf
+
+ASSIGNMENT = {"paid": "josh", "shoppers": ["josh", "jessica"], "items": {"1": "josh", "2": "jessica"},
+              "patterns": {"*milk*": "jessica"}, "default": "Combined"}
+
+
+async def send_request(connection, method, path, body=b"", content_type="application/json"):
+    """
+    Sends one request on a keep-alive connection and reads the answer.
+
+    Parameters:
+    - connection (list): [reader, writer] of the connection, replaced if the service closes it.
+
+    Returns:
+    - tuple: (status, decoded JSON body).
+    """
+
+    reader, writer = connection
+    writer.write(f"{method} {path} HTTP/1.1\r\nHost: localhost\r\nContent-Type: {content_type}\r\n"
+                 f"Content-Length: {len(body)}\r\n\r\n".encode("latin-1") + body)
+    await writer.drain()
+
+    status = int((await reader.readline()).split()[1])
+    headers = {}
+    while (line := await reader.readline()) not in (b"\r\n", b""):
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+
+    payload = json.loads(await reader.readexactly(int(headers.get("content-length", 0))))
+
+    if headers.get("connection", "").lower() == "close":
+        writer.close()
+        connection[:] = [None, None]
+
+    return status, payload
+
+
+async def run_client(address, receipts, results):
+    """Parses and divides each receipt given, recording (endpoint, status, seconds) for every request."""
+
+    connection = [None, None]
+
+    for pdf_bytes in receipts:
+        if connection[0] is None:
+            connection[:] = await asyncio.open_connection(*address)
+
+        start_time = time.perf_counter()
+        status, payload = await send_request(connection, "POST", "/parse", pdf_bytes, "application/pdf")
+        results.append(("parse", status, time.perf_counter() - start_time))
+
+        if status != 200:
+            continue
+
+        if connection[0] is None:
+            connection[:] = await asyncio.open_connection(*address)
+
+        body = json.dumps({"receipt": payload["receipt"], "assignment": ASSIGNMENT}).encode("utf-8")
+        start_time = time.perf_counter()
+        status, payload = await send_request(connection, "POST", "/divide", body)
+        results.append(("divide", status, time.perf_counter() - start_time))
+
+    if connection[1] is not None:
+        connection[1].close()
+
+
+def percentile(times, fraction):
+    """Returns a percentile of a list of times, in milliseconds."""
+
+    if not times:
+        return float("nan")
+
+    return sorted(times)[min(len(times) - 1, int(fraction * len(times)))] * 1000
+
+
+async def run_level(concurrency, receipt_bytes, args):
+    """Runs one wave of clients against a fresh service, returning the results and the wall clock time."""
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        receipt_service = ReceiptService(port=0, max_workers=args.workers, max_queued=args.queue,
+                                         parse_cache=ParseCache(cache_dir, parser_version=PARSER_VERSION))
+        await receipt_service.start()
+
+        try:
+            results = []
+            start_time = time.perf_counter()
+            await asyncio.gather(*(run_client(receipt_service.get_address(), receipt_bytes[client_num::concurrency],
+                                              results)
+                                   for client_num in range(concurrency)))
+            elapsed_time = time.perf_counter() - start_time
+        finally:
+            await receipt_service.close()
+
+    return results, elapsed_time
+
+
+async def run_load_test(args, receipt_bytes):
+    print(f"{len(receipt_bytes)} receipts of {args.items} items, {args.workers} worker(s), queue of {args.queue}")
+    print(f"{'clients':>8} {'receipts/s':>11} {'parse p50':>10} {'parse p95':>10} {'divide p50':>11} "
+          f"{'divide p95':>11} {'503s':>6}")
+
+    for concurrency in args.concurrency:
+        results, elapsed_time = await run_level(concurrency, receipt_bytes, args)
+
+        parse_times = [seconds for endpoint, status, seconds in results if endpoint == "parse" and status == 200]
+        divide_times = [seconds for endpoint, status, seconds in results if endpoint == "divide" and status == 200]
+        rejected = sum(1 for _, status, _ in results if status == 503)
+        failed = [(endpoint, status) for endpoint, status, _ in results if status not in (200, 503)]
+
+        print(f"{concurrency:>8} {len(divide_times) / elapsed_time:>11.1f} {percentile(parse_times, 0.5):>8.1f}ms "
+              f"{percentile(parse_times, 0.95):>8.1f}ms {percentile(divide_times, 0.5):>9.1f}ms "
+              f"{percentile(divide_times, 0.95):>9.1f}ms {rejected:>6}")
+
+        assert not failed, f"Unexpected answers: {failed[:5]}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16, 64])
+    parser.add_argument("--receipts", type=int, default=40, help="Number of distinct receipts uploaded per level.")
+    parser.add_argument("--items", type=int, default=80, help="Number of items on each receipt.")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--queue", type=int, default=8, help="Jobs allowed to wait for a worker before a 503.")
+    args = parser.parse_args()
+
+    # Every receipt is different, so each upload is a cold parse
+    with tempfile.TemporaryDirectory() as receipt_dir:
+        receipt_bytes = []
+        for seed in range(args.receipts):
+            file_location = os.path.join(receipt_dir, f"receipt_{seed}.pdf")
+            write_receipt_pdf(file_location, args.items, seed=seed)
+            with open(file_location, "rb") as file:
+                receipt_bytes.append(file.read())
+
+    asyncio.run(run_load_test(args, receipt_bytes))
+
+
+if __name__ == "__main__":
+    main()
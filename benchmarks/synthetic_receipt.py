@@ -0,0 +1,129 @@
+import math
+import random  # inbuilt
+
+# The pymupdf name where it exists, newer releases print a deprecation notice on `import fitz`
+try:
+    import pymupdf as fitz  # pip install PyMuPDF
+except ImportError:
+    import fitz
+
+# Woolworths eReceipts open with a 4 row header
+HEADER_LINES = ["Woolworths Mawson Lakes",
+                "ABN 88 000 014 675",
+                "Tax Invoice",
+                "Description                                    Price"]
+
+PRODUCT_NAMES = ["Bananas Cavendish", "Woolworths Full Cream Milk 3L", "Free Range Eggs 12pk", "Sourdough Loaf",
+                 "Greek Yoghurt 1kg", "Chicken Breast Fillets", "Baby Spinach 120g", "Protein Bar Choc 12pk",
+                 "Olive Oil Extra Virgin 750ml", "Rolled Oats 1kg", "Tasty Cheese Block 500g", "Pasta Penne 500g"]
+
+
+def format_line(name, price):
+    """Returns a receipt line with the name and price columns aligned the way the eReceipt lays them out."""
+
+    return f"{name:<40}{price:>12}"
+
+
+def build_receipt_lines(item_count, seed=0, qty_every=5, member_saving_every=7, offer_every=0,
+                        price_reduced_every=0, everyday_extra=False):
+    """
+    Builds the text lines of a synthetic Woolworths-style eReceipt.
+
+    By default every fifth item is a quantity item whose name sits on its own line (ending in two spaces) above
+    the "Qty" price line, and every seventh item is followed by a Member Price Saving line. OFFER lines,
+    PRICE REDUCED lines and an Everyday Extra Discount can be switched on as well.
+
+    Parameters:
+    - item_count (int): Number of items on the receipt.
+    - seed (int): Seed for the random prices, so runs are repeatable.
+    - qty_every (int): Every nth item is a quantity item, 0 for none.
+    - member_saving_every (int): Every nth item is followed by a Member Price Saving line, 0 for none.
+    - offer_every (int): Every nth item is followed by a multi-buy OFFER line, 0 for none.
+    - price_reduced_every (int): Every nth item is preceded by a PRICE REDUCED line, 0 for none.
+    - everyday_extra (bool): If True, a 10% Everyday Extra Discount line ends the item section.
+
+    Returns:
+    - list: Lines of the receipt, including the header, SUBTOTAL and TOTAL lines.
+    """
+
+    def every(nth, item_num):
+        return nth and item_num % nth == nth - 1
+
+    rng = random.Random(seed)
+    lines = list(HEADER_LINES)
+    total_cents = 0
+
+    for item_num in range(item_count):
+        name = f"{PRODUCT_NAMES[item_num % len(PRODUCT_NAMES)]} {item_num}"
+        price_cents = rng.randint(50, 2500)
+
+        # Markdowns are flagged on the line above the item
+        if every(price_reduced_every, item_num):
+            lines.append("PRICE REDUCED")
+
+        # Quantity items put the name on its own line, ending in two spaces
+        if every(qty_every, item_num):
+            lines.append(name + "  ")
+            lines.append(format_line(f"Qty 2 @ ${price_cents / 200:.2f} each", f"{price_cents / 100:.2f}"))
+        else:
+            lines.append(format_line(name, f"{price_cents / 100:.2f}"))
+
+        total_cents += price_cents
+
+        # Member savings reduce the price of the item above them
+        if every(member_saving_every, item_num):
+            saving_cents = min(100, price_cents - 1)
+            lines.append(format_line("Member Price Saving", f"-{saving_cents / 100:.2f}"))
+            total_cents -= saving_cents
+            price_cents -= saving_cents
+
+        # Multi-buy offers also reduce the price of the item above them
+        if every(offer_every, item_num):
+            offer_cents = min(50, price_cents - 1)
+            lines.append(format_line("Multi-buy OFFER 2 for $5.00", f"-{offer_cents / 100:.2f}"))
+            total_cents -= offer_cents
+
+    # The Everyday Extra Discount takes 10% off the whole shop
+    if everyday_extra:
+        discount_cents = round(total_cents * 0.1)
+        lines.append(format_line("Everyday Extra Discount", f"-{discount_cents / 100:.2f}"))
+        total_cents -= discount_cents
+
+    lines.append(format_line("SUBTOTAL", f"{total_cents / 100:.2f}"))
+    lines.append(format_line("          TOTAL", f"${total_cents / 100:.2f}"))
+
+    return lines
+
+
+def write_receipt_pdf(file_location, item_count, lines_per_page=60, seed=0, pages=None, **line_options):
+    """
+    Writes a synthetic Woolworths-style eReceipt PDF.
+
+    Parameters:
+    - file_location (str): File location to write the PDF to.
+    - item_count (int): Number of items on the receipt.
+    - lines_per_page (int): Number of text lines written to each page.
+    - seed (int): Seed for the random prices, so runs are repeatable.
+    - pages (int): If set, the lines are spread over this many pages instead of `lines_per_page` to a page.
+    - line_options: Options passed on to `build_receipt_lines`, such as offer_every or everyday_extra.
+
+    Returns:
+    - int: Number of pages written.
+    """
+
+    lines = build_receipt_lines(item_count, seed, **line_options)
+
+    if pages:
+        lines_per_page = max(1, math.ceil(len(lines) / pages))
+    doc = fitz.open()
+
+    # A monospaced font keeps the runs of spaces between the columns intact
+    for start in range(0, len(lines), lines_per_page):
+        page = doc.new_page()
+        page.insert_text((30, 40), "\n".join(lines[start:start + lines_per_page]), fontname="cour", fontsize=8)
+
+    page_count = doc.page_count
+    doc.save(file_location)
+    doc.close()
+
+    return page_count
@@ -0,0 +1,35 @@
+import os
+import sys
+
+import pytest
+
+# The modules live at the top of the repository rather than in a package, so the tests import them from there
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+
+@pytest.fixture
+def write_receipt(tmp_path):
+    """
+    Writes synthetic Woolworths-style eReceipt PDFs into the test's temporary folder, skipping without PyMuPDF.
+
+    Returns:
+    - function: Called with (file name, item count, options for write_receipt_pdf), returns the file location.
+    """
+
+    pytest.importorskip("fitz")
+
+    benchmarks_dir = os.path.join(REPO_ROOT, "benchmarks")
+    if benchmarks_dir not in sys.path:
+        sys.path.insert(0, benchmarks_dir)
+
+    from synthetic_receipt import write_receipt_pdf
+
+    def write(file_name="receipt.pdf", item_count=12, **options):
+        file_location = str(tmp_path / file_name)
+        write_receipt_pdf(file_location, item_count, **options)
+        return file_location
+
+    return write
@@ -0,0 +1,117 @@
+import multiprocessing
+
+from AssignmentHistory import AssignmentHistory, normalize_item_name
+from ReceiptDividerRev2 import GroceryItem
+
+
+def read_receipt_numbers(history_file):
+    with open(history_file) as file:
+        return [int(line.split(",", 1)[0]) for line in file]
+
+
+def test_normalize_item_name():
+    assert normalize_item_name("Milk 3L  Qty 2 @ $3.10 each") == "MILK 3L"
+    assert normalize_item_name("  free   range eggs ") == "FREE RANGE EGGS"
+
+
+def test_recent_votes_outweigh_old_ones(tmp_path):
+    history = AssignmentHistory(str(tmp_path / "history.txt"), half_life=2)
+
+    for _ in range(3):
+        history.record_receipt([("Milk", "josh")])
+    for _ in range(4):
+        history.record_receipt([("Milk", "jess")])
+
+    assert history.predict_owner("milk") == "jess"
+    assert AssignmentHistory(str(tmp_path / "history.txt"), half_life=2).predict_owner("MILK") == "jess"
+
+
+def test_predict_owners_only_for_the_shoppers_splitting(tmp_path):
+    history = AssignmentHistory(str(tmp_path / "history.txt"))
+    history.record_receipt([("Milk", "josh"), ("Bread", "sam")])
+    receipt_items = {1: GroceryItem("Milk", 3.1), 2: GroceryItem("Bread", 4.5), 3: GroceryItem("Eggs", 6.0)}
+
+    assert history.predict_owners(receipt_items) == {1: "josh", 2: "sam"}
+    assert history.predict_owners(receipt_items, ["josh", "jess"]) == {1: "josh"}
+
+
+def test_sessions_recording_in_turn_get_consecutive_receipt_numbers(tmp_path):
+    history_file = str(tmp_path / "history.txt")
+    first_session = AssignmentHistory(history_file)
+    second_session = AssignmentHistory(history_file)
+
+    first_session.record_receipt([("Milk", "josh")])
+    second_session.record_receipt([("Milk", "jess"), ("Bread", "jess")])
+    first_session.record_receipt([("Eggs", "josh")])
+
+    assert read_receipt_numbers(history_file) == [1, 2, 2, 3]
+    assert first_session.get_receipt_count() == 3
+    assert first_session.predict_owner("Bread") == "jess"
+
+
+def test_compaction_by_another_session_is_picked_up(tmp_path):
+    history_file = str(tmp_path / "history.txt")
+    first_session = AssignmentHistory(history_file)
+    second_session = AssignmentHistory(history_file)
+
+    first_session.record_receipt([("Milk", "josh")])
+    second_session.record_receipt([("Milk", "josh")])
+    second_session.compact()
+    first_session.record_receipt([("Bread", "jess")])
+
+    assert read_receipt_numbers(history_file)[-1] == 3
+    assert AssignmentHistory(history_file).predict_owners({1: GroceryItem("Milk", 1.0), 2: GroceryItem("Bread", 1.0)}) \
+        == {1: "josh", 2: "jess"}
+
+
+def test_torn_line_is_skipped_then_cut_off(tmp_path):
+    history_file = str(tmp_path / "history.txt")
+    AssignmentHistory(history_file).record_receipt([("Milk", "josh")])
+
+    with open(history_file, "a") as file:
+        file.write("2,jess,1,MI")
+
+    history = AssignmentHistory(history_file)
+    assert history.get_receipt_count() == 1
+
+    history.record_receipt([("Bread", "jess")])
+    with open(history_file) as file:
+        assert file.read() == "1,josh,1,MILK\n2,jess,1,BREAD\n"
+
+
+def test_corrupt_line_is_skipped_and_reported(tmp_path, capsys):
+    history_file = tmp_path / "history.txt"
+    history_file.write_text("1,josh,1.0,MILK\ngarbage line\n2,jess,x,BREAD\n")
+
+    history = AssignmentHistory(str(history_file))
+
+    assert history.predict_owner("Milk") == "josh"
+    assert history.predict_owner("Bread") is None
+    assert "CORRUPT_HISTORY_DATA" in capsys.readouterr().err
+
+    # The lines after the bad ones are still numbered and read
+    history.record_receipt([("Bread", "jess")])
+    assert AssignmentHistory(str(history_file)).predict_owner("Bread") == "jess"
+
+
+def record_receipts(history_file, shopper_name, receipt_count):
+    history = AssignmentHistory(history_file)
+
+    for _ in range(receipt_count):
+        history.record_receipt([("Milk", shopper_name), ("Bread", shopper_name)])
+
+
+def test_concurrent_processes_never_share_a_receipt_number(tmp_path):
+    history_file = str(tmp_path / "history.txt")
+    processes = [multiprocessing.Process(target=record_receipts, args=(history_file, f"shopper{worker_num}", 25))
+                 for worker_num in range(4)]
+
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+        assert process.exitcode == 0
+
+    receipt_numbers = read_receipt_numbers(history_file)
+    assert sorted(set(receipt_numbers)) == list(range(1, 101))
+    assert all(receipt_numbers.count(receipt_num) == 2 for receipt_num in range(1, 101))
@@ -0,0 +1,75 @@
+import pytest
+
+from AssignmentSpec import AssignmentSpec, COMBINED
+from ReceiptDividerRev2 import GroceryItem
+
+
+def build_items(*names):
+    """Returns receipt items keyed by item number from 1, as Receipt.get_receipt_items does."""
+
+    return {item_num: GroceryItem(name, 1.0) for item_num, name in enumerate(names, 1)}
+
+
+def test_item_number_beats_patterns_and_default():
+    spec = AssignmentSpec("josh", ["josh", "jess"], items={"1": "josh"}, patterns={"*milk*": "jess"},
+                          default="jess")
+
+    assert spec.resolve(build_items("Full Cream Milk 3L"))[1] == "josh"
+
+
+def test_first_matching_pattern_wins():
+    spec = AssignmentSpec("josh", ["josh", "jess"], patterns=[("*milk*", "jess"), ("*cream*", "josh")])
+    assignments = spec.resolve(build_items("Full Cream Milk 3L", "Ice Cream", "Bread"))
+
+    assert assignments == {1: "jess", 2: "josh"}
+
+
+def test_patterns_match_case_insensitively():
+    spec = AssignmentSpec("josh", ["josh", "jess"], patterns={"*MILK*": "jess"})
+
+    assert spec.resolve(build_items("full cream milk")) == {1: "jess"}
+
+
+def test_unmatched_items_go_to_the_default():
+    spec = AssignmentSpec("josh", ["josh", "jess"], patterns={"*milk*": "jess"}, default="josh")
+
+    assert spec.resolve(build_items("Milk", "Bread")) == {1: "jess", 2: "josh"}
+
+
+def test_combined_items_are_left_out():
+    spec = AssignmentSpec("josh", ["josh", "jess"], items={"2": "Combined"}, default="jess")
+
+    assert spec.resolve(build_items("Milk", "Bread")) == {1: "jess"}
+    assert spec.get_default() == "jess"
+    assert AssignmentSpec("josh", ["josh"]).get_default() == COMBINED
+
+
+def test_weighted_owner():
+    spec = AssignmentSpec("josh", ["josh", "jess"], items={"1": {"Josh": 2, "jess": 1}})
+
+    assert spec.resolve(build_items("Milk")) == {1: {"josh": 2.0, "jess": 1.0}}
+
+
+def test_names_are_normalised():
+    spec = AssignmentSpec.from_dict({"paid": " Josh ", "shoppers": ["JOSH", "Jess"], "items": {"1": "JESS"}})
+
+    assert spec.get_paid() == "josh"
+    assert spec.resolve(build_items("Milk")) == {1: "jess"}
+
+
+@pytest.mark.parametrize("spec", [
+    {"paid": "sam", "shoppers": ["josh", "jess"]},
+    {"paid": "josh", "shoppers": ["josh", "jess"], "items": {"1": "sam"}},
+    {"paid": "josh", "shoppers": ["josh", "jess"], "items": {"1": {"josh": -1, "jess": 2}}},
+    {"paid": "josh", "shoppers": ["josh", "jess"], "default": {"josh": 0}},
+])
+def test_invalid_specs_are_rejected(spec):
+    with pytest.raises(ValueError):
+        AssignmentSpec.from_dict(spec)
+
+
+def test_unknown_item_number_is_rejected():
+    spec = AssignmentSpec("josh", ["josh", "jess"], items={"9": "josh"})
+
+    with pytest.raises(ValueError):
+        spec.resolve(build_items("Milk"))
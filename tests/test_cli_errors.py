@@ -0,0 +1,70 @@
+"""
+Receipts and assignment files the command line cannot use are reported on stderr with exit code 2, never a traceback.
+"""
+
+import os
+import sys
+import json
+import subprocess
+
+import pytest
+
+from conftest import REPO_ROOT
+
+SPEC = {"paid": "josh", "shoppers": ["josh", "jess"], "items": {"1": "jess"}}
+
+
+def run_cli(cwd, *args):
+    return subprocess.run([sys.executable, os.path.join(REPO_ROOT, "ReceiptDividerCLI.py")] + list(args),
+                          cwd=cwd, capture_output=True, text=True)
+
+
+def write_spec(tmp_path, spec=SPEC):
+    spec_file = tmp_path / "spec.json"
+    spec_file.write_text(json.dumps(spec))
+
+    return str(spec_file)
+
+
+def assert_reported(completed, error_name):
+    assert completed.returncode == 2
+    assert completed.stdout == ""
+    assert completed.stderr.startswith(f"{error_name}:")
+    assert "Traceback" not in completed.stderr
+
+
+def write_not_a_pdf(tmp_path):
+    file_location = tmp_path / "notes.pdf"
+    file_location.write_text("not a receipt")
+
+    return str(file_location)
+
+
+@pytest.mark.parametrize("extra_args", [[], ["--no-cache"]])
+def test_parse_reports_a_missing_file(tmp_path, extra_args):
+    assert_reported(run_cli(tmp_path, "parse", str(tmp_path / "missing.pdf"), *extra_args), "RECEIPT_FILE_ERROR")
+
+
+def test_parse_reports_a_file_that_is_not_a_pdf(tmp_path):
+    pytest.importorskip("fitz")
+
+    assert_reported(run_cli(tmp_path, "parse", write_not_a_pdf(tmp_path), "--no-cache"), "RECEIPT_FILE_ERROR")
+
+
+def test_divide_reports_a_missing_file(tmp_path):
+    assert_reported(run_cli(tmp_path, "divide", str(tmp_path / "missing.pdf"), write_spec(tmp_path), "--json"),
+                    "RECEIPT_FILE_ERROR")
+
+
+def test_divide_reports_a_file_that_is_not_a_pdf(tmp_path):
+    pytest.importorskip("fitz")
+
+    assert_reported(run_cli(tmp_path, "divide", write_not_a_pdf(tmp_path), write_spec(tmp_path), "--json"),
+                    "RECEIPT_FILE_ERROR")
+
+
+def test_divide_reports_an_invalid_assignment_on_stderr(tmp_path, write_receipt):
+    receipt = write_receipt("receipt.pdf", 4)
+
+    assert_reported(run_cli(tmp_path, "divide", receipt, write_spec(tmp_path, dict(SPEC, items={"99": "jess"})),
+                            "--json"), "ASSIGNMENT_ERROR")
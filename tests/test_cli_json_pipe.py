@@ -0,0 +1,81 @@
+"""
+The --json output of divide and bulk piped into settle, run as separate processes the way the README shows.
+"""
+
+import os
+import sys
+import json
+import subprocess
+
+from conftest import REPO_ROOT
+
+SPEC = {"paid": "josh", "shoppers": ["josh", "jess"], "items": {"1": "jess", "2": "josh"}}
+
+
+def run_cli(cwd, *args, stdin=None):
+    return subprocess.run([sys.executable, os.path.join(REPO_ROOT, "ReceiptDividerCLI.py")] + list(args),
+                          cwd=cwd, input=stdin, capture_output=True, text=True)
+
+
+def write_spec(tmp_path, spec):
+    spec_file = tmp_path / f"{spec['paid']}.json"
+    spec_file.write_text(json.dumps(spec))
+
+    return str(spec_file)
+
+
+def test_divide_json_pipes_into_settle(tmp_path, write_receipt):
+    # An Everyday Extra Discount receipt, whose parse used to print a notice into the JSON
+    receipt = write_receipt("discounted.pdf", 12, everyday_extra=True)
+    divided = run_cli(tmp_path, "divide", receipt, write_spec(tmp_path, SPEC), "--json")
+
+    assert divided.returncode == 0, divided.stderr
+    owings = json.loads(divided.stdout)
+    assert owings["payer"] == "josh" and list(owings["owings"]) == ["jess"]
+
+    settled = run_cli(tmp_path, "settle", "-", "--json", stdin=divided.stdout)
+
+    assert settled.returncode == 0, settled.stderr
+    assert json.loads(settled.stdout) == [{"from": "jess", "to": "josh", "amount": owings["owings"]["jess"]}]
+
+
+def test_bulk_json_pipes_into_settle(tmp_path, write_receipt):
+    receipt_dir = tmp_path / "receipts"
+    receipt_dir.mkdir()
+    for seed in range(3):
+        write_receipt(os.path.join("receipts", f"r{seed}.pdf"), 10, seed=seed, everyday_extra=seed == 1)
+
+    josh_paid = run_cli(tmp_path, "bulk", write_spec(tmp_path, SPEC), str(receipt_dir), "--json", "--workers", "2")
+    jess_paid = run_cli(tmp_path, "bulk", write_spec(tmp_path, dict(SPEC, paid="jess")), str(receipt_dir), "--json",
+                        "--workers", "2")
+
+    assert josh_paid.returncode == 0, josh_paid.stderr
+    assert jess_paid.returncode == 0, jess_paid.stderr
+    assert len(josh_paid.stdout.splitlines()) == 3
+
+    owings_file = tmp_path / "owings.jsonl"
+    owings_file.write_text(josh_paid.stdout + jess_paid.stdout)
+    settled = run_cli(tmp_path, "settle", str(owings_file), "--json")
+
+    assert settled.returncode == 0, settled.stderr
+
+    # Each shopper paid for the same receipts the other took, less what they took themselves
+    net_cents = sum(round(json.loads(line)["owings"]["jess"] * 100) for line in josh_paid.stdout.splitlines()) - \
+                sum(round(json.loads(line)["owings"]["josh"] * 100) for line in jess_paid.stdout.splitlines())
+    expected = [] if net_cents == 0 else [{"from": "jess", "to": "josh", "amount": net_cents / 100}] if net_cents > 0 \
+        else [{"from": "josh", "to": "jess", "amount": -net_cents / 100}]
+    assert json.loads(settled.stdout) == expected
+
+
+def test_settle_skips_lines_that_are_not_owings(tmp_path):
+    owings_file = tmp_path / "owings.jsonl"
+    owings_file.write_text('{"payer": "josh", "owings": {"jess": 10.35}}\n'
+                           'Discount found!\n'
+                           '{"payer": "josh"}\n'
+                           '{"payer": "jess", "owings": {"josh": 4}}\n')
+
+    settled = run_cli(tmp_path, "settle", str(owings_file), "--json")
+
+    assert settled.returncode == 2
+    assert "Line 2" in settled.stderr and "Line 3" in settled.stderr
+    assert json.loads(settled.stdout) == [{"from": "jess", "to": "josh", "amount": 6.35}]
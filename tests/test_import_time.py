@@ -0,0 +1,34 @@
+"""
+Start-up import budget of the headless command line, the same check as benchmarks/check_import_time.py.
+"""
+
+import os
+import importlib.util
+
+import pytest
+
+from conftest import REPO_ROOT
+
+# Load the check from the benchmarks folder, which is not a package
+spec = importlib.util.spec_from_file_location("check_import_time",
+                                              os.path.join(REPO_ROOT, "benchmarks", "check_import_time.py"))
+check_import_time = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(check_import_time)
+
+# Best of a few fresh interpreters, so one slow start on a busy machine does not fail the budget
+RUNS = 3
+
+
+@pytest.mark.parametrize("module_name", check_import_time.CHECKED_MODULES)
+def test_no_heavy_imports_at_start_up(module_name):
+    import_times = check_import_time.measure_imports(module_name)
+    heavy_imports = sorted(name for name in import_times if name.split(".")[0] in check_import_time.HEAVY_MODULES)
+
+    assert heavy_imports == []
+
+
+@pytest.mark.parametrize("module_name", check_import_time.CHECKED_MODULES)
+def test_import_time_within_budget(module_name):
+    import_ms = min(check_import_time.measure_imports(module_name)[module_name] for _ in range(RUNS)) / 1000
+
+    assert import_ms <= check_import_time.DEFAULT_BUDGET_MS
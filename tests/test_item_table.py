@@ -0,0 +1,43 @@
+from ItemTable import ItemTable
+
+
+def build_table():
+    item_table = ItemTable()
+    first_items = item_table.add_receipt([["Milk", 3.1], ["Bread", 4.5, 5.0, [["member_saving", -0.5]]]])
+    second_items = item_table.add_receipt([["Eggs", 6.0], ["Milk", 3.1], ["Apples", 2.25]])
+
+    return item_table, first_items, second_items
+
+
+def test_id_num_is_the_item_number_within_its_receipt():
+    _, first_items, second_items = build_table()
+
+    assert [first_items[item_num].get_id_num() for item_num in first_items] == [1, 2]
+    assert [second_items[item_num].get_id_num() for item_num in second_items] == [1, 2, 3]
+
+
+def test_row_is_unique_across_receipts():
+    item_table, first_items, second_items = build_table()
+    rows = [items[item_num].get_row() for items in (first_items, second_items) for item_num in items]
+
+    assert rows == list(range(len(item_table)))
+
+
+def test_views_of_the_same_row_are_equal():
+    item_table, first_items, second_items = build_table()
+
+    assert first_items[1] == item_table.view(0)
+    assert len({first_items[1], item_table.view(0)}) == 1
+    assert first_items[1] != second_items[2]
+
+
+def test_totals_and_discounts():
+    item_table, first_items, second_items = build_table()
+
+    assert first_items.total_cents() == 760
+    assert second_items.total_cents() == 1135
+    assert item_table.total_cents() == 1895
+    assert first_items[2].to_item_data() == ["Bread", 4.5, 5.0, [["member_saving", -0.5]]]
+
+    second_items[3].apply_adjustment("member_saving", -0.25)
+    assert second_items[3].get_price_cents() == 200
@@ -0,0 +1,58 @@
+import pytest
+
+from Money import to_cents, format_cents, scale_cents, allocate_cents, split_cents
+
+
+def test_to_cents_rounds_float_noise():
+    assert to_cents(0.1 + 0.2) == 30
+    assert to_cents("$4.50") == 450
+    assert to_cents(-4.5) == -450
+
+
+def test_format_cents():
+    assert format_cents(450) == "$4.50"
+    assert format_cents(-100) == "-$1.00"
+    assert format_cents(7) == "$0.07"
+
+
+def test_split_cents_even():
+    assert split_cents(900, 3) == [300, 300, 300]
+
+
+def test_split_cents_gives_leftover_cents_to_earlier_shares():
+    assert split_cents(100, 3) == [34, 33, 33]
+    assert split_cents(101, 3) == [34, 34, 33]
+    assert split_cents(2, 3) == [1, 1, 0]
+
+
+def test_split_cents_negative_mirrors_positive():
+    assert split_cents(-100, 3) == [-34, -33, -33]
+
+
+@pytest.mark.parametrize("total_cents", [0, 1, 99, 100, 12345, -777])
+@pytest.mark.parametrize("share_count", [1, 2, 3, 7])
+def test_split_cents_adds_up_and_differs_by_at_most_one_cent(total_cents, share_count):
+    shares = split_cents(total_cents, share_count)
+
+    assert sum(shares) == total_cents
+    assert len(shares) == share_count
+    assert max(shares) - min(shares) <= 1
+
+
+def test_allocate_cents_largest_remainder():
+    # 100 split 2:1 is 66.67 and 33.33, the leftover cent goes to the larger remainder
+    assert allocate_cents(100, [2, 1]) == [67, 33]
+    assert allocate_cents(10, [1, 0, 1]) == [5, 0, 5]
+
+
+def test_allocate_cents_rejects_no_shares():
+    with pytest.raises(ValueError):
+        allocate_cents(100, [])
+    with pytest.raises(ValueError):
+        allocate_cents(100, [0, 0])
+
+
+def test_scale_cents_rounds_half_away_from_zero():
+    assert scale_cents(5, 1, 2) == 3
+    assert scale_cents(-5, 1, 2) == -3
+    assert scale_cents(1000, 9, 10) == 900
@@ -0,0 +1,71 @@
+import pytest
+
+from ParseCache import ParseCache
+from PipelineStats import PipelineStats
+from ReceiptDividerRev2 import PDFReader, PARSER_VERSION
+
+DIGEST = "ab" * 32
+ITEMS = [["Milk", 3.1], ["Bread", 4.5, 5.0, [["member_saving", -0.5]]]]
+
+
+def test_put_then_get(tmp_path):
+    parse_cache = ParseCache(str(tmp_path), parser_version=3)
+    parse_cache.put(DIGEST, ITEMS, 7.6, 0.0)
+
+    assert parse_cache.get(DIGEST) == (ITEMS, 7.6, 0.0)
+
+
+def test_miss_for_unknown_digest(tmp_path):
+    assert ParseCache(str(tmp_path)).get(DIGEST) is None
+
+
+def test_new_parser_version_ignores_old_entries(tmp_path):
+    ParseCache(str(tmp_path), parser_version=3).put(DIGEST, ITEMS, 7.6, 0.0)
+
+    assert ParseCache(str(tmp_path), parser_version=4).get(DIGEST) is None
+    assert ParseCache(str(tmp_path), parser_version=3).get(DIGEST) == (ITEMS, 7.6, 0.0)
+
+
+@pytest.mark.parametrize("entry", ["{not json", '{"x": 1}', "[1, 2, 3]"])
+def test_corrupt_entry_is_a_miss_and_removed(tmp_path, entry):
+    parse_cache = ParseCache(str(tmp_path), parser_version=3)
+    parse_cache.put(DIGEST, ITEMS, 7.6, 0.0)
+    entry_path = tmp_path / f"{DIGEST}-v3.json"
+    entry_path.write_text(entry)
+
+    assert parse_cache.get(DIGEST) is None
+    assert not entry_path.exists()
+
+
+def test_eviction_keeps_cache_under_cap(tmp_path):
+    parse_cache = ParseCache(str(tmp_path), max_bytes=300, parser_version=3)
+
+    for digest_num in range(10):
+        parse_cache.put(f"{digest_num:064x}", ITEMS, 7.6, 0.0)
+
+    assert sum(entry.stat().st_size for entry in tmp_path.iterdir()) <= 300
+    assert parse_cache.get(f"{9:064x}") is not None
+
+
+def read_with_stats(file_location, parse_cache):
+    stats = PipelineStats()
+    scanner = PDFReader(file_location, parse_cache=parse_cache, stats=stats)
+    scanner.read_file()
+    scanner.set_digi_receipt()
+
+    return scanner.get_digi_receipt(), stats.get_counters()
+
+
+def test_reader_reparses_after_parser_version_bump(tmp_path, write_receipt):
+    file_location = write_receipt(item_count=20)
+    cache_dir = str(tmp_path / "cache")
+
+    first_receipt, counters = read_with_stats(file_location, ParseCache(cache_dir, parser_version=PARSER_VERSION))
+    assert counters.get("cache_misses") == 1
+
+    cached_receipt, counters = read_with_stats(file_location, ParseCache(cache_dir, parser_version=PARSER_VERSION))
+    assert counters.get("cache_hits") == 1
+    assert str(cached_receipt) == str(first_receipt)
+
+    _, counters = read_with_stats(file_location, ParseCache(cache_dir, parser_version=PARSER_VERSION + 1))
+    assert counters.get("cache_misses") == 1 and not counters.get("cache_hits")
@@ -0,0 +1,76 @@
+from ReceiptDividerRev2 import ReceiptDivider, Shopper
+from AssignmentSpec import AssignmentSpec
+
+
+def build_divider(tmp_path, monkeypatch, receipt_file):
+    """Returns a divider of the receipt between josh and jess, keeping its history and storage out of the repo."""
+
+    monkeypatch.chdir(tmp_path)
+    receipt_divider = ReceiptDivider()
+
+    for shopper_name in ("josh", "jess"):
+        receipt_divider.add_registered_shopper(Shopper(shopper_name))
+        receipt_divider.add_shopper_to_receipt(receipt_divider.get_registered_shoppers()[shopper_name])
+
+    receipt_divider.scan_receipt(receipt_file)
+
+    return receipt_divider
+
+
+def test_compute_owings_clears_the_last_payer():
+    josh, jess = Shopper("josh"), Shopper("jess")
+    josh.set_cart_total(4.0)
+    jess.set_cart_total(6.0)
+
+    # josh paid for the last receipt
+    josh.set_paid(True)
+    owings = ReceiptDivider().compute_owings({"a": josh, "s": jess}, "s")
+
+    assert owings == {"payer": "jess", "owings": {"josh": 4.0}}
+    assert not josh.get_paid() and jess.get_paid()
+
+
+def test_divide_by_spec_with_a_different_payer_each_receipt(tmp_path, monkeypatch, write_receipt):
+    receipt_divider = build_divider(tmp_path, monkeypatch, write_receipt("first.pdf", 8))
+    spec = {"shoppers": ["josh", "jess"], "items": {"1": "josh"}}
+
+    first = receipt_divider.divide_receipt_by_spec(AssignmentSpec.from_dict(dict(spec, paid="josh")))
+    receipt_divider.scan_receipt(write_receipt("second.pdf", 8, seed=1))
+    second = receipt_divider.divide_receipt_by_spec(AssignmentSpec.from_dict(dict(spec, paid="jess")))
+
+    assert first["payer"] == "josh" and list(first["owings"]) == ["jess"]
+    assert second["payer"] == "jess" and list(second["owings"]) == ["josh"]
+
+
+def test_divide_receipt_stores_the_payer_picked(tmp_path, monkeypatch, write_receipt):
+    receipt_divider = build_divider(tmp_path, monkeypatch, write_receipt("first.pdf", 8))
+    stored_payers = []
+    monkeypatch.setattr(receipt_divider, "store_receipt", stored_payers.append)
+
+    for receipt_num, payer in enumerate(("josh", "jess")):
+        if receipt_num:
+            receipt_divider.scan_receipt(write_receipt("second.pdf", 8, seed=1))
+
+        # As the menu does, start a combined cart before dividing
+        receipt_divider.create_new_shopper(True)
+
+        # Submit the receipt as it is, pick the payer and skip the spending trackers
+        shopper_keys = {shopper.get_name(): key for key, shopper in receipt_divider.build_shopper_dict().items()}
+        answers = iter(["v", shopper_keys[payer], "n"])
+        monkeypatch.setattr("builtins.input", lambda prompt="": next(answers))
+
+        receipt_divider.divide_receipt()
+
+    assert stored_payers == ["josh", "jess"]
+
+
+def test_corrupt_rules_are_reported_on_stderr(tmp_path, capsys):
+    rules_file = tmp_path / "rules.txt"
+    rules_file.write_text("not a rule\n")
+
+    receipt_divider = ReceiptDivider()
+    receipt_divider.retreive_assignment_rules(str(rules_file))
+
+    captured = capsys.readouterr()
+    assert receipt_divider.get_assignment_rules() is None
+    assert captured.out == "" and captured.err.startswith("CORRUPT_RULES_DATA:")
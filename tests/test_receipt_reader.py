@@ -0,0 +1,17 @@
+from ParseCache import ParseCache
+from PipelineStats import PipelineStats
+from ReceiptDividerRev2 import PARSER_VERSION
+from ReceiptReader import grab_items_and_price
+
+
+def test_second_load_is_read_from_the_parse_cache(tmp_path, write_receipt):
+    receipt = write_receipt("receipt.pdf", 12)
+    parse_cache = ParseCache(str(tmp_path / "cache"), parser_version=PARSER_VERSION)
+
+    first_stats, second_stats = PipelineStats(), PipelineStats()
+    first = grab_items_and_price(receipt, stats=first_stats, parse_cache=parse_cache)
+    second = grab_items_and_price(receipt, stats=second_stats, parse_cache=parse_cache)
+
+    assert first == second and len(first[0]) == 12
+    assert not first_stats.get_counters().get("cache_hits")
+    assert second_stats.get_counters().get("cache_hits") == 1
@@ -0,0 +1,112 @@
+"""
+The ReceiptService started on a free port and driven over HTTP, as a script or phone on the LAN would.
+"""
+
+import json
+import asyncio
+
+from ParseCache import ParseCache
+from ReceiptDividerRev2 import PARSER_VERSION
+from ReceiptService import ReceiptService
+
+ASSIGNMENT = {"paid": "josh", "shoppers": ["josh", "jess"], "items": {"1": "jess"}}
+
+
+async def send_request(address, method, path, body=b"", content_type="application/json"):
+    """Sends one request on its own connection, returning (status, headers, decoded JSON body)."""
+
+    reader, writer = await asyncio.open_connection(*address)
+    writer.write(f"{method} {path} HTTP/1.1\r\nHost: localhost\r\nContent-Type: {content_type}\r\n"
+                 f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode("latin-1") + body)
+    await writer.drain()
+
+    status = int((await reader.readline()).split()[1])
+    headers = {}
+    while (line := await reader.readline()) not in (b"\r\n", b""):
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+
+    payload = json.loads(await reader.readexactly(int(headers["content-length"])))
+    writer.close()
+
+    return status, headers, payload
+
+
+def run_service(tmp_path, scenario, **options):
+    """Starts a service on a free port with a fresh parse cache, runs a scenario against it and closes it."""
+
+    async def run():
+        receipt_service = ReceiptService(port=0, shoppers_file=str(tmp_path / "shoppers.txt"),
+                                         parse_cache=ParseCache(str(tmp_path / "cache"),
+                                                                parser_version=PARSER_VERSION), **options)
+        await receipt_service.start()
+        try:
+            return await scenario(receipt_service.get_address())
+        finally:
+            await receipt_service.close()
+
+    return asyncio.run(asyncio.wait_for(run(), timeout=60))
+
+
+def read_bytes(file_location):
+    with open(file_location, "rb") as file:
+        return file.read()
+
+
+def test_health(tmp_path):
+    status, _, payload = run_service(tmp_path, lambda address: send_request(address, "GET", "/health"),
+                                     max_workers=1)
+
+    assert status == 200
+    assert payload["status"] == "ok" and payload["workers"] == 1
+
+
+def test_parse_then_divide_and_save(tmp_path, monkeypatch, write_receipt):
+    # The assignment history of a saved divide is kept in the working folder
+    monkeypatch.chdir(tmp_path)
+    pdf_bytes = read_bytes(write_receipt("receipt.pdf", 6))
+
+    async def scenario(address):
+        parsed = await send_request(address, "POST", "/parse", pdf_bytes, "application/pdf")
+        body = json.dumps({"receipt": parsed[2]["receipt"], "assignment": ASSIGNMENT, "save": True}).encode()
+        divided = await send_request(address, "POST", "/divide", body)
+        shoppers = await send_request(address, "GET", "/shoppers")
+
+        return parsed, divided, shoppers
+
+    parsed, divided, shoppers = run_service(tmp_path, scenario, max_workers=1)
+
+    assert parsed[0] == 200 and len(parsed[2]["items"]) == 6
+    assert divided[0] == 200
+    assert divided[2]["payer"] == "josh" and list(divided[2]["owings"]) == ["jess"]
+    assert shoppers[0] == 200 and set(shoppers[2]["shoppers"]) == {"josh", "jess"}
+
+
+def test_client_errors(tmp_path):
+    async def scenario(address):
+        return [await send_request(address, "POST", "/settle", b'{"owings": 5}'),
+                await send_request(address, "POST", "/settle", b"[1, 2]"),
+                await send_request(address, "POST", "/parse", b"not a pdf", "application/pdf"),
+                await send_request(address, "POST", "/divide", json.dumps({"receipt": "ab" * 32,
+                                                                           "assignment": ASSIGNMENT}).encode()),
+                await send_request(address, "GET", "/nowhere"),
+                await send_request(address, "GET", "/settle")]
+
+    statuses = [status for status, _, _ in run_service(tmp_path, scenario, max_workers=1)]
+
+    assert statuses == [400, 400, 400, 404, 404, 405]
+
+
+def test_busy_service_answers_503(tmp_path, write_receipt):
+    # One worker and no queue, so uploads arriving while a parse runs are turned away
+    uploads = [read_bytes(write_receipt(f"receipt_{seed}.pdf", 40, seed=seed)) for seed in range(4)]
+
+    async def scenario(address):
+        return await asyncio.gather(*(send_request(address, "POST", "/parse", pdf_bytes, "application/pdf")
+                                      for pdf_bytes in uploads))
+
+    answers = run_service(tmp_path, scenario, max_workers=1, max_queued=0)
+    statuses = sorted(status for status, _, _ in answers)
+
+    assert statuses[0] == 200 and statuses[-1] == 503
+    assert all(headers["retry-after"] == "1" for status, headers, _ in answers if status == 503)
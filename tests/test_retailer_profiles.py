@@ -0,0 +1,75 @@
+import os
+import sys
+import subprocess
+
+import pytest
+
+from conftest import REPO_ROOT
+from RetailerProfiles import DETECTION_LINES, WOOLWORTHS, UnsupportedReceiptError, detect_profile, get_profile
+from ReceiptDividerRev2 import PDFReader
+
+# Header of the sample eReceipt layout the parser and the synthetic receipts are built on
+WOOLWORTHS_HEADER = ["Woolworths Mawson Lakes",
+                     "ABN 88 000 014 675",
+                     "Tax Invoice",
+                     "Description                                    Price"]
+
+
+def test_sample_header_is_woolworths():
+    assert detect_profile(WOOLWORTHS_HEADER + ["Bananas Cavendish      3.50"]) is WOOLWORTHS
+
+
+def test_detected_in_any_case():
+    assert detect_profile(["WOOLWORTHS METRO", "Tax Invoice"]) is WOOLWORTHS
+
+
+@pytest.mark.parametrize("abn_line", ["ABN 88 000 014 675", "ABN: 88 000 014 675", "ABN 88000014675"])
+def test_detected_from_the_abn_when_the_store_name_is_an_image(abn_line):
+    assert detect_profile(["", abn_line, "Tax Invoice"]) is WOOLWORTHS
+
+
+def test_other_retailers_are_rejected():
+    with pytest.raises(UnsupportedReceiptError):
+        detect_profile(["Coles Supermarkets", "ABN 45 004 189 708", "Tax Invoice"])
+
+
+def test_only_the_first_lines_are_looked_at():
+    with pytest.raises(UnsupportedReceiptError):
+        detect_profile(["Some Shop"] * DETECTION_LINES + ["Woolworths gift card"])
+
+
+def test_unknown_profile_name_is_rejected():
+    with pytest.raises(UnsupportedReceiptError):
+        get_profile("aldi")
+
+
+def test_synthetic_receipt_is_detected(write_receipt):
+    scanner = PDFReader(write_receipt(item_count=5))
+    scanner.read_file()
+
+    assert scanner.get_profile() is WOOLWORTHS
+    assert len(scanner.get_prepped_item_data()) == 5
+
+
+def write_unsupported_receipt(file_location):
+    import pymupdf
+
+    doc = pymupdf.open()
+    doc.new_page().insert_text((30, 40), "Corner Store\nInvoice\nBread        4.00\nTOTAL        $4.00",
+                                fontname="cour", fontsize=8)
+    doc.save(file_location)
+    doc.close()
+
+
+@pytest.mark.parametrize("extra_args", [[], ["--profile", "aldi"]])
+def test_parse_command_reports_unsupported_receipts(tmp_path, write_receipt, extra_args):
+    file_location = str(tmp_path / "corner_store.pdf")
+    write_unsupported_receipt(file_location)
+
+    parsed = subprocess.run([sys.executable, os.path.join(REPO_ROOT, "ReceiptDividerCLI.py"), "parse", file_location,
+                             "--no-cache"] + extra_args, cwd=tmp_path, capture_output=True, text=True)
+
+    assert parsed.returncode == 2
+    assert parsed.stdout == ""
+    assert parsed.stderr.startswith("UNSUPPORTED_RECEIPT_ERROR:")
+    assert "Traceback" not in parsed.stderr
@@ -0,0 +1,60 @@
+import random
+
+import pytest
+
+from Settlement import SettlementLedger, settle_balances
+
+
+def apply_transfers(balances, transfers):
+    """Returns the balances left after every transfer is paid."""
+
+    balances = dict(balances)
+    for debtor, creditor, cents in transfers:
+        assert cents > 0
+        balances[debtor] += cents
+        balances[creditor] -= cents
+
+    return balances
+
+
+def test_exact_matches_are_paired():
+    transfers = settle_balances({"josh": 500, "jess": -500, "sam": 300, "alex": -300})
+
+    assert sorted(transfers) == [("alex", "sam", 300), ("jess", "josh", 500)]
+
+
+def test_unbalanced_balances_are_rejected():
+    with pytest.raises(ValueError):
+        settle_balances({"josh": 500, "jess": -499})
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_settle_is_zero_sum_and_short(seed):
+    rng = random.Random(seed)
+    names = [f"shopper{shopper_num}" for shopper_num in range(rng.randint(2, 12))]
+    settlement_ledger = SettlementLedger()
+
+    for _ in range(rng.randint(1, 40)):
+        payer = rng.choice(names)
+        settlement_ledger.add_receipt(payer, {name: rng.randint(0, 5000) for name in rng.sample(names, 2)})
+
+    balances = settlement_ledger.get_balances()
+    assert sum(balances.values()) == 0
+
+    transfers = settlement_ledger.settle()
+    assert all(balance == 0 for balance in apply_transfers(balances, transfers).values())
+    assert len(transfers) <= max(len(balances) - 1, 0)
+
+
+def test_ledger_from_owings_and_transfers():
+    settlement_ledger = SettlementLedger()
+    settlement_ledger.add_owings({"payer": "josh", "owings": {"jess": 10.35}})
+    settlement_ledger.add_owings({"payer": "jess", "owings": {"josh": 4.0}})
+
+    assert settlement_ledger.get_balances() == {"josh": 635, "jess": -635}
+    assert settlement_ledger.settle() == [("jess", "josh", 635)]
+
+    settlement_ledger.add_transfer("jess", "josh", 635)
+    assert settlement_ledger.get_balances() == {}
+    assert settlement_ledger.settle() == []
+    assert settlement_ledger.get_receipt_count() == 2
@@ -0,0 +1,125 @@
+import os
+import stat
+
+import pytest
+
+from ShopperJournal import ShopperJournal
+
+
+@pytest.fixture
+def snapshot_file(tmp_path):
+    snapshot_file = tmp_path / "shoppers.txt"
+    snapshot_file.write_text("josh,10.0\njess,2.5\n")
+
+    return str(snapshot_file)
+
+
+def test_load_replays_journal_on_snapshot(snapshot_file):
+    journal = ShopperJournal(snapshot_file)
+    journal.record({"josh": 150, "sam": 0})
+    journal.record({"jess": -50})
+
+    assert ShopperJournal(snapshot_file).load() == {"josh": 1150, "jess": 200, "sam": 0}
+
+
+def test_torn_last_line_is_skipped_then_cut_off(snapshot_file):
+    journal = ShopperJournal(snapshot_file)
+    journal.record({"josh": 100})
+
+    # A crash part way through an append leaves a line without its newline
+    with open(f"{snapshot_file}.journal", "a") as file:
+        file.write("jess,99")
+
+    assert ShopperJournal(snapshot_file).load() == {"josh": 1100, "jess": 250}
+
+    # The next save cuts the torn line off before appending, so it is never half counted
+    ShopperJournal(snapshot_file).record({"jess": 1})
+
+    with open(f"{snapshot_file}.journal") as file:
+        assert file.read() == "josh,100\njess,1\n"
+    assert ShopperJournal(snapshot_file).load() == {"josh": 1100, "jess": 251}
+
+
+@pytest.mark.parametrize("journal, repaired", [("josh,100\n" + "jess," + "9" * 10000, "josh,100\n"),
+                                               ("jess,99", ""),
+                                               ("josh,100\n", "josh,100\n")])
+def test_repair_looks_back_past_long_torn_lines(snapshot_file, journal, repaired):
+    with open(f"{snapshot_file}.journal", "w") as file:
+        file.write(journal)
+
+    ShopperJournal(snapshot_file).record({"sam": 5})
+
+    with open(f"{snapshot_file}.journal") as file:
+        assert file.read() == repaired + "sam,5\n"
+
+
+def test_compact_flushes_the_renames(snapshot_file, monkeypatch):
+    synced_folders = []
+    fsync = os.fsync
+
+    def recording_fsync(fd):
+        if stat.S_ISDIR(os.fstat(fd).st_mode):
+            synced_folders.append(fd)
+        fsync(fd)
+
+    ShopperJournal(snapshot_file).record({"josh": 100})
+    monkeypatch.setattr(os, "fsync", recording_fsync)
+    ShopperJournal(snapshot_file).compact()
+
+    # Once after setting the journal aside and once after swapping in the snapshot
+    assert len(synced_folders) == (2 if hasattr(os, "O_DIRECTORY") else 0)
+
+
+def test_compact_folds_journal_into_snapshot(snapshot_file):
+    journal = ShopperJournal(snapshot_file)
+    journal.record({"josh": 100, "sam": 25})
+
+    assert journal.compact() == {"josh": 1100, "jess": 250, "sam": 25}
+    assert not os.path.exists(f"{snapshot_file}.journal")
+    assert ShopperJournal(snapshot_file).load() == {"josh": 1100, "jess": 250, "sam": 25}
+
+
+def test_compaction_interrupted_before_journal_set_aside_is_rolled_back(snapshot_file):
+    ShopperJournal(snapshot_file).record({"josh": 100})
+
+    # Crash while the new snapshot was being written: it may be incomplete, the journal is still in place
+    with open(f"{snapshot_file}.tmp", "w") as file:
+        file.write("josh,1")
+
+    assert ShopperJournal(snapshot_file).load() == {"josh": 1100, "jess": 250}
+    assert not os.path.exists(f"{snapshot_file}.tmp")
+
+
+def test_compaction_interrupted_after_journal_set_aside_is_finished(snapshot_file):
+    ShopperJournal(snapshot_file).record({"josh": 100})
+
+    # Crash after the full new snapshot was written and the journal renamed aside, before the swap
+    with open(f"{snapshot_file}.tmp", "w") as file:
+        file.write("josh,11.0\njess,2.5\n")
+    os.replace(f"{snapshot_file}.journal", f"{snapshot_file}.journal.compacted")
+
+    assert ShopperJournal(snapshot_file).load() == {"josh": 1100, "jess": 250}
+    assert not os.path.exists(f"{snapshot_file}.journal.compacted")
+    assert not os.path.exists(f"{snapshot_file}.tmp")
+
+    # The change is counted once, not again from the old journal
+    assert ShopperJournal(snapshot_file).load() == {"josh": 1100, "jess": 250}
+
+
+def test_journal_compacts_itself(snapshot_file):
+    journal = ShopperJournal(snapshot_file, compact_every=3)
+
+    for _ in range(3):
+        journal.record({"josh": 1})
+
+    assert journal.get_journal_lines() == 0
+    assert not os.path.exists(f"{snapshot_file}.journal")
+    assert ShopperJournal(snapshot_file).load()["josh"] == 1003
+
+
+def test_corrupt_complete_line_raises(snapshot_file):
+    with open(f"{snapshot_file}.journal", "w") as file:
+        file.write("josh\n")
+
+    with pytest.raises(ValueError):
+        ShopperJournal(snapshot_file).load()
@@ -0,0 +1,38 @@
+from SplitterModel import SplitterModel, SHOPPER_1, BOTH, SHOPPER_2
+
+LAYOUT = {"row_top": 165, "row_height": 40, "overscan": 2}
+
+
+def build_model(row_count):
+    return SplitterModel({f"Item {row}": 1.25 for row in range(row_count)})
+
+
+def test_visible_rows_at_the_top():
+    assert build_model(1000).get_visible_rows(0, 700, **LAYOUT) == (0, 16)
+
+
+def test_visible_rows_follow_the_scroll_position():
+    assert build_model(1000).get_visible_rows(4000, 700, **LAYOUT) == (93, 116)
+
+
+def test_visible_rows_do_not_depend_on_the_receipt_length():
+    # Only the window height decides how many rows get widgets, however far down the page is scrolled
+    for row_count in (100, 1000, 10000):
+        model = build_model(row_count)
+        for view_top in (0, 1234.5, 3000):
+            first, last = model.get_visible_rows(view_top, 700, **LAYOUT)
+            assert last - first <= 700 // 40 + 2 + 2 * LAYOUT["overscan"]
+
+
+def test_visible_rows_stop_at_the_last_row():
+    assert build_model(5).get_visible_rows(0, 700, **LAYOUT) == (0, 5)
+    assert build_model(5).get_visible_rows(5000, 700, **LAYOUT) == (5, 5)
+
+
+def test_totals_follow_the_choices():
+    model = build_model(3)
+    model.set_choice(0, SHOPPER_1)
+    model.set_choice(2, SHOPPER_2)
+
+    assert not model.set_choice(2, SHOPPER_2)
+    assert [model.get_total_cents(choice) for choice in (SHOPPER_1, BOTH, SHOPPER_2)] == [125, 125, 125]
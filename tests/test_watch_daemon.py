@@ -0,0 +1,31 @@
+import asyncio
+
+from ParseCache import ParseCache
+from ReceiptDividerRev2 import PARSER_VERSION
+from WatchDaemon import WatchDaemon
+
+
+def run_once(watch_daemon):
+    asyncio.run(asyncio.wait_for(watch_daemon.serve(once=True), timeout=30))
+
+
+def test_once_parses_the_receipts_already_there(tmp_path, write_receipt):
+    receipt = write_receipt("receipt.pdf", 12)
+    watch_daemon = WatchDaemon([str(tmp_path)], ParseCache(str(tmp_path / "cache"), parser_version=PARSER_VERSION),
+                               max_workers=1, settle_time=0.05)
+
+    run_once(watch_daemon)
+
+    assert [parsed[:2] for parsed in watch_daemon.get_parsed_receipts()] == [(receipt, 12)]
+    assert watch_daemon.get_parse_errors() == []
+
+
+def test_empty_file_is_a_parse_error_instead_of_waiting_forever(tmp_path):
+    (tmp_path / "empty.pdf").write_bytes(b"")
+    watch_daemon = WatchDaemon([str(tmp_path)], ParseCache(str(tmp_path / "cache"), parser_version=PARSER_VERSION),
+                               max_workers=1, settle_time=0.05)
+
+    run_once(watch_daemon)
+
+    assert watch_daemon.get_parsed_receipts() == []
+    assert watch_daemon.get_parse_errors() == [(str(tmp_path / "empty.pdf"), "The file is empty.")]